@@ -0,0 +1,280 @@
+"""
+Admission control for LuminaOps LLM provider calls
+Each provider, and optionally each provider/model pair, gets a concurrency
+limit and token buckets for requests per minute and tokens per minute.
+Requests that cannot start immediately wait in a bounded FIFO queue. They are
+rejected up front when the queue is full or the wait would exceed their
+deadline, so bursts are smoothed locally instead of triggering provider 429s.
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+import asyncio
+import math
+import time
+
+from core.config import settings
+from core.monitoring import (
+    record_llm_admission_wait,
+    record_llm_admission_rejection,
+    record_llm_admission_state
+)
+
+# Characters per token for estimates; providers report exact usage only after the call
+CHARS_PER_TOKEN = 4
+
+@dataclass
+class AdmissionLimits:
+    max_concurrency: Optional[int] = None
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    burst_seconds: float = 60.0  # Bucket capacity, in seconds' worth of the rate
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, Any]) -> "AdmissionLimits":
+        limits = cls(**values)
+        for name in ("max_concurrency", "requests_per_minute", "tokens_per_minute"):
+            value = getattr(limits, name)
+            if value is not None and value <= 0:
+                raise ValueError(f"{name} must be positive")
+        return limits
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted within its deadline"""
+
+    def __init__(self, scope: str, reason: str, retry_after: float):
+        super().__init__(f"{scope} is at capacity ({reason}); retry after {retry_after:.1f}s")
+        self.scope = scope
+        self.reason = reason
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """Continuously refilled bucket; capacity bounds the burst size"""
+
+    def __init__(self, rate_per_minute: float, burst_seconds: float = 60.0):
+        self.rate = rate_per_minute / 60
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, ahead: float = 0.0) -> float:
+        """Seconds until amount can be taken after `ahead` is; inf if amount exceeds the capacity"""
+        self._refill()
+        if amount > self.capacity:
+            return math.inf
+        return max(0.0, (ahead + amount - self.tokens) / self.rate)
+
+    def take(self, amount: float):
+        self._refill()
+        self.tokens -= amount
+
+    def give(self, amount: float):
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+class AdmissionScope:
+    """Limits and counters for a provider or a provider/model pair"""
+
+    def __init__(self, provider: str, model: str, limits: AdmissionLimits):
+        self.provider = provider
+        self.model = model  # "*" for the provider-wide scope
+        self.limits = limits
+        self.semaphore = asyncio.Semaphore(limits.max_concurrency) if limits.max_concurrency else None
+        self.requests = TokenBucket(limits.requests_per_minute, limits.burst_seconds) \
+            if limits.requests_per_minute else None
+        self.tokens = TokenBucket(limits.tokens_per_minute, limits.burst_seconds) \
+            if limits.tokens_per_minute else None
+        self.queued = 0
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    @property
+    def name(self) -> str:
+        return self.provider if self.model == "*" else f"{self.provider}/{self.model}"
+
+    def buckets(self, estimated_tokens: float) -> List[Tuple[TokenBucket, float]]:
+        buckets = []
+        if self.requests is not None:
+            buckets.append((self.requests, 1))
+        if self.tokens is not None:
+            buckets.append((self.tokens, estimated_tokens))
+        return buckets
+
+    def record_state(self):
+        record_llm_admission_state(self.provider, self.model, self.queued, self.in_flight)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.limits.max_concurrency,
+            "requests_per_minute": self.limits.requests_per_minute,
+            "tokens_per_minute": self.limits.tokens_per_minute,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "available_requests": round(self.requests.tokens, 2) if self.requests else None,
+            "available_tokens": round(self.tokens.tokens, 2) if self.tokens else None
+        }
+
+class Permit:
+    """Admission for one call; settle() refunds unused reserved tokens"""
+
+    def __init__(self, scopes: List[AdmissionScope], reserved_tokens: int):
+        self.scopes = scopes
+        self.reserved_tokens = reserved_tokens
+        self.queue_seconds = 0.0
+
+    def settle(self, used_tokens: int):
+        unused = self.reserved_tokens - used_tokens
+        if unused > 0:
+            for scope in self.scopes:
+                if scope.tokens is not None:
+                    scope.tokens.give(unused)
+        self.reserved_tokens = used_tokens
+
+def estimate_tokens(*texts: Optional[str]) -> int:
+    return sum(math.ceil(len(text) / CHARS_PER_TOKEN) for text in texts if text)
+
+class AdmissionController:
+    """Per-provider and per-model admission with a bounded FIFO wait queue"""
+
+    def __init__(
+        self,
+        limits: Dict[str, AdmissionLimits],
+        default_limits: AdmissionLimits,
+        max_queue: int = 256,
+        max_wait_seconds: float = 30.0
+    ):
+        # Keys are "provider" or "provider/model"; model scopes exist only when configured
+        self.limits = limits
+        self.default_limits = default_limits
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self._scopes: Dict[str, AdmissionScope] = {}
+        self._turns: Dict[str, asyncio.Lock] = {}
+
+    def _scopes_for(self, provider: str, model: str) -> List[AdmissionScope]:
+        scopes = []
+        for name, scope_model in ((f"{provider}/{model}", model), (provider, "*")):
+            scope = self._scopes.get(name)
+            if scope is None:
+                limits = self.limits.get(name)
+                if limits is None:
+                    if scope_model != "*":
+                        continue
+                    limits = self.default_limits
+                scope = self._scopes[name] = AdmissionScope(provider, scope_model, limits)
+            scopes.append(scope)
+        return scopes
+
+    def _reject(self, scopes: List[AdmissionScope], reason: str, retry_after: float):
+        head = scopes[0]
+        head.rejected += 1
+        record_llm_admission_rejection(head.provider, head.model, reason)
+        raise AdmissionRejected(head.name, reason, retry_after)
+
+    def _bucket_wait(self, scopes: List[AdmissionScope], estimated_tokens: int, queued: int = 0) -> float:
+        """Rate-limit wait, assuming each queued request ahead needs as much budget as this one"""
+        return max(
+            (
+                bucket.wait_time(amount, ahead=amount * queued)
+                for scope in scopes for bucket, amount in scope.buckets(estimated_tokens)
+            ),
+            default=0.0
+        )
+
+    async def _acquire(self, scopes: List[AdmissionScope], estimated_tokens: int, deadline: float) -> List[AdmissionScope]:
+        held = []
+        try:
+            for scope in scopes:
+                if scope.semaphore is not None:
+                    await asyncio.wait_for(scope.semaphore.acquire(), max(0.0, deadline - time.monotonic()))
+                    held.append(scope)
+            while True:
+                wait = self._bucket_wait(scopes, estimated_tokens)
+                if wait == 0:
+                    break
+                if time.monotonic() + wait > deadline:
+                    raise asyncio.TimeoutError
+                await asyncio.sleep(wait)
+            for scope in scopes:
+                for bucket, amount in scope.buckets(estimated_tokens):
+                    bucket.take(amount)
+            return held
+        except BaseException:
+            for scope in held:
+                scope.semaphore.release()
+            raise
+
+    @asynccontextmanager
+    async def admit(self, provider: str, model: str, estimated_tokens: int, max_wait: Optional[float] = None):
+        """Wait for capacity, then hold a concurrency slot for the duration of the block"""
+        max_wait = self.max_wait_seconds if max_wait is None else max_wait
+        scopes = self._scopes_for(provider, model)
+        head = scopes[0]
+
+        # Deadline-aware fast paths: never queue a request that cannot start in time
+        if head.queued >= self.max_queue:
+            self._reject(scopes, "queue_full", max_wait)
+        rate_wait = self._bucket_wait(scopes, estimated_tokens, head.queued)
+        if math.isinf(rate_wait):
+            # More tokens than a full bucket holds: waiting can never help
+            self._reject(scopes, "exceeds_limit", 0.0)
+        if rate_wait > max_wait:
+            self._reject(scopes, "rate_limited", rate_wait)
+
+        turn = self._turns.setdefault(head.name, asyncio.Lock())
+        deadline = time.monotonic() + max_wait
+        start = time.monotonic()
+        head.queued += 1
+        head.record_state()
+        try:
+            # One request at a time acquires, so the queue is served in arrival order
+            await asyncio.wait_for(turn.acquire(), max_wait)
+            try:
+                held = await self._acquire(scopes, estimated_tokens, deadline)
+            finally:
+                turn.release()
+        except asyncio.TimeoutError:
+            self._reject(scopes, "deadline", self._bucket_wait(scopes, estimated_tokens) or 1.0)
+        finally:
+            head.queued -= 1
+
+        permit = Permit(scopes, estimated_tokens)
+        permit.queue_seconds = time.monotonic() - start
+        # Labelled by the requested model, not the scope, so waits are per model even under a provider-wide limit
+        record_llm_admission_wait(provider, model, permit.queue_seconds)
+        for scope in scopes:
+            scope.admitted += 1
+            scope.in_flight += 1
+            scope.record_state()
+        try:
+            yield permit
+        finally:
+            for scope in scopes:
+                scope.in_flight -= 1
+                scope.record_state()
+            for scope in held:
+                scope.semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait_seconds,
+            "scopes": {name: scope.stats() for name, scope in self._scopes.items()}
+        }
+
+# Global admission controller shared by every LLMService instance
+llm_admission = AdmissionController(
+    limits={name: AdmissionLimits.from_dict(values) for name, values in settings.LLM_ADMISSION_LIMITS.items()},
+    default_limits=AdmissionLimits(max_concurrency=settings.LLM_MAX_CONCURRENCY),
+    max_queue=settings.LLM_ADMISSION_MAX_QUEUE,
+    max_wait_seconds=settings.LLM_ADMISSION_MAX_WAIT
+)
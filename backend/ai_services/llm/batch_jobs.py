@@ -0,0 +1,313 @@
+"""
+Batch LLM generation for LuminaOps
+A batch is a list of prompts generated with one configuration. Prompts are
+processed by a fixed number of workers, so at most `concurrency` provider calls
+are in flight per batch, and each result is published in completion order
+with the prompt's index. Subscribers replay results from any position, so a
+client that disconnects picks the stream up again by batch ID. When
+LLM_BATCH_STATE_DIR is set, prompts and results are checkpointed to a JSONL
+file per batch; a cancelled or interrupted batch, including one from before a
+restart, resumes with only the prompts that have no result yet.
+"""
+
+from typing import Dict, Any, List, Optional, AsyncGenerator
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+import asyncio
+import json
+import time
+import uuid
+
+from core.config import settings
+from core.monitoring import record_ml_job, record_llm_batch_item
+from ai_services.llm.admission import AdmissionRejected
+from ai_services.llm.llm_service import LLMConfig, LLMProvider
+
+class BatchStatus(Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+    FAILED = "failed"  # Stopped by an error outside any one prompt, e.g. a failed checkpoint write
+    INTERRUPTED = "interrupted"  # Loaded from a checkpoint with prompts still to run
+
+@dataclass
+class LLMBatchJob:
+    batch_id: str
+    prompts: List[str]
+    config: LLMConfig
+    system_prompt: Optional[str] = None
+    use_cache: bool = True
+    concurrency: int = 8
+    status: BatchStatus = BatchStatus.PENDING
+    results: List[Dict[str, Any]] = field(default_factory=list)  # Completion order, retries included
+    latest: Dict[int, Dict[str, Any]] = field(default_factory=dict)  # Latest result per prompt index
+    processed: int = 0  # Prompts generated by this process, for throughput
+    run_seconds: float = 0.0  # Time spent running, across resumes
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+    def __post_init__(self):
+        self._changed = asyncio.Event()
+        self._run_started: Optional[float] = None
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for result in self.latest.values() if result.get("error") is None)
+
+    @property
+    def failed(self) -> int:
+        return len(self.latest) - self.succeeded
+
+    @property
+    def remaining(self) -> List[int]:
+        return [index for index in range(len(self.prompts)) if index not in self.latest]
+
+    @property
+    def done(self) -> bool:
+        return self.status not in (BatchStatus.PENDING, BatchStatus.RUNNING)
+
+    def _publish(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def add_result(self, result: Dict[str, Any]):
+        self.results.append(result)
+        self.latest[result["index"]] = result
+        self._publish()
+
+    def start_run(self):
+        self.status = BatchStatus.RUNNING
+        self.error = None
+        self.finished_at = None
+        self._run_started = time.perf_counter()
+        self._publish()
+
+    def end_run(self, status: BatchStatus):
+        if self._run_started is not None:
+            self.run_seconds += time.perf_counter() - self._run_started
+            self._run_started = None
+        self.status = status
+        self.finished_at = datetime.utcnow()
+        self._publish()
+
+    async def subscribe(self, after: int = 0) -> AsyncGenerator[Dict[str, Any], None]:
+        """Yield results in completion order from position `after` until the batch stops running"""
+        position = max(0, after)
+        while True:
+            while position < len(self.results):
+                yield self.results[position]
+                position += 1
+            if self.done:
+                return
+            await self._changed.wait()
+
+    def to_dict(self) -> Dict[str, Any]:
+        seconds = self.run_seconds
+        if self._run_started is not None:
+            seconds += time.perf_counter() - self._run_started
+        return {
+            "batch_id": self.batch_id,
+            "status": self.status.value,
+            "total": len(self.prompts),
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "remaining": len(self.prompts) - len(self.latest),
+            "results_published": len(self.results),
+            "concurrency": self.concurrency,
+            "run_seconds": round(seconds, 3),
+            "prompts_per_second": round(self.processed / seconds, 3) if seconds else 0.0,
+            "failures": [
+                {"index": index, "error": result["error"]}
+                for index, result in sorted(self.latest.items()) if result.get("error") is not None
+            ],
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
+
+class LLMBatchManager:
+    """Runs batch generation jobs and tracks their results"""
+
+    def __init__(self, state_dir: Optional[str] = None, max_jobs_retained: int = 100):
+        self.state_dir = Path(state_dir) if state_dir else None
+        self.max_jobs_retained = max_jobs_retained
+        self.jobs: Dict[str, LLMBatchJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def get(self, batch_id: str) -> LLMBatchJob:
+        """Return a batch, loading its checkpoint if it is not in memory"""
+        if batch_id not in self.jobs:
+            path = self._path(batch_id)
+            if path is None or not path.exists():
+                raise KeyError(f"Batch {batch_id} not found")
+            self._retain(self._load(path))
+        return self.jobs[batch_id]
+
+    async def start(
+        self,
+        service,
+        prompts: List[str],
+        config,
+        system_prompt: Optional[str] = None,
+        use_cache: bool = True,
+        concurrency: int = 8
+    ) -> LLMBatchJob:
+        """Create a batch and start generating it in the background"""
+        if not prompts:
+            raise ValueError("A batch needs at least one prompt")
+        if concurrency <= 0:
+            raise ValueError("concurrency must be positive")
+        job = LLMBatchJob(
+            batch_id=str(uuid.uuid4()),
+            prompts=prompts,
+            config=config,
+            system_prompt=system_prompt,
+            use_cache=use_cache,
+            concurrency=concurrency
+        )
+        if self.state_dir is not None:
+            await asyncio.to_thread(self._write_header, job)
+        self._retain(job)
+        self._launch(service, job)
+        return job
+
+    def resume(self, service, batch_id: str, retry_failed: bool = False) -> LLMBatchJob:
+        """Run the prompts of a stopped batch that have no result (or failed, with retry_failed)"""
+        job = self.get(batch_id)
+        if job.status == BatchStatus.RUNNING:
+            raise RuntimeError(f"Batch {batch_id} is already running")
+        if retry_failed:
+            for index, result in list(job.latest.items()):
+                if result.get("error") is not None:
+                    del job.latest[index]
+        self._launch(service, job)
+        return job
+
+    def cancel(self, batch_id: str) -> LLMBatchJob:
+        job = self.get(batch_id)
+        task = self._tasks.get(batch_id)
+        if task is not None:
+            task.cancel()
+        return job
+
+    def _launch(self, service, job: LLMBatchJob):
+        job.start_run()
+        task = asyncio.create_task(self._run(service, job))
+        self._tasks[job.batch_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.batch_id, None))
+
+    async def _run(self, service, job: LLMBatchJob):
+        record_ml_job("llm_batch", "started")
+        pending = deque(job.remaining)
+
+        async def worker():
+            while pending:
+                index = pending.popleft()
+                start_time = time.perf_counter()
+                deadline = start_time + settings.LLM_BATCH_ADMISSION_MAX_WAIT
+                while True:
+                    try:
+                        result = await service.generate(
+                            job.prompts[index], job.config, job.system_prompt, use_cache=job.use_cache
+                        )
+                        item = {"index": index, "response": result.text, "error": None}
+                    except AdmissionRejected as e:
+                        # Provider at capacity: wait rather than fail the item, up to the deadline
+                        wait = max(e.retry_after, 0.1)
+                        if time.perf_counter() + wait <= deadline:
+                            await asyncio.sleep(wait)
+                            continue
+                        item = {"index": index, "response": None, "error": str(e)}
+                    except Exception as e:
+                        item = {"index": index, "response": None, "error": str(e)}
+                    break
+                item["latency_ms"] = round((time.perf_counter() - start_time) * 1000, 3)
+                record_llm_batch_item("failed" if item["error"] else "succeeded")
+                job.processed += 1
+                job.add_result(item)
+                if self.state_dir is not None:
+                    await asyncio.to_thread(self._append_result, job, item)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(job.concurrency, len(pending)))]
+        try:
+            await asyncio.gather(*workers)
+        except asyncio.CancelledError:
+            job.end_run(BatchStatus.CANCELLED)
+            record_ml_job("llm_batch", "cancelled")
+            raise
+        except Exception as e:
+            # Not a prompt failure (those become results), so stop the other workers too
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            job.error = str(e)
+            job.end_run(BatchStatus.FAILED)
+            record_ml_job("llm_batch", "failed")
+            return
+        job.end_run(BatchStatus.COMPLETED)
+        record_ml_job("llm_batch", "completed")
+
+    def _path(self, batch_id: str) -> Optional[Path]:
+        if self.state_dir is None:
+            return None
+        # Batch IDs are UUIDs; anything else must not become part of a path
+        try:
+            return self.state_dir / f"{uuid.UUID(batch_id)}.jsonl"
+        except ValueError:
+            return None
+
+    def _write_header(self, job: LLMBatchJob):
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        config = asdict(job.config)
+        config["provider"] = job.config.provider.value
+        header = {
+            "batch_id": job.batch_id,
+            "prompts": job.prompts,
+            "config": config,
+            "system_prompt": job.system_prompt,
+            "use_cache": job.use_cache,
+            "concurrency": job.concurrency,
+            "created_at": job.created_at.isoformat()
+        }
+        with open(self._path(job.batch_id), "w") as f:
+            f.write(json.dumps(header) + "\n")
+
+    def _append_result(self, job: LLMBatchJob, item: Dict[str, Any]):
+        with open(self._path(job.batch_id), "a") as f:
+            f.write(json.dumps(item) + "\n")
+
+    @staticmethod
+    def _load(path: Path) -> LLMBatchJob:
+        with open(path) as f:
+            header = json.loads(f.readline())
+            config = dict(header["config"], provider=LLMProvider(header["config"]["provider"]))
+            job = LLMBatchJob(
+                batch_id=header["batch_id"],
+                prompts=header["prompts"],
+                config=LLMConfig(**config),
+                system_prompt=header["system_prompt"],
+                use_cache=header["use_cache"],
+                concurrency=header["concurrency"],
+                created_at=datetime.fromisoformat(header["created_at"])
+            )
+            for line in f:
+                if line.strip():
+                    job.add_result(json.loads(line))
+        job.status = BatchStatus.COMPLETED if not job.remaining else BatchStatus.INTERRUPTED
+        return job
+
+    def _retain(self, job: LLMBatchJob):
+        """Store a batch, dropping the oldest finished batches beyond the retention limit"""
+        self.jobs[job.batch_id] = job
+        if len(self.jobs) > self.max_jobs_retained:
+            finished = [j for j in self.jobs.values() if j.finished_at is not None]
+            for old in sorted(finished, key=lambda j: j.finished_at)[:len(self.jobs) - self.max_jobs_retained]:
+                del self.jobs[old.batch_id]
+
+# Global batch manager instance
+llm_batch_manager = LLMBatchManager(state_dir=settings.LLM_BATCH_STATE_DIR)
@@ -0,0 +1,215 @@
+"""
+Dynamic batching for local Hugging Face causal language models
+Concurrent prompts are queued and grouped into left-padded batches of up to
+max_batch_size, waiting at most max_wait_ms for a batch to fill. Each batch
+is decoded token by token with a shared KV cache in one worker thread per
+model. A sequence that reaches EOS, its token limit or is cancelled is
+returned at once and its row is dropped from the batch, so the remaining
+sequences keep generating without computing padding for finished ones.
+"""
+
+from typing import Dict, Any, AsyncGenerator, List, Optional, Set
+import asyncio
+import time
+
+from core.monitoring import record_llm_batch
+
+try:
+    import torch
+except ImportError as e:
+    print(f"Warning: PyTorch not installed: {e}")
+
+class BatchItem:
+    """One prompt in the scheduler and the text generated for it so far"""
+
+    def __init__(self, prompt: str, max_new_tokens: int, temperature: float, top_p: float):
+        self.prompt = prompt
+        self.max_new_tokens = max_new_tokens
+        self.temperature = temperature
+        self.top_p = top_p
+        self.tokens: List[int] = []
+        self.text = ""
+        self.cancelled = False  # Set by the caller; checked by the decode loop after every token
+        self.enqueued = time.perf_counter()
+        self.output: asyncio.Queue = asyncio.Queue()  # Text deltas, then None or an exception
+        self._loop = asyncio.get_running_loop()
+
+    def _send(self, value):
+        # Called from the decode thread
+        self._loop.call_soon_threadsafe(self.output.put_nowait, value)
+
+    def add_token(self, token: int, tokenizer):
+        self.tokens.append(token)
+        text = tokenizer.decode(self.tokens, skip_special_tokens=True)
+        # An incomplete multi-byte character decodes to U+FFFD; wait for the rest
+        if len(text) > len(self.text) and not text.endswith("�"):
+            self._send(text[len(self.text):])
+            self.text = text
+
+    def finish(self, error: Optional[BaseException] = None):
+        self._send(error)
+
+def _select_rows(past_key_values, index):
+    """Keep only the given batch rows of a KV cache"""
+    if hasattr(past_key_values, "batch_select_indices"):
+        past_key_values.batch_select_indices(index)
+        return past_key_values
+    # Legacy format: per-layer (key, value) tensors with batch first
+    return tuple(tuple(tensor[index] for tensor in layer) for layer in past_key_values)
+
+class LocalBatchScheduler:
+    """Groups concurrent generations for one local model into batches"""
+
+    def __init__(self, model, tokenizer, name: str, max_batch_size: int = 8, max_wait_ms: float = 10.0):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        # Left padding keeps the last position of every row a real token
+        self.tokenizer.padding_side = "left"
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        eos = model.generation_config.eos_token_id
+        self.eos_token_ids: Set[int] = set(eos if isinstance(eos, list) else [eos]) - {None}
+        if tokenizer.eos_token_id is not None:
+            self.eos_token_ids.add(tokenizer.eos_token_id)
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.sequences = 0
+        self.generated_tokens = 0
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._schedule())
+
+    async def _schedule(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                # Requests that queued up during the previous batch join without waiting
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            batch = [item for item in batch if not item.cancelled]
+            if not batch:
+                continue
+            self.batches += 1
+            self.sequences += len(batch)
+            record_llm_batch(self.name, len(batch), time.perf_counter() - min(item.enqueued for item in batch))
+            try:
+                await asyncio.to_thread(self._run_batch, batch)
+            except Exception as e:
+                for item in batch:
+                    item.finish(e)
+
+    def _next_tokens(self, logits, items: List[BatchItem]) -> List[int]:
+        tokens = logits.argmax(dim=-1).tolist()
+        for row, item in enumerate(items):
+            if item.temperature <= 0:
+                continue  # Greedy
+            probs = torch.softmax(logits[row].float() / item.temperature, dim=-1)
+            sorted_probs, order = probs.sort(descending=True)
+            # Nucleus sampling: drop tokens outside the smallest set with mass top_p
+            sorted_probs[sorted_probs.cumsum(dim=-1) - sorted_probs > item.top_p] = 0
+            tokens[row] = order[torch.multinomial(sorted_probs, 1)].item()
+        return tokens
+
+    def _run_batch(self, batch: List[BatchItem]):
+        """Decode a batch until every sequence has finished"""
+        encoded = self.tokenizer([item.prompt for item in batch], return_tensors="pt", padding=True)
+        input_ids = encoded["input_ids"].to(self.model.device)
+        attention_mask = encoded["attention_mask"].to(self.model.device)
+        position_ids = (attention_mask.cumsum(dim=-1) - 1).clamp(min=0)
+        active = batch
+        past_key_values = None
+
+        with torch.inference_mode():
+            while active:
+                outputs = self.model(
+                    input_ids=input_ids,
+                    attention_mask=attention_mask,
+                    position_ids=position_ids,
+                    past_key_values=past_key_values,
+                    use_cache=True
+                )
+                past_key_values = outputs.past_key_values
+                tokens = self._next_tokens(outputs.logits[:, -1, :], active)
+                self.generated_tokens += len(active)
+
+                keep = []
+                for row, (item, token) in enumerate(zip(active, tokens)):
+                    finished = token in self.eos_token_ids
+                    if not finished:
+                        item.add_token(token, self.tokenizer)
+                        finished = len(item.tokens) >= item.max_new_tokens or item.cancelled
+                    if finished:
+                        item.finish()  # Returned now, while the rest of the batch continues
+                    else:
+                        keep.append(row)
+                if not keep:
+                    break
+                if len(keep) < len(active):
+                    index = torch.tensor(keep, device=self.model.device)
+                    past_key_values = _select_rows(past_key_values, index)
+                    attention_mask = attention_mask[index]
+                    active = [active[row] for row in keep]
+
+                input_ids = torch.tensor([[tokens[row]] for row in keep], device=self.model.device)
+                attention_mask = torch.cat([attention_mask, attention_mask.new_ones((len(keep), 1))], dim=-1)
+                position_ids = attention_mask.sum(dim=-1, keepdim=True) - 1
+
+    async def stream(
+        self,
+        prompt: str,
+        max_new_tokens: int,
+        temperature: float = 0.0,
+        top_p: float = 1.0
+    ) -> AsyncGenerator[str, None]:
+        """Yield generated text as it is decoded; closing the generator frees the row"""
+        item = BatchItem(prompt, max_new_tokens, temperature, top_p)
+        self._ensure_running()
+        self._queue.put_nowait(item)
+        try:
+            while True:
+                delta = await item.output.get()
+                if delta is None:
+                    return
+                if isinstance(delta, BaseException):
+                    raise delta
+                yield delta
+        finally:
+            item.cancelled = True
+
+    async def generate(self, prompt: str, max_new_tokens: int, temperature: float = 0.0, top_p: float = 1.0) -> str:
+        return "".join([delta async for delta in self.stream(prompt, max_new_tokens, temperature, top_p)])
+
+    def close(self):
+        """Stop scheduling; requests still queued are failed"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        while self._queue is not None and not self._queue.empty():
+            self._queue.get_nowait().finish(RuntimeError(f"{self.name} was unloaded"))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.name,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "sequences": self.sequences,
+            "mean_batch_size": round(self.sequences / self.batches, 3) if self.batches else 0.0,
+            "generated_tokens": self.generated_tokens
+        }
@@ -0,0 +1,114 @@
+"""
+Single-flight request coalescing for LuminaOps LLM calls
+Concurrent requests with the same response cache key share one upstream
+generation. The generation runs in a background task and publishes its text
+chunks; each caller subscribes and replays the chunks produced so far, so a
+streaming request can attach to a generation already in progress. The
+generation is cancelled once its last subscriber leaves. The source may
+record how it was served, such as the routing decision, in the flight's
+metadata, which every subscriber can read.
+"""
+
+from typing import Dict, Any, AsyncIterator, AsyncGenerator, Callable, List, Optional, Tuple
+import asyncio
+
+from core.monitoring import record_llm_coalesced
+
+class InFlightGeneration:
+    """One upstream generation and the chunks it has produced so far"""
+
+    def __init__(self, key: str, coalescer: "RequestCoalescer"):
+        self.key = key
+        self.chunks: List[str] = []
+        self.metadata: Dict[str, Any] = {}
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+        self._coalescer = coalescer
+        self._changed = asyncio.Event()
+
+    def _publish(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def _drive(self, source: AsyncIterator[str]):
+        try:
+            async for chunk in source:
+                self.chunks.append(chunk)
+                self._publish()
+        except asyncio.CancelledError:
+            self.error = RuntimeError("Generation cancelled")
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            self._coalescer._forget(self)
+            self._publish()
+
+    async def subscribe(self) -> AsyncGenerator[str, None]:
+        """Yield every chunk of the generation, from the first one"""
+        self.subscribers += 1
+        try:
+            position = 0
+            while True:
+                while position < len(self.chunks):
+                    yield self.chunks[position]
+                    position += 1
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                await self._changed.wait()
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.done:
+                # Nobody is waiting any more; new requests must start afresh
+                self._coalescer._forget(self)
+                self.task.cancel()
+
+    async def result(self) -> str:
+        return "".join([chunk async for chunk in self.subscribe()])
+
+class RequestCoalescer:
+    """Tracks in-flight generations by key"""
+
+    def __init__(self):
+        self._in_flight: Dict[str, InFlightGeneration] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def join(
+        self,
+        key: str,
+        provider: str,
+        source: Callable[[Dict[str, Any]], AsyncIterator[str]]
+    ) -> Tuple[InFlightGeneration, bool]:
+        """Return (generation, joined) for key, starting source(metadata) if none is in flight"""
+        flight = self._in_flight.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            record_llm_coalesced(provider)
+            return flight, True
+        flight = InFlightGeneration(key, self)
+        self._in_flight[key] = flight
+        self.started += 1
+        flight.task = asyncio.create_task(flight._drive(source(flight.metadata)))
+        return flight, False
+
+    def _forget(self, flight: InFlightGeneration):
+        if self._in_flight.get(flight.key) is flight:
+            del self._in_flight[flight.key]
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self.started + self.coalesced
+        return {
+            "in_flight": len(self._in_flight),
+            "subscribers": sum(flight.subscribers for flight in self._in_flight.values()),
+            "generations_started": self.started,
+            "requests_coalesced": self.coalesced,
+            "coalesced_ratio": round(self.coalesced / requests, 4) if requests else 0.0
+        }
+
+# Global coalescer shared by every LLMService instance
+llm_request_coalescer = RequestCoalescer()
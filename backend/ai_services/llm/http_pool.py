@@ -0,0 +1,175 @@
+"""
+Shared HTTP connection pool for LuminaOps LLM providers
+Every remote provider SDK client is handed the same httpx.AsyncClient, so
+TLS connections are kept alive and reused across providers and requests
+instead of each client opening its own pool. The transport tracks in-flight
+requests, counts new connections through httpcore's trace extension and
+reports connection states for the pool utilization metrics.
+"""
+
+from typing import Dict, Any, Optional
+
+import httpx
+
+from core.config import settings
+from core.monitoring import record_llm_http_pool
+
+class _TrackedStream(httpx.AsyncByteStream):
+    """Response body that releases its in-flight slot when closed"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release):
+        self._stream = stream
+        self._release = release
+        self._released = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._release()
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """httpx transport that reports pool utilization after every change"""
+
+    def __init__(self, limits: httpx.Limits, retries: int = 0):
+        self._transport = httpx.AsyncHTTPTransport(limits=limits, retries=retries)
+        self.max_connections = limits.max_connections
+        self.in_flight = 0
+        self.requests_total = 0
+        self.connections_opened = 0
+
+    def connection_counts(self) -> Dict[str, Optional[int]]:
+        """Active and idle connections; idle is None when the pool cannot be inspected"""
+        try:
+            # Not public httpx/httpcore API, so an upgrade may remove it
+            connections = self._transport._pool.connections
+            idle = sum(1 for connection in connections if connection.is_idle())
+            return {"active": len(connections) - idle, "idle": idle}
+        except Exception:
+            # An HTTP/1.1 connection carries one request at a time
+            return {"active": self.in_flight, "idle": None}
+
+    def _record(self):
+        counts = self.connection_counts()
+        record_llm_http_pool(
+            active=counts["active"],
+            idle=counts["idle"],
+            in_flight=self.in_flight,
+            max_connections=self.max_connections
+        )
+
+    def _release(self):
+        self.in_flight -= 1
+        self._record()
+
+    def _trace(self, request: httpx.Request):
+        """Count new TCP connections, passing events on to any trace the caller set"""
+        inner = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: Dict[str, Any]):
+            if event_name == "connection.connect_tcp.complete":
+                self.connections_opened += 1
+            if inner is not None:
+                await inner(event_name, info)
+
+        request.extensions = {**request.extensions, "trace": trace}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.in_flight += 1
+        self.requests_total += 1
+        self._trace(request)
+        self._record()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            self._release()
+            raise
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_TrackedStream(response.stream, self._release),
+            extensions=response.extensions
+        )
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+class LLMHTTPPool:
+    """Lazily created httpx.AsyncClient shared by all remote LLM providers"""
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 100,
+        keepalive_expiry: float = 30.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 120.0,
+        pool_timeout: float = 10.0
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        # Write timeout follows connect; pool timeout bounds the wait for a free connection
+        self.timeout = httpx.Timeout(
+            connect=connect_timeout,
+            read=read_timeout,
+            write=connect_timeout,
+            pool=pool_timeout
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self._transport: Optional[InstrumentedTransport] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._transport = InstrumentedTransport(self.limits)
+            self._client = httpx.AsyncClient(transport=self._transport, timeout=self.timeout)
+        return self._client
+
+    async def aclose(self):
+        """Close pooled connections; the next use opens a fresh client"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._transport = None
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+            "timeouts": {
+                "connect": self.timeout.connect,
+                "read": self.timeout.read,
+                "pool": self.timeout.pool
+            },
+            "open": self._transport is not None
+        }
+        if self._transport is not None:
+            counts = self._transport.connection_counts()
+            stats.update({
+                "connections": counts,
+                "in_flight": self._transport.in_flight,
+                "requests_total": self._transport.requests_total,
+                "connections_opened": self._transport.connections_opened,
+                "utilization": round(counts["active"] / self.limits.max_connections, 4)
+            })
+        return stats
+
+# Global pool shared by OpenAI and Anthropic clients
+llm_http_pool = LLMHTTPPool(
+    max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+    keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+    connect_timeout=settings.LLM_HTTP_CONNECT_TIMEOUT,
+    read_timeout=settings.LLM_HTTP_READ_TIMEOUT,
+    pool_timeout=settings.LLM_HTTP_POOL_TIMEOUT
+)
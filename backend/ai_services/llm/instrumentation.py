@@ -0,0 +1,125 @@
+"""
+LLM call instrumentation for LuminaOps
+Each provider call (one routed attempt, hedges and retries included) is
+measured per provider and model: total latency, time spent queued for
+admission, time to first token for streams, prompt and completion tokens as
+reported by the provider, output tokens per second and errors by type. Every
+call also gets an OpenTelemetry client span, a child of the active request
+span, whose context is sent to the provider as W3C trace headers.
+"""
+
+from typing import Dict, Optional
+from contextlib import contextmanager
+import asyncio
+import time
+
+from core.monitoring import record_llm_call, record_llm_error, record_llm_ttft
+
+try:
+    from opentelemetry import trace, propagate
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+    tracer = trace.get_tracer("luminaops.llm")
+except ImportError as e:
+    print(f"Warning: OpenTelemetry not installed: {e}")
+    tracer = None
+
+# How a call ends when its caller gives up: a cancelled task (e.g. a hedge
+# loser) or a stream closed early (e.g. a disconnected SSE client)
+ABANDONED = (asyncio.CancelledError, GeneratorExit)
+
+class LLMCall:
+    """Timing, token usage and trace span of one provider call"""
+
+    def __init__(self, config, streaming: bool):
+        self.provider = config.provider.value
+        self.model = config.model_name
+        self.streaming = streaming
+        self.start = time.perf_counter()
+        self.queue_seconds = 0.0
+        self.ttft_seconds: Optional[float] = None
+        self.prompt_tokens: Optional[int] = None
+        self.completion_tokens: Optional[int] = None
+        self.span = None
+        if tracer is not None:
+            self.span = tracer.start_span(
+                f"llm.{'stream' if streaming else 'generate'}",
+                kind=SpanKind.CLIENT,
+                attributes={
+                    "gen_ai.system": self.provider,
+                    "gen_ai.request.model": self.model,
+                    "gen_ai.request.temperature": config.temperature,
+                    "gen_ai.request.max_tokens": config.max_tokens,
+                    "gen_ai.request.top_p": config.top_p,
+                    "llm.streaming": streaming
+                }
+            )
+
+    @property
+    def trace_headers(self) -> Dict[str, str]:
+        """traceparent (and tracestate) headers carrying this call's span context"""
+        headers: Dict[str, str] = {}
+        if self.span is not None:
+            propagate.inject(headers, context=trace.set_span_in_context(self.span))
+        return headers
+
+    def admitted(self, permit):
+        """Note the time spent waiting for admission; permit is None when admission is disabled"""
+        if permit is not None:
+            self.queue_seconds = permit.queue_seconds
+
+    def first_token(self):
+        # Recorded right away, so streams closed early still count
+        if self.ttft_seconds is None:
+            self.ttft_seconds = time.perf_counter() - self.start
+            record_llm_ttft(self.provider, self.model, self.ttft_seconds)
+
+    def record_usage(self, prompt_tokens: Optional[int], completion_tokens: Optional[int]):
+        """Token counts from the provider's usage fields"""
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+
+    def _end_span(self, error: Optional[BaseException] = None):
+        if self.span is None:
+            return
+        self.span.set_attribute("llm.queue_seconds", self.queue_seconds)
+        if self.ttft_seconds is not None:
+            self.span.set_attribute("llm.time_to_first_token_seconds", self.ttft_seconds)
+        if self.prompt_tokens is not None:
+            self.span.set_attribute("gen_ai.usage.input_tokens", self.prompt_tokens)
+        if self.completion_tokens is not None:
+            self.span.set_attribute("gen_ai.usage.output_tokens", self.completion_tokens)
+        if isinstance(error, ABANDONED):
+            self.span.set_attribute("llm.cancelled", True)
+        elif error is not None:
+            self.span.record_exception(error)
+            self.span.set_status(Status(StatusCode.ERROR, f"{type(error).__name__}: {error}"))
+        self.span.end()
+
+    def finish(self):
+        seconds = time.perf_counter() - self.start
+        record_llm_call(
+            self.provider,
+            self.model,
+            self.streaming,
+            seconds,
+            self.queue_seconds,
+            self.prompt_tokens,
+            self.completion_tokens
+        )
+        self._end_span()
+
+    def fail(self, error: BaseException):
+        if not isinstance(error, ABANDONED):
+            record_llm_error(self.provider, self.model, type(error).__name__)
+        self._end_span(error)
+
+@contextmanager
+def observe_llm_call(config, streaming: bool = False):
+    """Measure and trace the provider call made inside the block"""
+    call = LLMCall(config, streaming)
+    try:
+        yield call
+    except BaseException as e:
+        call.fail(e)
+        raise
+    call.finish()
@@ -1,19 +1,33 @@
 """
 AI-Powered LLM Service for LuminaOps
-Supports multiple LLM providers: OpenAI, Anthropic, Hugging Face, Local models
+Supports multiple LLM providers: OpenAI, Anthropic, Hugging Face, and a local
+mock provider for load tests
 """
 
-from typing import Dict, List, Optional, Any, AsyncGenerator
+from typing import Dict, List, Optional, Any, AsyncGenerator, Callable, Tuple
 from enum import Enum
 import asyncio
 import json
+import threading
+import time
+from contextlib import nullcontext
 from dataclasses import dataclass
 from core.config import settings
+from core.monitoring import record_llm_cache
+from ai_services.llm.response_cache import llm_response_cache
+from ai_services.llm.semantic_cache import llm_semantic_cache, SemanticLookup
+from ai_services.llm.http_pool import llm_http_pool
+from ai_services.llm.coalescing import llm_request_coalescer
+from ai_services.llm.admission import llm_admission, AdmissionRejected, estimate_tokens
+from ai_services.llm.router import llm_router, RoutingDecision, target_name
+from ai_services.llm.model_registry import local_model_registry, ModelKey
+from ai_services.llm.instrumentation import observe_llm_call, LLMCall
+from ai_services.llm.mock_provider import mock_llm_provider
 
 try:
     import openai
-    from anthropic import Anthropic
-    from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
+    from anthropic import AsyncAnthropic
+    from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline, TextIteratorStreamer, StoppingCriteriaList
     import torch
 except ImportError as e:
     print(f"Warning: Some AI libraries not installed: {e}")
@@ -32,6 +46,12 @@ class LLMConfig:
     temperature: float = 0.7
     max_tokens: int = 1000
     top_p: float = 1.0
+    dtype: Optional[str] = None  # Local models only; defaults to LLM_LOCAL_DTYPE
+
+@dataclass
+class LLMResult:
+    text: str
+    metadata: Dict[str, Any]
 
 class LLMService:
     """Unified LLM service supporting multiple providers"""
@@ -39,8 +59,8 @@ class LLMService:
     def __init__(self):
         self.providers = {}
         self.default_config = LLMConfig(
-            provider=LLMProvider.OPENAI,
-            model_name="gpt-4-turbo-preview"
+            provider=LLMProvider(settings.LLM_DEFAULT_PROVIDER),
+            model_name=settings.LLM_DEFAULT_MODEL
         )
     
     async def initialize_provider(self, config: LLMConfig):
@@ -51,56 +71,248 @@ class LLMService:
                 if not api_key:
                     raise ValueError("OpenAI API key not configured")
                 self.providers[config.provider] = openai.AsyncOpenAI(
-                    api_key=api_key
+                    api_key=api_key,
+                    base_url=settings.OPENAI_BASE_URL,
+                    http_client=llm_http_pool.client,
+                    timeout=llm_http_pool.timeout
                 )
             elif config.provider == LLMProvider.ANTHROPIC:
                 api_key = config.api_key or settings.ANTHROPIC_API_KEY
                 if not api_key:
                     raise ValueError("Anthropic API key not configured")
-                self.providers[config.provider] = Anthropic(
-                    api_key=api_key
+                self.providers[config.provider] = AsyncAnthropic(
+                    api_key=api_key,
+                    base_url=settings.ANTHROPIC_BASE_URL,
+                    http_client=llm_http_pool.client,
+                    timeout=llm_http_pool.timeout
                 )
             elif config.provider == LLMProvider.HUGGINGFACE:
-                # Initialize Hugging Face pipeline
-                self.providers[config.provider] = pipeline(
-                    "text-generation",
-                    model=config.model_name,
-                    torch_dtype=torch.float16,
-                    device_map="auto"
-                )
+                # Load the model into the shared local model registry
+                await local_model_registry.get(ModelKey.for_config(config))
             return True
         except Exception as e:
             print(f"Failed to initialize {config.provider.value}: {e}")
             return False
     
+    async def _cache_lookup(
+        self,
+        prompt: str,
+        config: LLMConfig,
+        system_prompt: Optional[str],
+        use_cache: bool
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Return (cache key, cached response); the key is None when the request is not cacheable"""
+        if settings.LLM_CACHE_ENABLED and use_cache and llm_response_cache.cacheable(config):
+            cache_key = llm_response_cache.key(config, prompt, system_prompt)
+            return cache_key, await llm_response_cache.get(cache_key, config.provider.value)
+        record_llm_cache(config.provider.value, "bypass")
+        return None, None
+    
+    async def _semantic_lookup(
+        self,
+        route: Optional[str],
+        prompt: str,
+        config: LLMConfig,
+        system_prompt: Optional[str],
+        use_cache: bool
+    ) -> Optional[SemanticLookup]:
+        """Semantic cache lookup for routes that opt in; None when the semantic cache is not used"""
+        if not (settings.LLM_SEMANTIC_CACHE_ENABLED and route and use_cache):
+            return None
+        try:
+            return await llm_semantic_cache.lookup(route, prompt, config, system_prompt)
+        except Exception as e:
+            # The cache only saves provider calls, so its failures must not fail the request
+            print(f"Semantic cache lookup failed: {e}")
+            llm_semantic_cache.record_error(route)
+            return None
+    
+    async def _semantic_store(
+        self,
+        lookup: Optional[SemanticLookup],
+        config: LLMConfig,
+        response: str,
+        generation_seconds: float,
+        metadata: Dict[str, Any]
+    ):
+        """Store a generated response under the prompt embedding of a missed semantic lookup"""
+        # Like the exact cache, only keep answers from the requested target
+        if lookup is None or not response or metadata.get("routing", {}).get("fallback_used"):
+            return
+        try:
+            await llm_semantic_cache.put(lookup, config, response, generation_seconds)
+        except Exception as e:
+            print(f"Semantic cache store failed: {e}")
+            llm_semantic_cache.record_error(lookup.route)
+    
+    def _shared(
+        self,
+        prompt: str,
+        config: LLMConfig,
+        system_prompt: Optional[str],
+        cache_key: Optional[str],
+        use_cache: bool,
+        routing: Tuple[Optional[List[str]], Optional[bool]],
+        source: Callable[[Dict[str, Any]], AsyncGenerator[str, None]]
+    ) -> Tuple[AsyncGenerator[str, None], Dict[str, Any], bool]:
+        """(chunks, metadata, joined) for source(metadata), shared with identical requests in flight.
+
+        use_cache=False asks for a fresh provider call, so it is never shared.
+        Sampled (temperature > 0) requests are shared unless
+        LLM_COALESCE_SAMPLED is off; the response cache has its own rule.
+        Requests with different fallbacks or hedging never share a flight.
+        """
+        sampled = config.temperature > 0
+        if not (settings.LLM_COALESCE_ENABLED and use_cache and (settings.LLM_COALESCE_SAMPLED or not sampled)):
+            metadata = {}
+            return source(metadata), metadata, False
+        key = cache_key or llm_response_cache.key(config, prompt, system_prompt)
+        fallbacks, hedge = routing
+        if fallbacks is not None or hedge is not None:
+            key = f"{key}:{json.dumps([fallbacks, hedge])}"
+        flight, joined = llm_request_coalescer.join(key, config.provider.value, source)
+        return flight.subscribe(), flight.metadata, joined
+    
+    def _admit(self, prompt: str, config: LLMConfig, system_prompt: Optional[str]):
+        """Admission for one provider call; reserves the prompt plus max_tokens"""
+        if not settings.LLM_ADMISSION_ENABLED:
+            return nullcontext()
+        return llm_admission.admit(
+            config.provider.value,
+            config.model_name,
+            estimate_tokens(system_prompt, prompt) + config.max_tokens
+        )
+    
+    async def _ensure_provider(self, config: LLMConfig):
+        if config.provider == LLMProvider.HUGGINGFACE:
+            return  # Local models are loaded per model name by local_model_registry on use
+        if config.provider == LLMProvider.LOCAL:
+            return  # The mock provider needs no client
+        # Initialize provider if not already initialized
+        if config.provider not in self.providers:
+            initialized = await self.initialize_provider(config)
+            if not initialized:
+                raise RuntimeError(f"Failed to initialize {config.provider.value} client")
+    
     async def generate_text(
         self, 
         prompt: str, 
         config: Optional[LLMConfig] = None,
-        system_prompt: Optional[str] = None
+        system_prompt: Optional[str] = None,
+        use_cache: bool = True,
+        semantic_route: Optional[str] = None
     ) -> str:
-        """Generate text using specified or default LLM"""
+        """Generate text using specified or default LLM.
+
+        Deterministic requests are answered from the response cache when
+        possible; pass use_cache=False to always call the provider. Identical
+        concurrent requests share one provider call unless use_cache is False. Raises AdmissionRejected
+        when the provider has no capacity within the admission deadline.
+        """
+        try:
+            result = await self.generate(prompt, config, system_prompt, use_cache, semantic_route=semantic_route)
+            return result.text
+        except AdmissionRejected:
+            # Backpressure is for the caller to handle, e.g. as HTTP 429
+            raise
+        except Exception as e:
+            return f"Error generating text: {str(e)}"
+    
+    async def generate(
+        self,
+        prompt: str,
+        config: Optional[LLMConfig] = None,
+        system_prompt: Optional[str] = None,
+        use_cache: bool = True,
+        fallbacks: Optional[List[str]] = None,
+        hedge: Optional[bool] = None,
+        semantic_route: Optional[str] = None
+    ) -> LLMResult:
+        """Generate text and report how it was served; errors are raised.
+
+        The provider call goes through the router, which retries transient
+        errors, falls back to other "provider/model" targets (fallbacks
+        overrides LLM_ROUTER_FALLBACKS) and optionally hedges slow calls.
+        With semantic_route set and LLM_SEMANTIC_CACHE_ENABLED, an exact
+        cache miss is looked up in the semantic cache under that route's
+        similarity threshold. The result metadata holds the cache outcome,
+        whether the request joined one in flight, and the routing decision.
+        """
         config = config or self.default_config
         
-        # Initialize provider if not already initialized
-        if config.provider not in self.providers:
-            initialized = await self.initialize_provider(config)
-            if not initialized:
-                return f"Error generating text: Failed to initialize {config.provider.value} client"
+        cache_key, cached = await self._cache_lookup(prompt, config, system_prompt, use_cache)
+        if cached is not None:
+            return LLMResult(cached, {"cache": "hit"})
+        semantic = await self._semantic_lookup(semantic_route, prompt, config, system_prompt, use_cache)
+        if semantic is not None and semantic.hit:
+            return LLMResult(semantic.response, {"cache": "semantic_hit", "similarity": round(semantic.similarity, 4)})
         
+        start_time = time.perf_counter()
+        chunks, metadata, joined = self._shared(
+            prompt, config, system_prompt, cache_key, use_cache, (fallbacks, hedge),
+            lambda metadata: self._complete(prompt, config, system_prompt, cache_key, metadata, fallbacks, hedge)
+        )
+        text = "".join([chunk async for chunk in chunks])
+        if not joined:
+            await self._semantic_store(semantic, config, text, time.perf_counter() - start_time, metadata)
+        return LLMResult(text, {"cache": "miss" if cache_key else "bypass", "coalesced": joined, **metadata})
+    
+    async def _complete(
+        self,
+        prompt: str,
+        config: LLMConfig,
+        system_prompt: Optional[str],
+        cache_key: Optional[str],
+        metadata: Dict[str, Any],
+        fallbacks: Optional[List[str]] = None,
+        hedge: Optional[bool] = None
+    ) -> AsyncGenerator[str, None]:
+        """Route one completion and yield the whole response as a single chunk"""
+        decision = RoutingDecision(target_name(config))
+        start_time = time.perf_counter()
         try:
-            if config.provider == LLMProvider.OPENAI:
-                return await self._generate_openai(prompt, config, system_prompt)
-            elif config.provider == LLMProvider.ANTHROPIC:
-                return await self._generate_anthropic(prompt, config, system_prompt)
-            elif config.provider == LLMProvider.HUGGINGFACE:
-                return await self._generate_huggingface(prompt, config)
-            else:
-                raise ValueError(f"Unsupported provider: {config.provider}")
-        except Exception as e:
-            return f"Error generating text: {str(e)}"
+            response = await llm_router.complete(
+                lambda target: self._attempt(prompt, target, system_prompt),
+                config, decision, fallbacks, hedge
+            )
+        finally:
+            metadata["routing"] = decision.to_dict()
+        
+        # Errors are raised above, so only real completions are cached, and
+        # only the requested target's answers go under its key
+        if cache_key is not None and response is not None and not decision.fallback_used:
+            await llm_response_cache.put(cache_key, response, time.perf_counter() - start_time)
+        if response is not None:
+            yield response
     
-    async def _generate_openai(self, prompt: str, config: LLMConfig, system_prompt: Optional[str]) -> str:
+    async def _attempt(self, prompt: str, config: LLMConfig, system_prompt: Optional[str]) -> Optional[str]:
+        """Call one provider/model once"""
+        await self._ensure_provider(config)
+        
+        with observe_llm_call(config) as call:
+            async with self._admit(prompt, config, system_prompt) as permit:
+                call.admitted(permit)
+                if config.provider == LLMProvider.OPENAI:
+                    response = await self._generate_openai(prompt, config, system_prompt, call)
+                elif config.provider == LLMProvider.ANTHROPIC:
+                    response = await self._generate_anthropic(prompt, config, system_prompt, call)
+                elif config.provider == LLMProvider.HUGGINGFACE:
+                    response = await self._generate_huggingface(prompt, config, call)
+                elif config.provider == LLMProvider.LOCAL:
+                    response = await mock_llm_provider.generate(prompt, config, system_prompt, call)
+                else:
+                    raise ValueError(f"Unsupported provider: {config.provider}")
+                if permit is not None:
+                    permit.settle(estimate_tokens(system_prompt, prompt, response))
+        return response
+    
+    async def _generate_openai(
+        self,
+        prompt: str,
+        config: LLMConfig,
+        system_prompt: Optional[str],
+        call: Optional[LLMCall] = None
+    ) -> str:
         """Generate text using OpenAI"""
         client = self.providers.get(LLMProvider.OPENAI)
         if not client:
@@ -116,12 +328,21 @@ class LLMService:
             messages=messages,
             temperature=config.temperature,
             max_tokens=config.max_tokens,
-            top_p=config.top_p
+            top_p=config.top_p,
+            extra_headers=call.trace_headers if call else None
         )
         
+        if call is not None and response.usage is not None:
+            call.record_usage(response.usage.prompt_tokens, response.usage.completion_tokens)
         return response.choices[0].message.content
     
-    async def _generate_anthropic(self, prompt: str, config: LLMConfig, system_prompt: Optional[str]) -> str:
+    async def _generate_anthropic(
+        self,
+        prompt: str,
+        config: LLMConfig,
+        system_prompt: Optional[str],
+        call: Optional[LLMCall] = None
+    ) -> str:
         """Generate text using Anthropic Claude"""
         client = self.providers.get(LLMProvider.ANTHROPIC)
         if not client:
@@ -129,66 +350,296 @@ class LLMService:
         
         full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
         
-        response = await asyncio.to_thread(
-            client.messages.create,
+        response = await client.messages.create(
             model=config.model_name,
             max_tokens=config.max_tokens,
             temperature=config.temperature,
-            messages=[{"role": "user", "content": full_prompt}]
+            messages=[{"role": "user", "content": full_prompt}],
+            extra_headers=call.trace_headers if call else None
         )
         
+        if call is not None:
+            call.record_usage(response.usage.input_tokens, response.usage.output_tokens)
         return response.content[0].text
     
-    async def _generate_huggingface(self, prompt: str, config: LLMConfig) -> str:
+    async def _generate_huggingface(self, prompt: str, config: LLMConfig, call: Optional[LLMCall] = None) -> str:
         """Generate text using Hugging Face models"""
-        pipeline = self.providers.get(LLMProvider.HUGGINGFACE)
-        if not pipeline:
-            raise ValueError("Hugging Face pipeline not initialized")
+        async with local_model_registry.use(ModelKey.for_config(config)) as model:
+            if model.batcher is not None:
+                completion = await model.batcher.generate(prompt, config.max_tokens, config.temperature, config.top_p)
+                _record_local_usage(call, model.generator.tokenizer, prompt, completion)
+                # Same shape as the pipeline's output, which starts with the prompt
+                return prompt + completion
+            
+            result = await asyncio.to_thread(
+                model.generator,
+                prompt,
+                max_new_tokens=config.max_tokens,
+                **_sampling_kwargs(config)
+            )
         
-        result = await asyncio.to_thread(
-            pipeline,
-            prompt,
-            max_length=config.max_tokens,
-            temperature=config.temperature,
-            do_sample=True,
-            top_p=config.top_p
-        )
-        
-        return result[0]['generated_text']
+        text = result[0]['generated_text']
+        _record_local_usage(call, model.generator.tokenizer, prompt, text[len(prompt):])
+        return text
     
     async def generate_stream(
         self, 
         prompt: str, 
-        config: Optional[LLMConfig] = None
+        config: Optional[LLMConfig] = None,
+        system_prompt: Optional[str] = None,
+        use_cache: bool = True,
+        fallbacks: Optional[List[str]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        semantic_route: Optional[str] = None
     ) -> AsyncGenerator[str, None]:
-        """Generate streaming text response"""
+        """Generate a response incrementally, yielding text as the provider produces it.
+
+        Errors are raised rather than returned as text. A request identical to
+        one in flight attaches to it and first replays the text produced so
+        far. Closing the generator (e.g. when an SSE client disconnects)
+        cancels the upstream generation once no other request is attached.
+        Fallback happens only before the first chunk. When a metadata dict
+        is passed, it is filled in as in generate() once the stream ends.
+        semantic_route enables the semantic cache as in generate().
+        """
         config = config or self.default_config
+        metadata = {} if metadata is None else metadata
+        
+        cache_key, cached = await self._cache_lookup(prompt, config, system_prompt, use_cache)
+        if cached is not None:
+            metadata["cache"] = "hit"
+            yield cached
+            return
+        semantic = await self._semantic_lookup(semantic_route, prompt, config, system_prompt, use_cache)
+        if semantic is not None and semantic.hit:
+            metadata.update(cache="semantic_hit", similarity=round(semantic.similarity, 4))
+            yield semantic.response
+            return
         
-        if config.provider == LLMProvider.OPENAI:
-            async for chunk in self._stream_openai(prompt, config):
+        chunks, flight_metadata, joined = self._shared(
+            prompt, config, system_prompt, cache_key, use_cache, (fallbacks, None),
+            lambda flight_metadata: self._stream(prompt, config, system_prompt, cache_key, flight_metadata, fallbacks)
+        )
+        metadata.update(cache="miss" if cache_key else "bypass", coalesced=joined)
+        start_time = time.perf_counter()
+        text = []
+        try:
+            async for chunk in chunks:
+                text.append(chunk)
                 yield chunk
-        else:
-            # For non-streaming providers, yield the complete response
-            response = await self.generate_text(prompt, config)
-            yield response
+            # Only reached when the stream completed
+            if not joined:
+                await self._semantic_store(
+                    semantic, config, "".join(text), time.perf_counter() - start_time, flight_metadata
+                )
+        finally:
+            await chunks.aclose()
+            metadata.update(flight_metadata)
+    
+    async def _stream(
+        self,
+        prompt: str,
+        config: LLMConfig,
+        system_prompt: Optional[str],
+        cache_key: Optional[str],
+        metadata: Dict[str, Any],
+        fallbacks: Optional[List[str]] = None
+    ) -> AsyncGenerator[str, None]:
+        """Route one stream and cache the completed response"""
+        decision = RoutingDecision(target_name(config))
+        stream = llm_router.stream(
+            lambda target: self._attempt_stream(prompt, target, system_prompt),
+            config, decision, fallbacks
+        )
+        chunks = []
+        start_time = time.perf_counter()
+        try:
+            async for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            await stream.aclose()
+            metadata["routing"] = decision.to_dict()
+        
+        # Only reached when the stream completed, so partial output is never cached
+        if cache_key is not None and not decision.fallback_used:
+            await llm_response_cache.put(cache_key, "".join(chunks), time.perf_counter() - start_time)
+    
+    async def _attempt_stream(
+        self,
+        prompt: str,
+        config: LLMConfig,
+        system_prompt: Optional[str]
+    ) -> AsyncGenerator[str, None]:
+        """Stream non-empty chunks from one provider/model"""
+        await self._ensure_provider(config)
+        
+        with observe_llm_call(config, streaming=True) as call:
+            if config.provider == LLMProvider.OPENAI:
+                stream = self._stream_openai(prompt, config, system_prompt, call)
+            elif config.provider == LLMProvider.ANTHROPIC:
+                stream = self._stream_anthropic(prompt, config, system_prompt, call)
+            elif config.provider == LLMProvider.HUGGINGFACE:
+                stream = self._stream_huggingface(prompt, config, call)
+            elif config.provider == LLMProvider.LOCAL:
+                stream = mock_llm_provider.stream(prompt, config, system_prompt, call)
+            else:
+                raise ValueError(f"Unsupported provider: {config.provider}")
+            
+            chunks = []
+            try:
+                # The concurrency slot is held until the stream ends or is closed
+                async with self._admit(prompt, config, system_prompt) as permit:
+                    call.admitted(permit)
+                    async for chunk in stream:
+                        if chunk:
+                            call.first_token()
+                            chunks.append(chunk)
+                            yield chunk
+                    if permit is not None:
+                        permit.settle(estimate_tokens(system_prompt, prompt, *chunks))
+            finally:
+                await stream.aclose()
     
-    async def _stream_openai(self, prompt: str, config: LLMConfig) -> AsyncGenerator[str, None]:
+    async def _stream_openai(
+        self,
+        prompt: str,
+        config: LLMConfig,
+        system_prompt: Optional[str] = None,
+        call: Optional[LLMCall] = None
+    ) -> AsyncGenerator[str, None]:
         """Stream text from OpenAI"""
         client = self.providers.get(LLMProvider.OPENAI)
         if not client:
             raise ValueError("OpenAI client not initialized")
         
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        
         stream = await client.chat.completions.create(
             model=config.model_name,
-            messages=[{"role": "user", "content": prompt}],
+            messages=messages,
             temperature=config.temperature,
             max_tokens=config.max_tokens,
-            stream=True
+            top_p=config.top_p,
+            stream=True,
+            # Token counts arrive in a final chunk without choices
+            stream_options={"include_usage": True},
+            extra_headers=call.trace_headers if call else None
         )
         
-        async for chunk in stream:
-            if chunk.choices[0].delta.content:
-                yield chunk.choices[0].delta.content
+        try:
+            async for chunk in stream:
+                if chunk.usage is not None and call is not None:
+                    call.record_usage(chunk.usage.prompt_tokens, chunk.usage.completion_tokens)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Closes the HTTP response, which aborts generation upstream
+            await stream.close()
+    
+    async def _stream_anthropic(
+        self,
+        prompt: str,
+        config: LLMConfig,
+        system_prompt: Optional[str] = None,
+        call: Optional[LLMCall] = None
+    ) -> AsyncGenerator[str, None]:
+        """Stream text from Anthropic Claude"""
+        client = self.providers.get(LLMProvider.ANTHROPIC)
+        if not client:
+            raise ValueError("Anthropic client not initialized")
+        
+        full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
+        
+        async with client.messages.stream(
+            model=config.model_name,
+            max_tokens=config.max_tokens,
+            temperature=config.temperature,
+            messages=[{"role": "user", "content": full_prompt}],
+            extra_headers=call.trace_headers if call else None
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+            if call is not None:
+                usage = (await stream.get_final_message()).usage
+                call.record_usage(usage.input_tokens, usage.output_tokens)
+    
+    async def _stream_huggingface(
+        self,
+        prompt: str,
+        config: LLMConfig,
+        call: Optional[LLMCall] = None
+    ) -> AsyncGenerator[str, None]:
+        """Stream text from a local Hugging Face model, held in the registry until the stream ends"""
+        async with local_model_registry.use(ModelKey.for_config(config)) as model:
+            if model.batcher is not None:
+                stream = model.batcher.stream(prompt, config.max_tokens, config.temperature, config.top_p)
+            else:
+                stream = self._stream_pipeline(model.generator, prompt, config)
+            completion = []
+            try:
+                async for text in stream:
+                    completion.append(text)
+                    yield text
+            finally:
+                await stream.aclose()
+            _record_local_usage(call, model.generator.tokenizer, prompt, "".join(completion))
+    
+    async def _stream_pipeline(self, pipeline, prompt: str, config: LLMConfig) -> AsyncGenerator[str, None]:
+        """Stream text from a Hugging Face pipeline running in a worker thread"""
+        streamer = TextIteratorStreamer(pipeline.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        cancelled = threading.Event()
+        sampling = _sampling_kwargs(config)
+        
+        def generate():
+            try:
+                pipeline(
+                    prompt,
+                    streamer=streamer,
+                    max_new_tokens=config.max_tokens,
+                    # Checked after every token, so closing the stream stops generation
+                    stopping_criteria=StoppingCriteriaList([lambda input_ids, scores, **kwargs: cancelled.is_set()]),
+                    **sampling
+                )
+            finally:
+                streamer.end()
+        
+        generation = asyncio.create_task(asyncio.to_thread(generate))
+        tokens = iter(streamer)
+        try:
+            while True:
+                # The streamer's queue blocks, so each read happens off the event loop
+                text = await asyncio.to_thread(next, tokens, None)
+                if text is None:
+                    break
+                yield text
+            await generation
+        finally:
+            cancelled.set()
+            if not generation.done():
+                generation.add_done_callback(_discard_result)
+
+def _sampling_kwargs(config: LLMConfig) -> Dict[str, Any]:
+    """Pipeline sampling arguments; temperature 0 means greedy decoding, as in the batch scheduler"""
+    if config.temperature > 0:
+        return {"do_sample": True, "temperature": config.temperature, "top_p": config.top_p}
+    return {"do_sample": False}
+
+def _record_local_usage(call: Optional[LLMCall], tokenizer, prompt: str, completion: str):
+    """Local models report no usage, so count tokens with the model's tokenizer"""
+    if call is not None:
+        call.record_usage(
+            len(tokenizer(prompt)["input_ids"]),
+            len(tokenizer(completion, add_special_tokens=False)["input_ids"])
+        )
+
+def _discard_result(task: asyncio.Task):
+    """Retrieve the outcome of an abandoned background task so it is not logged"""
+    if not task.cancelled():
+        task.exception()
 
 # AI Code Generation Service
 class CodeGenerationService(LLMService):
@@ -237,24 +688,18 @@ Code:
 """
         }
     
-    async def generate_code(
-        self, 
-        task_description: str, 
-        code_type: str = "python_ml",
-        language: str = "python"
-    ) -> str:
-        """Generate code based on task description"""
+    def _code_prompts(self, task_description: str, code_type: str, language: str) -> Tuple[str, str]:
+        """Build the (prompt, system prompt) pair for code generation"""
         template = self.code_templates.get(code_type, self.code_templates["python_ml"])
         prompt = template.format(task_description=task_description)
         
         system_prompt = f"""You are an expert {language} programmer specializing in ML and data engineering.
 Generate clean, efficient, and well-documented code.
 Follow best practices and include proper error handling."""
-        
-        return await self.generate_text(prompt, system_prompt=system_prompt)
+        return prompt, system_prompt
     
-    async def explain_code(self, code: str) -> str:
-        """Generate explanation for existing code"""
+    def _explain_prompts(self, code: str) -> Tuple[str, str]:
+        """Build the (prompt, system prompt) pair for code explanation"""
         prompt = f"""
 Explain this code in detail:
 
@@ -270,7 +715,39 @@ Provide:
 """
         
         system_prompt = "You are a code reviewer and teacher. Explain code clearly and thoroughly."
-        return await self.generate_text(prompt, system_prompt=system_prompt)
+        return prompt, system_prompt
+    
+    async def generate_code(
+        self, 
+        task_description: str, 
+        code_type: str = "python_ml",
+        language: str = "python",
+        use_cache: bool = True
+    ) -> str:
+        """Generate code based on task description"""
+        prompt, system_prompt = self._code_prompts(task_description, code_type, language)
+        return await self.generate_text(prompt, system_prompt=system_prompt, use_cache=use_cache)
+    
+    def stream_code(
+        self,
+        task_description: str,
+        code_type: str = "python_ml",
+        language: str = "python",
+        use_cache: bool = True
+    ) -> AsyncGenerator[str, None]:
+        """Stream generated code as it is produced"""
+        prompt, system_prompt = self._code_prompts(task_description, code_type, language)
+        return self.generate_stream(prompt, system_prompt=system_prompt, use_cache=use_cache)
+    
+    async def explain_code(self, code: str, use_cache: bool = True) -> str:
+        """Generate explanation for existing code"""
+        prompt, system_prompt = self._explain_prompts(code)
+        return await self.generate_text(prompt, system_prompt=system_prompt, use_cache=use_cache)
+    
+    def stream_explanation(self, code: str, use_cache: bool = True) -> AsyncGenerator[str, None]:
+        """Stream an explanation of existing code as it is produced"""
+        prompt, system_prompt = self._explain_prompts(code)
+        return self.generate_stream(prompt, system_prompt=system_prompt, use_cache=use_cache)
 
 # Global service instance
 llm_service = LLMService()
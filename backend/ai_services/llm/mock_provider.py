@@ -0,0 +1,186 @@
+"""
+Mock LLM provider for LuminaOps load tests
+Serves the "local" provider without a model or network: each call waits a
+time to first token drawn from a configurable latency distribution, then
+produces tokens at a fixed rate, so /ai/llm/* and /ai/assistant/* can be
+load-tested through the full service stack (caches, coalescing, admission,
+routing, instrumentation) without provider costs or rate limits. A share of
+calls can fail with rate-limit, server, timeout or mid-response errors that
+the router treats like the real providers' ones.
+"""
+
+from typing import Dict, Any, List, Optional, AsyncGenerator
+from dataclasses import dataclass, field, asdict, replace
+import asyncio
+import hashlib
+import math
+import random
+
+from core.config import settings
+from ai_services.llm.admission import estimate_tokens
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+ERROR_TYPES = ("rate_limit", "server", "timeout", "interrupted")
+
+# Words of generated completions; one per token
+VOCABULARY = (
+    "model data feature training pipeline accuracy loss batch epoch metric vector "
+    "latency inference dataset label gradient weight layer score cluster"
+).split()
+
+class MockProviderError(Exception):
+    """Injected provider failure; status_code drives retries like an SDK error"""
+
+    def __init__(self, status_code: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"Mock provider error {status_code}: {message}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+@dataclass
+class MockProfile:
+    latency_distribution: str = "lognormal"
+    latency_ms: float = 300.0  # Mean time to first token
+    latency_jitter_ms: float = 100.0  # Standard deviation; half-width for uniform, unused by fixed and exponential
+    tokens_per_second: float = 50.0
+    completion_tokens: int = 64
+    error_rate: float = 0.0
+    error_types: List[str] = field(default_factory=lambda: list(ERROR_TYPES))
+
+    def validate(self) -> "MockProfile":
+        if self.latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown latency distribution {self.latency_distribution!r}; "
+                f"expected one of {', '.join(LATENCY_DISTRIBUTIONS)}"
+            )
+        if self.latency_ms < 0 or self.latency_jitter_ms < 0:
+            raise ValueError("latency_ms and latency_jitter_ms must not be negative")
+        if self.tokens_per_second <= 0:
+            raise ValueError("tokens_per_second must be positive")
+        if self.completion_tokens < 1:
+            raise ValueError("completion_tokens must be at least 1")
+        if not 0 <= self.error_rate <= 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        unknown = [name for name in self.error_types if name not in ERROR_TYPES]
+        if unknown or (self.error_rate > 0 and not self.error_types):
+            raise ValueError(f"error_types must be a non-empty subset of {', '.join(ERROR_TYPES)}")
+        return self
+
+class MockLLMProvider:
+    """Simulated provider with sampled latency, paced tokens and injected errors"""
+
+    def __init__(self, profile: MockProfile, seed: Optional[int] = None):
+        self.profile = profile.validate()
+        self._random = random.Random(seed)
+        self.calls = 0
+        self.completion_tokens = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.errors: Dict[str, int] = {name: 0 for name in ERROR_TYPES}
+
+    def configure(self, **changes) -> MockProfile:
+        """Replace profile fields; raises ValueError and keeps the old profile if the result is invalid"""
+        unknown = set(changes) - set(asdict(self.profile))
+        if unknown:
+            raise ValueError(f"Unknown mock profile fields: {', '.join(sorted(unknown))}")
+        self.profile = replace(self.profile, **changes).validate()
+        return self.profile
+
+    def sample_latency(self) -> float:
+        """Seconds to the first token"""
+        profile = self.profile
+        mean, jitter = profile.latency_ms, profile.latency_jitter_ms
+        if profile.latency_distribution == "uniform":
+            latency = self._random.uniform(mean - jitter, mean + jitter)
+        elif profile.latency_distribution == "normal":
+            latency = self._random.gauss(mean, jitter)
+        elif profile.latency_distribution == "lognormal" and mean > 0:
+            # Parameters of the underlying normal giving this mean and standard deviation
+            sigma = math.sqrt(math.log(1 + (jitter / mean) ** 2))
+            latency = self._random.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+        elif profile.latency_distribution == "exponential" and mean > 0:
+            latency = self._random.expovariate(1 / mean)
+        else:
+            latency = mean
+        return max(0.0, latency) / 1000
+
+    def _tokens(self, prompt: str, config, system_prompt: Optional[str]) -> List[str]:
+        count = min(self.profile.completion_tokens, config.max_tokens)
+        if config.temperature > 0:
+            words = self._random
+        else:
+            # Greedy decoding: the same request always gets the same completion
+            digest = hashlib.sha256(f"{config.model_name}\0{system_prompt or ''}\0{prompt}".encode("utf-8")).digest()
+            words = random.Random(digest)
+        return [f"{words.choice(VOCABULARY)} " for _ in range(count)]
+
+    def _injected_error(self) -> Optional[str]:
+        if self.profile.error_rate and self._random.random() < self.profile.error_rate:
+            return self._random.choice(self.profile.error_types)
+        return None
+
+    async def stream(
+        self,
+        prompt: str,
+        config,
+        system_prompt: Optional[str] = None,
+        call=None
+    ) -> AsyncGenerator[str, None]:
+        """Yield the completion token by token at the profile's rate"""
+        self.calls += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            error = self._injected_error()
+            if error is not None:
+                self.errors[error] += 1
+            if error == "rate_limit":
+                raise MockProviderError(429, "Rate limit exceeded", retry_after=1.0)
+            await asyncio.sleep(self.sample_latency())
+            if error == "server":
+                raise MockProviderError(500, "Internal server error")
+            if error == "timeout":
+                raise asyncio.TimeoutError("Mock provider timed out")
+
+            tokens = self._tokens(prompt, config, system_prompt)
+            interval = 1 / self.profile.tokens_per_second
+            # Interrupted responses break off halfway through
+            stop = len(tokens) // 2 if error == "interrupted" else len(tokens)
+            for index, token in enumerate(tokens[:stop]):
+                if index:
+                    await asyncio.sleep(interval)
+                self.completion_tokens += 1
+                yield token
+            if error == "interrupted":
+                raise MockProviderError(502, "Connection interrupted mid-response")
+            if call is not None:
+                call.record_usage(estimate_tokens(system_prompt, prompt), len(tokens))
+        finally:
+            self.in_flight -= 1
+
+    async def generate(self, prompt: str, config, system_prompt: Optional[str] = None, call=None) -> str:
+        """The whole completion, returned once its last token has been produced"""
+        return "".join([token async for token in self.stream(prompt, config, system_prompt, call)])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "profile": asdict(self.profile),
+            "calls": self.calls,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "completion_tokens": self.completion_tokens,
+            "injected_errors": dict(self.errors)
+        }
+
+# Global mock provider backing LLMProvider.LOCAL
+mock_llm_provider = MockLLMProvider(
+    MockProfile(
+        latency_distribution=settings.LLM_MOCK_LATENCY_DISTRIBUTION,
+        latency_ms=settings.LLM_MOCK_LATENCY_MS,
+        latency_jitter_ms=settings.LLM_MOCK_LATENCY_JITTER_MS,
+        tokens_per_second=settings.LLM_MOCK_TOKENS_PER_SECOND,
+        completion_tokens=settings.LLM_MOCK_COMPLETION_TOKENS,
+        error_rate=settings.LLM_MOCK_ERROR_RATE,
+        error_types=list(settings.LLM_MOCK_ERROR_TYPES)
+    ),
+    seed=settings.LLM_MOCK_SEED
+)
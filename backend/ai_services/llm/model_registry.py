@@ -0,0 +1,259 @@
+"""
+Local LLM registry for LuminaOps
+Hugging Face text-generation models are keyed by (provider, model name,
+dtype), so different models and precisions are served side by side instead of
+the first loaded model answering for every name. Models load lazily in a
+worker thread, and concurrent requests for a model that is still loading wait
+for that one load. Loaded models are kept in LRU order; the least recently
+used idle models are unloaded when resident weights exceed the memory budget.
+"""
+
+from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+import asyncio
+import gc
+import time
+
+from core.config import settings
+from core.monitoring import record_llm_model_load, record_llm_model_unload
+from ai_services.llm.batching import LocalBatchScheduler
+
+try:
+    import torch
+    from transformers import pipeline
+except ImportError as e:
+    print(f"Warning: Some AI libraries not installed: {e}")
+
+# "int8" is dynamic int8 quantization of the Linear layers, which runs on the CPU
+DTYPES = ("float32", "float16", "bfloat16", "int8")
+
+@dataclass(frozen=True)
+class ModelKey:
+    provider: str
+    model_name: str
+    dtype: str
+
+    @property
+    def name(self) -> str:
+        return f"{self.provider}/{self.model_name}@{self.dtype}"
+
+    @classmethod
+    def create(cls, provider: str, model_name: str, dtype: Optional[str] = None) -> "ModelKey":
+        dtype = dtype or settings.LLM_LOCAL_DTYPE
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported dtype {dtype!r}; expected one of {', '.join(DTYPES)}")
+        return cls(provider, model_name, dtype)
+
+    @classmethod
+    def for_config(cls, config) -> "ModelKey":
+        return cls.create(config.provider.value, config.model_name, config.dtype)
+
+    @classmethod
+    def parse(cls, spec: str, provider: str = "huggingface") -> "ModelKey":
+        """Key for "model_name" or "model_name@dtype" """
+        model_name, _, dtype = spec.partition("@")
+        return cls.create(provider, model_name, dtype or None)
+
+class LocalModel:
+    """A loaded text-generation pipeline and its batch scheduler"""
+
+    def __init__(self, key: ModelKey, generator, batcher: Optional[LocalBatchScheduler], load_seconds: float, memory_bytes: int):
+        self.key = key
+        self.generator = generator
+        self.batcher = batcher
+        self.load_seconds = load_seconds
+        self.memory_bytes = memory_bytes
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+        self.in_use = 0  # Requests holding the model; it is never evicted while in use
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "provider": self.key.provider,
+            "model_name": self.key.model_name,
+            "dtype": self.key.dtype,
+            "load_seconds": round(self.load_seconds, 3),
+            "memory_bytes": self.memory_bytes,
+            "loaded_at": self.loaded_at,
+            "last_used": self.last_used,
+            "in_use": self.in_use
+        }
+
+def _load_pipeline(key: ModelKey):
+    if key.dtype == "int8":
+        generator = pipeline("text-generation", model=key.model_name, torch_dtype=torch.float32, device="cpu")
+        torch.quantization.quantize_dynamic(generator.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        return generator
+    return pipeline(
+        "text-generation",
+        model=key.model_name,
+        torch_dtype=getattr(torch, key.dtype),
+        device_map="auto"
+    )
+
+def _model_bytes(model) -> int:
+    """Resident size of the model weights and buffers, counting shared tensors once"""
+    seen = set()
+    total = 0
+    for module in model.modules():
+        tensors = list(module.parameters(recurse=False)) + list(module.buffers(recurse=False))
+        weight = getattr(module, "weight", None)
+        if callable(weight):
+            # Dynamically quantized layers keep packed int8 weights outside the parameters
+            tensors.append(weight())
+        for tensor in tensors:
+            if tensor.data_ptr() not in seen:
+                seen.add(tensor.data_ptr())
+                total += tensor.numel() * tensor.element_size()
+    return total
+
+class LocalModelRegistry:
+    """Loads, shares and evicts local text-generation models"""
+
+    def __init__(
+        self,
+        memory_budget_bytes: int,
+        batching: bool = True,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0
+    ):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.batching = batching
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._models: "OrderedDict[ModelKey, LocalModel]" = OrderedDict()  # Least recently used first
+        self._loading: Dict[ModelKey, asyncio.Task] = {}
+        self._waiters: Dict[ModelKey, int] = {}  # use() callers awaiting each load, pinned by _load
+        self._known_bytes: Dict[ModelKey, int] = {}  # Sizes of models loaded before, to make room up front
+        self.loads = 0
+        self.evictions = 0
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(model.memory_bytes for model in self._models.values())
+
+    async def get(self, key: ModelKey) -> LocalModel:
+        """Return the loaded model for key, loading it if needed"""
+        model = await self._pin(key)
+        model.in_use -= 1
+        return model
+
+    async def _pin(self, key: ModelKey) -> LocalModel:
+        """Return the model for key with in_use already taken for the caller.
+
+        A freshly loaded model is pinned by _load before it becomes visible, so
+        a load of another model starting before the waiter resumes cannot evict it.
+        """
+        model = self._models.get(key)
+        if model is not None:
+            self._models.move_to_end(key)
+            model.in_use += 1
+            return model
+        task = self._loading.get(key)
+        if task is None:
+            task = self._loading[key] = asyncio.create_task(self._load(key))
+            task.add_done_callback(lambda _: self._loading.pop(key, None))
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            # A caller that gives up must not cancel a load others are waiting for
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done():
+                self._waiters[key] -= 1
+            elif not task.cancelled() and task.exception() is None:
+                task.result().in_use -= 1  # Loaded and pinned before the cancellation arrived
+            raise
+
+    @asynccontextmanager
+    async def use(self, key: ModelKey):
+        """Hold a model for the duration of the block so it cannot be evicted"""
+        model = await self._pin(key)
+        try:
+            yield model
+        finally:
+            model.in_use -= 1
+            model.last_used = time.time()
+
+    async def _load(self, key: ModelKey) -> LocalModel:
+        self._evict_over_budget(incoming_bytes=self._known_bytes.get(key, 0))
+        start = time.perf_counter()
+        try:
+            generator = await asyncio.to_thread(_load_pipeline, key)
+        except BaseException:
+            self._waiters.pop(key, None)
+            raise
+        load_seconds = time.perf_counter() - start
+        memory_bytes = _model_bytes(generator.model)
+        batcher = LocalBatchScheduler(
+            generator.model,
+            generator.tokenizer,
+            key.name,
+            max_batch_size=self.max_batch_size,
+            max_wait_ms=self.max_wait_ms
+        ) if self.batching else None
+
+        model = LocalModel(key, generator, batcher, load_seconds, memory_bytes)
+        model.in_use = self._waiters.pop(key, 0)
+        self._models[key] = model
+        self._known_bytes[key] = memory_bytes
+        self.loads += 1
+        record_llm_model_load(key.model_name, key.dtype, load_seconds, memory_bytes)
+        self._evict_over_budget(keep=key)
+        return model
+
+    def _evict_over_budget(self, incoming_bytes: int = 0, keep: Optional[ModelKey] = None):
+        """Unload idle models, least recently used first, until the budget holds"""
+        for key in list(self._models):
+            if self.resident_bytes + incoming_bytes <= self.memory_budget_bytes:
+                return
+            if key != keep and self._models[key].in_use == 0:
+                self.unload(key, reason="evicted")
+                self.evictions += 1
+        if self.resident_bytes + incoming_bytes > self.memory_budget_bytes:
+            print(f"Warning: local models use {self.resident_bytes} bytes, over the {self.memory_budget_bytes} byte budget")
+
+    def unload(self, key: ModelKey, reason: str = "manual"):
+        """Release a loaded model; raises KeyError if it is not loaded"""
+        model = self._models[key]
+        if model.in_use:
+            raise RuntimeError(f"{key.name} is serving {model.in_use} request(s)")
+        del self._models[key]
+        if model.batcher is not None:
+            model.batcher.close()
+        del model
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        record_llm_model_unload(key.model_name, key.dtype, reason)
+
+    async def prewarm(self, keys: List[ModelKey]):
+        """Load models and run one short generation each, e.g. during application startup"""
+        for key in keys:
+            async with self.use(key) as model:
+                if model.batcher is not None:
+                    await model.batcher.generate("Hello", 1)
+                else:
+                    await asyncio.to_thread(model.generator, "Hello", max_new_tokens=1)
+
+    def batching_stats(self) -> Dict[str, Any]:
+        return {model.key.name: model.batcher.stats() for model in self._models.values() if model.batcher is not None}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "resident_bytes": self.resident_bytes,
+            "loading": [key.name for key in self._loading],
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "models": [model.stats() for model in reversed(self._models.values())]  # Most recently used first
+        }
+
+# Global registry shared by every LLMService instance
+local_model_registry = LocalModelRegistry(
+    memory_budget_bytes=settings.LLM_LOCAL_MEMORY_BUDGET_MB * 1024 * 1024,
+    batching=settings.LLM_LOCAL_BATCHING_ENABLED,
+    max_batch_size=settings.LLM_LOCAL_MAX_BATCH_SIZE,
+    max_wait_ms=settings.LLM_LOCAL_BATCH_WAIT_MS
+)
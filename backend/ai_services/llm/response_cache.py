@@ -0,0 +1,184 @@
+"""
+LLM response cache for LuminaOps
+Exact-match cache in front of LLMService.generate_text, keyed by provider,
+model, prompt, system prompt and sampling parameters. An in-memory LRU tier is
+backed by an optional SQLite tier that survives restarts. Only deterministic
+requests (temperature 0) are cached unless configured otherwise.
+"""
+
+from typing import Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from contextlib import closing
+from pathlib import Path
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from core.config import settings
+from core.monitoring import record_llm_cache
+
+class LLMResponseCache:
+    """Two-tier (memory LRU, optional SQLite) cache of generated responses"""
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 3600,
+        persistent_path: Optional[str] = None,
+        cache_nondeterministic: bool = False
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persistent_path = Path(persistent_path) if persistent_path else None
+        self.cache_nondeterministic = cache_nondeterministic
+        # key -> (expires_at, response, generation_seconds)
+        self._memory: "OrderedDict[str, Tuple[float, str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_ready = False
+        self.hits = {"memory": 0, "persistent": 0}
+        self.misses = 0
+        self.errors = 0  # Failed persistent tier reads and writes
+        self.saved_seconds = 0.0
+
+    def cacheable(self, config) -> bool:
+        """Sampled outputs differ per call, so only temperature 0 is cached by default"""
+        return self.cache_nondeterministic or config.temperature == 0
+
+    @staticmethod
+    def key(config, prompt: str, system_prompt: Optional[str]) -> str:
+        payload = json.dumps({
+            "provider": config.provider.value,
+            "model": config.model_name,
+            "prompt": prompt,
+            "system_prompt": system_prompt,
+            "temperature": config.temperature,
+            "max_tokens": config.max_tokens,
+            "top_p": config.top_p,
+            # Only local models have a dtype; leaving it out otherwise keeps existing keys valid
+            **({"dtype": config.dtype} if config.dtype else {})
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str, provider: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] < now:
+                del self._memory[key]
+                entry = None
+            if entry is not None:
+                self._memory.move_to_end(key)
+
+        tier = "memory"
+        if entry is None and self.persistent_path is not None:
+            tier = "persistent"
+            try:
+                entry = await asyncio.to_thread(self._db_get, key, now)
+            except Exception as e:
+                # The cache only saves provider calls, so a broken tier counts as a miss
+                self._record_error("read", e)
+            if entry is not None:
+                self._remember(key, entry)
+
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            record_llm_cache(provider, "miss")
+            return None
+
+        with self._lock:
+            self.hits[tier] += 1
+            self.saved_seconds += entry[2]
+        record_llm_cache(provider, f"hit_{tier}", saved_seconds=entry[2])
+        return entry[1]
+
+    async def put(self, key: str, response: str, generation_seconds: float):
+        entry = (time.time() + self.ttl_seconds, response, generation_seconds)
+        self._remember(key, entry)
+        if self.persistent_path is not None:
+            try:
+                await asyncio.to_thread(self._db_put, key, entry)
+            except Exception as e:
+                self._record_error("write", e)
+
+    def _record_error(self, operation: str, error: Exception):
+        print(f"LLM cache persistent {operation} failed: {error}")
+        with self._lock:
+            self.errors += 1
+
+    def _remember(self, key: str, entry: Tuple[float, str, float]):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    async def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.persistent_path is not None:
+            await asyncio.to_thread(self._db_execute, "DELETE FROM llm_responses", ())
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._db_ready:
+            self.persistent_path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.persistent_path, timeout=5)
+        if not self._db_ready:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, generation_seconds REAL NOT NULL)"
+            )
+            self._db_ready = True
+        return connection
+
+    def _db_execute(self, sql: str, params: tuple):
+        with closing(self._connect()) as connection, connection:
+            connection.execute(sql, params)
+
+    def _db_get(self, key: str, now: float) -> Optional[Tuple[float, str, float]]:
+        with closing(self._connect()) as connection, connection:
+            row = connection.execute(
+                "SELECT expires_at, response, generation_seconds FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[0] < now:
+                connection.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                row = None
+        return tuple(row) if row is not None else None
+
+    def _db_put(self, key: str, entry: Tuple[float, str, float]):
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?, ?)", (key, entry[1], entry[0], entry[2])
+            )
+            # Expired rows are otherwise only removed when read
+            connection.execute("DELETE FROM llm_responses WHERE expires_at < ?", (time.time(),))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = sum(self.hits.values()) + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "persistent": str(self.persistent_path) if self.persistent_path else None,
+                "cache_nondeterministic": self.cache_nondeterministic,
+                "hits": dict(self.hits),
+                "misses": self.misses,
+                "errors": self.errors,
+                "hit_ratio": round(sum(self.hits.values()) / lookups, 4) if lookups else 0.0,
+                "saved_seconds": round(self.saved_seconds, 3)
+            }
+
+# Global response cache shared by every LLMService instance
+llm_response_cache = LLMResponseCache(
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.LLM_CACHE_TTL,
+    persistent_path=settings.LLM_CACHE_PERSISTENT_PATH,
+    cache_nondeterministic=settings.LLM_CACHE_NONDETERMINISTIC
+)
@@ -0,0 +1,320 @@
+"""
+Latency-aware routing for LuminaOps LLM calls
+Keeps rolling latency and error statistics per provider/model. A call goes
+to the requested target first, unless that target's recent error rate marks
+it unhealthy, and falls back to alternate targets ordered by recent latency.
+Transient errors are retried with exponential backoff and jitter. With
+hedging enabled, a duplicate request is sent to the next target once the
+first has been running longer than its p95 latency, and the slower one is
+cancelled.
+"""
+
+from typing import Dict, Any, AsyncGenerator, Awaitable, Callable, List, Optional, Tuple
+from collections import deque
+from dataclasses import dataclass, field, replace
+import asyncio
+import math
+import random
+import time
+
+import httpx
+
+from core.config import settings
+from core.monitoring import record_llm_route_attempt, record_llm_fallback
+from ai_services.llm.admission import AdmissionRejected
+
+# Timeouts, conflicts, rate limits and server-side failures are worth retrying
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+# SDK errors without a status code that are still transient
+RETRYABLE_ERROR_NAMES = {"APIConnectionError", "APITimeoutError"}
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, AdmissionRejected):
+        return False  # Local backpressure: fall back instead of retrying
+    if isinstance(error, (asyncio.TimeoutError, httpx.TimeoutException, httpx.TransportError)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status in RETRYABLE_STATUS_CODES or type(error).__name__ in RETRYABLE_ERROR_NAMES
+
+def target_name(config) -> str:
+    return f"{config.provider.value}/{config.model_name}"
+
+class RollingStats:
+    """Outcomes of the most recent calls to one provider/model"""
+
+    def __init__(self, window: int):
+        self.samples: deque = deque(maxlen=window)  # (latency seconds or None, ok)
+
+    def record(self, latency: Optional[float], ok: bool):
+        self.samples.append((latency, ok))
+
+    @property
+    def latencies(self) -> List[float]:
+        return sorted(latency for latency, ok in self.samples if ok and latency is not None)
+
+    def percentile(self, q: float) -> Optional[float]:
+        latencies = self.latencies
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, math.ceil(q * len(latencies)) - 1)]
+
+    @property
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+    def to_dict(self) -> Dict[str, Any]:
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return {
+            "samples": len(self.samples),
+            "error_rate": round(self.error_rate, 4),
+            "p50_ms": round(p50 * 1000, 3) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 3) if p95 is not None else None
+        }
+
+@dataclass
+class RoutingDecision:
+    requested: str
+    served_by: Optional[str] = None
+    fallback_used: bool = False
+    hedged: bool = False
+    attempts: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requested": self.requested,
+            "served_by": self.served_by,
+            "fallback_used": self.fallback_used,
+            "hedged": self.hedged,
+            "attempts": self.attempts
+        }
+
+class LLMRouter:
+    """Retry, fallback and hedging across provider/model targets"""
+
+    def __init__(
+        self,
+        fallbacks: Dict[str, List[str]],
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        hedging: bool = False,
+        min_samples: int = 20,
+        window: int = 200,
+        error_threshold: float = 0.5
+    ):
+        # Keys are "provider/model" or "provider"; values list "provider/model" targets
+        self.fallbacks = fallbacks
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.hedging = hedging
+        self.min_samples = min_samples
+        self.window = window
+        self.error_threshold = error_threshold
+        self._stats: Dict[str, RollingStats] = {}
+
+    def stats_for(self, config) -> RollingStats:
+        name = target_name(config)
+        if name not in self._stats:
+            self._stats[name] = RollingStats(self.window)
+        return self._stats[name]
+
+    def unhealthy(self, config) -> bool:
+        stats = self.stats_for(config)
+        return len(stats.samples) >= self.min_samples and stats.error_rate >= self.error_threshold
+
+    @staticmethod
+    def parse_target(spec: str, base):
+        """Config for a "provider/model" fallback, inheriting sampling parameters"""
+        provider_name, _, model_name = spec.partition("/")
+        provider = type(base.provider)(provider_name)
+        if not model_name:
+            raise ValueError(f"Fallback target {spec!r} must be provider/model")
+        # Another provider needs its own configured key
+        api_key = base.api_key if provider == base.provider else None
+        return replace(base, provider=provider, model_name=model_name, api_key=api_key)
+
+    def candidates(self, config, fallbacks: Optional[List[str]] = None) -> List:
+        """Requested target first (unless unhealthy), then alternates by recent latency"""
+        if fallbacks is None:
+            fallbacks = self.fallbacks.get(target_name(config), self.fallbacks.get(config.provider.value, []))
+        alternates = [self.parse_target(spec, config) for spec in fallbacks]
+        alternates = [target for target in alternates if target_name(target) != target_name(config)]
+
+        def score(target) -> Tuple[bool, float]:
+            p50 = self.stats_for(target).percentile(0.5)
+            # Targets without data keep their configured order behind measured ones
+            return self.unhealthy(target), p50 if p50 is not None else math.inf
+
+        alternates.sort(key=score)
+        if alternates and self.unhealthy(config):
+            return alternates + [config]
+        return [config] + alternates
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, self.backoff_base * (2 ** (attempt - 1)))
+
+    def _hedge_delay(self, config) -> Optional[float]:
+        stats = self.stats_for(config)
+        if len(stats.latencies) < self.min_samples:
+            return None
+        return stats.percentile(0.95)
+
+    def _finish(self, decision: RoutingDecision, served, requested):
+        decision.served_by = target_name(served)
+        decision.fallback_used = decision.served_by != target_name(requested)
+        if decision.fallback_used:
+            record_llm_fallback(target_name(requested), decision.served_by)
+
+    async def _timed(self, call: Callable[[Any], Awaitable[str]], target, decision: RoutingDecision, hedge: bool) -> str:
+        entry = {"target": target_name(target), "hedge": hedge}
+        decision.attempts.append(entry)
+        start_time = time.perf_counter()
+        try:
+            result = await call(target)
+        except asyncio.CancelledError:
+            entry["outcome"] = "cancelled"
+            raise
+        except Exception as e:
+            entry.update(outcome="error", error=type(e).__name__)
+            if not isinstance(e, AdmissionRejected):
+                self.stats_for(target).record(None, False)
+            raise
+        else:
+            entry["outcome"] = "success"
+            self.stats_for(target).record(time.perf_counter() - start_time, True)
+            return result
+        finally:
+            entry["latency_ms"] = round((time.perf_counter() - start_time) * 1000, 3)
+            record_llm_route_attempt(target.provider.value, target.model_name, entry["outcome"], hedge)
+
+    async def _hedged_call(self, call, target, hedge_target, decision: RoutingDecision, hedge: bool):
+        """Run call(target); past target's p95, race it against call(hedge_target)"""
+        hedge_after = self._hedge_delay(target) if hedge else None
+        primary = asyncio.create_task(self._timed(call, target, decision, hedge=False))
+        tasks = {primary: target}
+        try:
+            if hedge_after is not None:
+                done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+                if not done:
+                    decision.hedged = True
+                    tasks[asyncio.create_task(self._timed(call, hedge_target, decision, hedge=True))] = hedge_target
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result(), tasks[task]
+            raise primary.exception()
+        finally:
+            # Cancel the loser, or everything if the caller was cancelled
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def complete(
+        self,
+        call: Callable[[Any], Awaitable[str]],
+        config,
+        decision: RoutingDecision,
+        fallbacks: Optional[List[str]] = None,
+        hedge: Optional[bool] = None
+    ) -> str:
+        """Return call(target) for the first target that succeeds, recording the route in decision"""
+        hedge = self.hedging if hedge is None else hedge
+        candidates = self.candidates(config, fallbacks)
+        last_error: Optional[BaseException] = None
+        for index, target in enumerate(candidates):
+            # Hedge to the next alternate, or to the same target if there is none
+            hedge_target = candidates[index + 1] if index + 1 < len(candidates) else target
+            for attempt in range(self.max_retries + 1):
+                if attempt:
+                    await asyncio.sleep(self._backoff(attempt))
+                try:
+                    result, served = await self._hedged_call(call, target, hedge_target, decision, hedge)
+                except Exception as e:
+                    last_error = e
+                    if is_retryable(e):
+                        continue
+                    break  # Not transient: move on to the next target
+                self._finish(decision, served, config)
+                return result
+        raise last_error
+
+    async def stream(
+        self,
+        open_stream: Callable[[Any], AsyncGenerator[str, None]],
+        config,
+        decision: RoutingDecision,
+        fallbacks: Optional[List[str]] = None
+    ) -> AsyncGenerator[str, None]:
+        """Stream from the first target that produces a chunk.
+
+        Retries and fallback happen only before the first chunk; once text
+        has been sent, a failure is raised to the caller.
+        """
+        candidates = self.candidates(config, fallbacks)
+        last_error: Optional[BaseException] = None
+        for target in candidates:
+            for attempt in range(self.max_retries + 1):
+                if attempt:
+                    await asyncio.sleep(self._backoff(attempt))
+                entry = {"target": target_name(target), "hedge": False}
+                decision.attempts.append(entry)
+                start_time = time.perf_counter()
+                stream = open_stream(target)
+                try:
+                    first = await stream.__anext__()
+                except StopAsyncIteration:
+                    first = None
+                except BaseException as e:
+                    await stream.aclose()
+                    entry.update(
+                        outcome="cancelled" if isinstance(e, asyncio.CancelledError) else "error",
+                        error=type(e).__name__,
+                        latency_ms=round((time.perf_counter() - start_time) * 1000, 3)
+                    )
+                    record_llm_route_attempt(target.provider.value, target.model_name, entry["outcome"], False)
+                    if not isinstance(e, Exception):
+                        raise
+                    if not isinstance(e, AdmissionRejected):
+                        self.stats_for(target).record(None, False)
+                    last_error = e
+                    if is_retryable(e):
+                        continue
+                    break
+
+                # Time to first chunk; stream latency depends on length, so it is not sampled
+                entry.update(outcome="success", latency_ms=round((time.perf_counter() - start_time) * 1000, 3))
+                record_llm_route_attempt(target.provider.value, target.model_name, "success", False)
+                self.stats_for(target).record(None, True)
+                self._finish(decision, target, config)
+                try:
+                    if first is not None:
+                        yield first
+                    async for chunk in stream:
+                        yield chunk
+                finally:
+                    await stream.aclose()
+                return
+        raise last_error
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_retries": self.max_retries,
+            "hedging": self.hedging,
+            "fallbacks": self.fallbacks,
+            "targets": {name: stats.to_dict() for name, stats in self._stats.items()}
+        }
+
+# Global router shared by every LLMService instance
+llm_router = LLMRouter(
+    fallbacks=settings.LLM_ROUTER_FALLBACKS,
+    max_retries=settings.LLM_ROUTER_MAX_RETRIES,
+    backoff_base=settings.LLM_ROUTER_BACKOFF_BASE,
+    hedging=settings.LLM_ROUTER_HEDGING,
+    min_samples=settings.LLM_ROUTER_MIN_SAMPLES,
+    window=settings.LLM_ROUTER_WINDOW,
+    error_threshold=settings.LLM_ROUTER_ERROR_THRESHOLD
+)
@@ -0,0 +1,214 @@
+"""
+Semantic LLM response cache for LuminaOps
+Paraphrased prompts miss the exact-match response cache. Here each prompt is
+embedded with the shared vector DB embedder and stored, with its response, in
+a dedicated vector collection. A later prompt reuses the response of its
+nearest stored prompt when their cosine similarity reaches the route's
+threshold. Entries only match requests on the same route with the same
+provider, model, system prompt and sampling parameters, expire after a TTL and
+can be invalidated by route, provider or model.
+"""
+
+from typing import Dict, Any, List, Optional
+from dataclasses import dataclass
+import hashlib
+import json
+import time
+import uuid
+
+import numpy as np
+
+from core.config import settings
+from core.monitoring import record_llm_semantic_cache
+from ai_services.vector_db.vector_service import Document, encode_texts
+from ai_services.vector_db.collection_manager import collection_manager, CollectionConfig
+from ai_services.vector_db.executor import vector_executor, Lane
+
+# Nearest entries checked per lookup, so a few expired ones do not hide a live match
+LOOKUP_DEPTH = 4
+
+@dataclass
+class SemanticLookup:
+    route: str
+    scope: str
+    vector: np.ndarray  # Prompt embedding, reused when the response is stored
+    response: Optional[str] = None
+    similarity: Optional[float] = None
+    saved_seconds: float = 0.0
+
+    @property
+    def hit(self) -> bool:
+        return self.response is not None
+
+class SemanticLLMCache:
+    """Nearest-prompt cache of generated responses in a vector collection"""
+
+    def __init__(
+        self,
+        collection: str,
+        threshold: float = 0.92,
+        route_thresholds: Optional[Dict[str, float]] = None,
+        ttl_seconds: float = 86400,
+        max_entries: int = 50000,
+        dimension: int = 384
+    ):
+        self.collection = collection
+        self.threshold = threshold
+        self.route_thresholds = route_thresholds or {}
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.dimension = dimension
+        self._ready = False
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.saved_seconds = 0.0
+
+    def threshold_for(self, route: str) -> float:
+        return self.route_thresholds.get(route, self.threshold)
+
+    @staticmethod
+    def scope(config, system_prompt: Optional[str]) -> str:
+        """Everything but the prompt that a reused response must have been generated with"""
+        payload = json.dumps({
+            "provider": config.provider.value,
+            "model": config.model_name,
+            "system_prompt": system_prompt,
+            "temperature": config.temperature,
+            "max_tokens": config.max_tokens,
+            "top_p": config.top_p,
+            "dtype": config.dtype
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def _ensure_collection(self):
+        if self._ready:
+            return
+        if not any(collection["name"] == self.collection for collection in collection_manager.list()):
+            try:
+                # Entries are keyed by prompt, so identical responses to different prompts are not duplicates
+                await collection_manager.create(CollectionConfig(
+                    name=self.collection, dimension=self.dimension, dedup=False, lexical=False
+                ))
+            except ValueError:
+                pass  # Created concurrently
+        self._ready = True
+
+    async def lookup(self, route: str, prompt: str, config, system_prompt: Optional[str] = None) -> SemanticLookup:
+        """Embed the prompt and return the closest live entry's response if it is similar enough"""
+        await self._ensure_collection()
+        scope = self.scope(config, system_prompt)
+        async with collection_manager.use(self.collection) as service:
+            vector = (await vector_executor.run(Lane.SEARCH, encode_texts, service.db_service.embedder, [prompt]))[0]
+            hits = await service.search_by_vector(vector.tolist(), LOOKUP_DEPTH, {"route": route, "scope": scope})
+
+        now = time.time()
+        lookup = SemanticLookup(route, scope, vector)
+        expired = [hit.document.id for hit in hits if hit.document.metadata["expires_at"] <= now]
+        live = [hit for hit in hits if hit.document.metadata["expires_at"] > now]
+        if live:
+            lookup.similarity = live[0].score
+            if live[0].score >= self.threshold_for(route):
+                lookup.response = live[0].document.content
+                lookup.saved_seconds = live[0].document.metadata["generation_seconds"]
+        if expired:
+            await self._delete(expired)
+
+        if lookup.hit:
+            self.hits += 1
+            self.saved_seconds += lookup.saved_seconds
+        else:
+            self.misses += 1
+        record_llm_semantic_cache(
+            route, "hit" if lookup.hit else "miss", similarity=lookup.similarity, saved_seconds=lookup.saved_seconds
+        )
+        return lookup
+
+    def record_error(self, route: str):
+        self.errors += 1
+        record_llm_semantic_cache(route, "error")
+
+    async def put(self, lookup: SemanticLookup, config, response: str, generation_seconds: float):
+        """Store a response under the prompt embedding computed by lookup"""
+        document = Document(
+            id=str(uuid.uuid4()),
+            # The response is the content; the embedding is the prompt's
+            content=response,
+            metadata={
+                "scope": lookup.scope,
+                "route": lookup.route,
+                "provider": config.provider.value,
+                "model": config.model_name,
+                "expires_at": time.time() + self.ttl_seconds,
+                "generation_seconds": generation_seconds
+            },
+            embedding=lookup.vector.tolist()
+        )
+        async with collection_manager.use(self.collection, write=True) as service:
+            await service.add_documents([document])
+            size = service.db_service.memory_usage()["documents"]
+        if size > self.max_entries:
+            await self.prune()
+
+    async def prune(self) -> int:
+        """Remove expired entries, then the oldest ones beyond max_entries"""
+        await self._ensure_collection()
+        async with collection_manager.use(self.collection) as service:
+            documents = await service.db_service.list_documents()
+        now = time.time()
+        documents.sort(key=lambda doc: doc.metadata["expires_at"])
+        stale = [doc.id for doc in documents if doc.metadata["expires_at"] <= now]
+        live = len(documents) - len(stale)
+        if live > self.max_entries:
+            stale += [doc.id for doc in documents[len(stale):len(stale) + live - self.max_entries]]
+        if stale:
+            await self._delete(stale)
+        return len(stale)
+
+    async def invalidate(
+        self,
+        route: Optional[str] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> int:
+        """Remove the entries matching every given field; with none given, remove all"""
+        await self._ensure_collection()
+        wanted = {"route": route, "provider": provider, "model": model}
+        async with collection_manager.use(self.collection) as service:
+            documents = await service.db_service.list_documents()
+        ids = [
+            doc.id for doc in documents
+            if all(value is None or doc.metadata.get(field) == value for field, value in wanted.items())
+        ]
+        if ids:
+            await self._delete(ids)
+        return len(ids)
+
+    async def _delete(self, ids: List[str]):
+        async with collection_manager.use(self.collection, write=True) as service:
+            await service.delete_documents(ids)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "collection": self.collection,
+            "threshold": self.threshold,
+            "route_thresholds": self.route_thresholds,
+            "ttl_seconds": self.ttl_seconds,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "saved_seconds": round(self.saved_seconds, 3)
+        }
+
+# Global semantic cache shared by every LLMService instance
+llm_semantic_cache = SemanticLLMCache(
+    collection=settings.LLM_SEMANTIC_CACHE_COLLECTION,
+    threshold=settings.LLM_SEMANTIC_CACHE_THRESHOLD,
+    route_thresholds=settings.LLM_SEMANTIC_CACHE_ROUTE_THRESHOLDS,
+    ttl_seconds=settings.LLM_SEMANTIC_CACHE_TTL,
+    max_entries=settings.LLM_SEMANTIC_CACHE_MAX_ENTRIES,
+    dimension=settings.LLM_SEMANTIC_CACHE_DIMENSION
+)
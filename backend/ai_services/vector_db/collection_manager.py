@@ -0,0 +1,247 @@
+"""
+Named vector collections for LuminaOps
+Each collection is its own FAISS-backed VectorDBService persisted under
+VECTOR_COLLECTIONS_DIR/<name>. Collections are loaded on first use and, when
+resident index memory exceeds the budget, the least recently used idle ones
+are saved to disk and unloaded.
+"""
+
+from typing import Dict, Any, List, Optional, AsyncIterator
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+import asyncio
+import json
+import re
+import shutil
+import time
+
+from core.config import settings
+from core.monitoring import record_vector_collection, record_vector_collection_event
+from ai_services.vector_db.vector_service import VectorDBService, VectorDBProvider, VectorStorage
+from ai_services.vector_db.reduction import ReductionMethod
+from ai_services.vector_db.dedup import DedupConfig, DedupMode
+
+COLLECTION_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+REGISTRY_FILE = "collections.json"
+
+@dataclass
+class CollectionConfig:
+    name: str
+    dimension: int = 384
+    storage: str = VectorStorage.FLOAT32.value
+    rescore_factor: int = 0
+    reduction: Optional[str] = None  # "pca" or "random"
+    reduced_dimension: Optional[int] = None
+    dedup: bool = True  # Near-duplicate detection per the VECTOR_DEDUP_* settings
+    lexical: bool = True  # BM25 index for hybrid search
+    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+
+    def validate(self):
+        if not COLLECTION_NAME_PATTERN.match(self.name):
+            raise ValueError("Collection names use 1-64 letters, digits, '_' or '-'")
+        if self.dimension <= 0:
+            raise ValueError("dimension must be positive")
+        if self.rescore_factor < 0:
+            raise ValueError("rescore_factor must be non-negative")
+        VectorStorage(self.storage)
+        if self.reduction is not None:
+            ReductionMethod(self.reduction)
+            if not self.reduced_dimension or not 0 < self.reduced_dimension < self.dimension:
+                raise ValueError("reduced_dimension must be positive and below dimension")
+
+@dataclass
+class ResidentCollection:
+    service: VectorDBService
+    in_use: int = 0
+    dirty: bool = False  # Changed since the last save
+    load_seconds: float = 0.0
+
+class CollectionManager:
+    """Registry of named collections with lazy loading and LRU eviction"""
+
+    def __init__(self, root: str, memory_budget_bytes: int):
+        self.root = Path(root)
+        self.memory_budget_bytes = memory_budget_bytes
+        self.configs: Dict[str, CollectionConfig] = {}
+        # Most recently used last
+        self._resident: "OrderedDict[str, ResidentCollection]" = OrderedDict()
+        # Last known size of each collection loaded since startup
+        self._sizes: Dict[str, Dict[str, int]] = {}
+        self._registry_loaded = False
+        self._lock = asyncio.Lock()  # Guards loading, eviction and the registry
+
+    def _load_registry(self):
+        if self._registry_loaded:
+            return
+        path = self.root / REGISTRY_FILE
+        if path.exists():
+            with open(path) as f:
+                for data in json.load(f):
+                    config = CollectionConfig(**data)
+                    self.configs[config.name] = config
+        self._registry_loaded = True
+
+    def _save_registry(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.root / f"{REGISTRY_FILE}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump([asdict(config) for config in self.configs.values()], f, indent=2)
+        tmp_path.replace(self.root / REGISTRY_FILE)
+
+    async def create(self, config: CollectionConfig) -> CollectionConfig:
+        """Register a new, empty collection"""
+        config.validate()
+        async with self._lock:
+            self._load_registry()
+            if config.name in self.configs:
+                raise ValueError(f"Collection {config.name} already exists")
+            self.configs[config.name] = config
+            self._sizes[config.name] = {"documents": 0, "memory_bytes": 0}
+            await asyncio.to_thread(self._save_registry)
+        record_vector_collection(config.name, 0, 0, False)
+        return config
+
+    async def drop(self, name: str):
+        """Unload a collection and delete it from disk"""
+        async with self._lock:
+            self._load_registry()
+            if name not in self.configs:
+                raise KeyError(f"Collection {name} not found")
+            entry = self._resident.get(name)
+            if entry is not None and entry.in_use:
+                raise ValueError(f"Collection {name} is in use")
+            self._resident.pop(name, None)
+            del self.configs[name]
+            self._sizes.pop(name, None)
+            await asyncio.to_thread(self._save_registry)
+            await asyncio.to_thread(shutil.rmtree, self.root / name, True)
+        record_vector_collection(name, 0, 0, False)
+
+    @asynccontextmanager
+    async def use(self, name: str, write: bool = False) -> AsyncIterator[VectorDBService]:
+        """Borrow a collection's service, loading it if needed.
+
+        Borrowed collections are never evicted. Pass write=True for operations
+        that change the collection so it is saved before being unloaded.
+        """
+        async with self._lock:
+            entry = await self._ensure_loaded(name)
+            entry.in_use += 1
+            self._resident.move_to_end(name)
+        try:
+            yield entry.service
+        finally:
+            entry.in_use -= 1
+            if write:
+                entry.dirty = True
+            self._update_size(name, entry)
+            if write:
+                async with self._lock:
+                    await self._enforce_budget()
+
+    async def _ensure_loaded(self, name: str) -> ResidentCollection:
+        self._load_registry()
+        if name not in self.configs:
+            raise KeyError(f"Collection {name} not found")
+        entry = self._resident.get(name)
+        if entry is not None:
+            return entry
+
+        config = self.configs[name]
+        service = VectorDBService(
+            VectorDBProvider.FAISS,
+            enable_lexical=config.lexical,
+            dedup_config=None if config.dedup else DedupConfig(mode=DedupMode.OFF)
+        )
+        start = time.perf_counter()
+        initialized = await service.initialize(
+            dimension=config.dimension,
+            storage=config.storage,
+            rescore_factor=config.rescore_factor,
+            reduction=config.reduction,
+            reduced_dimension=config.reduced_dimension,
+            persist_directory=str(self.root / name)
+        )
+        if not initialized:
+            raise RuntimeError(f"Failed to load collection {name}")
+        entry = ResidentCollection(service=service, load_seconds=time.perf_counter() - start)
+        self._resident[name] = entry
+        record_vector_collection_event(name, "load")
+        self._update_size(name, entry)
+        await self._enforce_budget(keep=name)
+        return entry
+
+    async def _enforce_budget(self, keep: Optional[str] = None):
+        """Evict idle collections, least recently used first, until under budget"""
+        while self.resident_bytes() > self.memory_budget_bytes:
+            victim = next(
+                (name for name, entry in self._resident.items() if not entry.in_use and name != keep),
+                None
+            )
+            if victim is None or not await self._evict(victim):
+                break
+
+    async def _evict(self, name: str) -> bool:
+        entry = self._resident[name]
+        if entry.dirty and not await entry.service.db_service.save():
+            return False  # Keep it resident rather than lose writes
+        del self._resident[name]
+        record_vector_collection_event(name, "evict")
+        size = self._sizes[name]
+        record_vector_collection(name, size["documents"], size["memory_bytes"], False)
+        return True
+
+    async def flush(self):
+        """Save every collection changed since its last save"""
+        async with self._lock:
+            for entry in self._resident.values():
+                if entry.dirty and await entry.service.db_service.save():
+                    entry.dirty = False
+
+    def _update_size(self, name: str, entry: ResidentCollection):
+        memory = entry.service.memory_usage()
+        in_ram_vectors = 0 if memory["full_precision_on_disk"] else memory["full_precision_bytes"]
+        # Text-heavy collections can hold more in documents and lexical postings than in the index
+        memory_bytes = (
+            memory["index_bytes"] + in_ram_vectors + memory["document_bytes"]
+            + memory["lexical_bytes"] + memory["dedup_bytes"]
+        )
+        size = {"documents": memory["documents"], "memory_bytes": memory_bytes}
+        self._sizes[name] = size
+        record_vector_collection(name, size["documents"], size["memory_bytes"], name in self._resident)
+
+    def resident_bytes(self) -> int:
+        return sum(self._sizes[name]["memory_bytes"] for name in self._resident)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """All collections with their size and residency"""
+        self._load_registry()
+        collections = []
+        for name, config in self.configs.items():
+            entry = self._resident.get(name)
+            collections.append({
+                **asdict(config),
+                # Unknown until the collection is first loaded
+                **self._sizes.get(name, {"documents": None, "memory_bytes": None}),
+                "resident": entry is not None,
+                "load_seconds": round(entry.load_seconds, 4) if entry else None
+            })
+        return collections
+
+    def stats(self) -> Dict[str, Any]:
+        self._load_registry()
+        return {
+            "collections": len(self.configs),
+            "resident": list(self._resident),
+            "resident_bytes": self.resident_bytes(),
+            "memory_budget_bytes": self.memory_budget_bytes
+        }
+
+# Global collection manager instance
+collection_manager = CollectionManager(
+    settings.VECTOR_COLLECTIONS_DIR,
+    settings.VECTOR_COLLECTIONS_MEMORY_BUDGET_MB * 1024 * 1024
+)
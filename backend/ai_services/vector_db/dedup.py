@@ -0,0 +1,229 @@
+"""
+Near-duplicate detection for LuminaOps vector DB ingestion
+Content is compared with MinHash signatures bucketed by LSH bands, so each new
+document is only checked against documents sharing a band. An optional
+embedding check catches paraphrases that share few word shingles. Duplicates
+are either skipped or indexed with a link to their canonical document.
+"""
+
+from typing import Dict, Any, List, Optional, Set, Tuple
+from dataclasses import dataclass
+from enum import Enum
+import re
+import sys
+import threading
+import zlib
+
+import numpy as np
+
+from ai_services.vector_db.sizing import CONTAINER_ENTRY_BYTES, deep_sizeof, sampled_bytes
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+# Metadata key that links a duplicate to its canonical document
+DUPLICATE_OF = "duplicate_of"
+
+class DedupMode(Enum):
+    OFF = "off"
+    SKIP = "skip"  # Duplicates are not indexed
+    LINK = "link"  # Duplicates are indexed with metadata["duplicate_of"]
+
+@dataclass
+class DedupConfig:
+    mode: DedupMode = DedupMode.OFF
+    jaccard_threshold: float = 0.8  # Estimated shingle Jaccard similarity
+    cosine_threshold: Optional[float] = None  # Embedding similarity; None disables the check
+    num_perm: int = 128
+    bands: int = 16
+    shingle_size: int = 3  # Words per shingle
+
+    def validate(self):
+        if self.num_perm % self.bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        if not 0 < self.jaccard_threshold <= 1:
+            raise ValueError("jaccard_threshold must be in (0, 1]")
+        if self.cosine_threshold is not None and not -1 <= self.cosine_threshold <= 1:
+            raise ValueError("cosine_threshold must be in [-1, 1]")
+
+def shingles(text: str, size: int) -> Set[str]:
+    """Word n-grams of lowercased text; short texts yield a single shingle"""
+    words = re.findall(r"\w+", text.lower())
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+class MinHashLSH:
+    """MinHash signatures with banded locality-sensitive hashing"""
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, shingle_size: int = 3, seed: int = 1):
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(MERSENNE_PRIME), num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(MERSENNE_PRIME), num_perm, dtype=np.uint64)
+        self.signatures: Dict[str, np.ndarray] = {}
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles(text, self.shingle_size)),
+            dtype=np.uint64
+        )
+        # Universal hashing (a*x + b) mod p; the uint64 product wraps, as in datasketch
+        with np.errstate(over="ignore"):
+            permuted = ((hashes[:, None] * self._a + self._b) % MERSENNE_PRIME) & MAX_HASH
+        return permuted.min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def query(self, signature: np.ndarray, threshold: float) -> Optional[Tuple[str, float]]:
+        """Most similar indexed document at or above the Jaccard threshold"""
+        candidates: Set[str] = set()
+        for key in self._band_keys(signature):
+            candidates |= self._buckets.get(key, set())
+        best = None
+        for doc_id in candidates:
+            similarity = float(np.mean(self.signatures[doc_id] == signature))
+            if similarity >= threshold and (best is None or similarity > best[1]):
+                best = (doc_id, similarity)
+        return best
+
+    def add(self, doc_id: str, signature: np.ndarray):
+        self.remove(doc_id)
+        self.signatures[doc_id] = signature
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, set()).add(doc_id)
+
+    def remove(self, doc_id: str):
+        signature = self.signatures.pop(doc_id, None)
+        if signature is None:
+            return
+        for key in self._band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(doc_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def clear(self):
+        self.signatures.clear()
+        self._buckets.clear()
+
+    def memory_bytes(self) -> int:
+        """Approximate size of the signatures and band buckets"""
+        signatures = sampled_bytes(
+            self.signatures.values(),
+            len(self.signatures),
+            lambda signature: deep_sizeof(signature) + (self.bands + 1) * CONTAINER_ENTRY_BYTES
+        )
+        buckets = sampled_bytes(
+            self._buckets, len(self._buckets), lambda key: deep_sizeof(key) + sys.getsizeof(set())
+        )
+        return signatures + buckets
+
+class Deduplicator:
+    """Tracks canonical documents and classifies incoming ones"""
+
+    def __init__(self, config: DedupConfig):
+        config.validate()
+        self.config = config
+        self.lsh = MinHashLSH(config.num_perm, config.bands, config.shingle_size)
+        self.documents_checked = 0
+        self.duplicates_found = 0
+        self.duplicates_by_content = 0
+        self.duplicates_by_embedding = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def match_content(self, doc_id: str, content: str) -> Optional[str]:
+        """Return the canonical id of a near-identical document, or register this one.
+
+        Only canonical documents enter the LSH index, so every match resolves to
+        the first document of its group.
+        """
+        if not content.strip():
+            return None  # Vector-only documents are left to the embedding check
+        signature = self.lsh.signature(content)
+        with self._lock:
+            self.lsh.remove(doc_id)  # A re-added id must not match its old version
+            match = self.lsh.query(signature, self.config.jaccard_threshold)
+            if match is None:
+                self.lsh.add(doc_id, signature)
+                return None
+            return match[0]
+
+    def register(self, doc_id: str, content: str):
+        """Make a document a canonical LSH entry (used when rebuilding)"""
+        if not content.strip():
+            return
+        signature = self.lsh.signature(content)
+        with self._lock:
+            self.lsh.add(doc_id, signature)
+
+    def forget(self, doc_id: str):
+        with self._lock:
+            self.lsh.remove(doc_id)
+
+    def clear(self):
+        with self._lock:
+            self.lsh.clear()
+
+    def memory_bytes(self) -> int:
+        with self._lock:
+            return self.lsh.memory_bytes()
+
+    def record(self, checked: int, by_content: int, by_embedding: int, seconds: float):
+        with self._lock:
+            self.documents_checked += checked
+            self.duplicates_by_content += by_content
+            self.duplicates_by_embedding += by_embedding
+            self.duplicates_found += by_content + by_embedding
+            self.seconds += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            checked = self.documents_checked
+            return {
+                "mode": self.config.mode.value,
+                "canonical_documents": len(self.lsh),
+                "documents_checked": checked,
+                "duplicates_found": self.duplicates_found,
+                "duplicates_by_content": self.duplicates_by_content,
+                "duplicates_by_embedding": self.duplicates_by_embedding,
+                # With SKIP, the share of checked documents kept out of the index
+                "index_size_reduction": round(self.duplicates_found / checked, 4)
+                if checked and self.config.mode == DedupMode.SKIP else 0.0,
+                "overhead_seconds": round(self.seconds, 4),
+                "overhead_ms_per_document": round(self.seconds * 1000 / checked, 4) if checked else 0.0
+            }
+
+def duplicate_group(document) -> str:
+    """Group key for collapsing results: the canonical id, or the document's own"""
+    return (document.metadata or {}).get(DUPLICATE_OF, document.id)
+
+def within_batch_matches(vectors: np.ndarray, threshold: float, block: int = 1024) -> List[Optional[int]]:
+    """For each row, the index of an earlier row with cosine similarity >= threshold.
+
+    Rows must be L2-normalized. Similarities are computed a block of rows at a
+    time, so memory stays at block x len(vectors).
+    """
+    matches: List[Optional[int]] = [None] * len(vectors)
+    for start in range(0, len(vectors), block):
+        similarities = vectors[start:start + block] @ vectors.T
+        for offset, row in enumerate(similarities):
+            i = start + offset
+            earlier = np.flatnonzero(row[:i] >= threshold)
+            if len(earlier):
+                # Resolve to the group's first row
+                j = int(earlier[0])
+                matches[i] = matches[j] if matches[j] is not None else j
+    return matches
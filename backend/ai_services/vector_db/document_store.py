@@ -0,0 +1,116 @@
+"""
+Columnar document storage for the FAISS backend in LuminaOps
+Documents are held as position-aligned columns (ids, contents, metadata)
+matching FAISS row order, without per-document embedding lists. Optional
+full-precision vectors live in a contiguous float32 matrix, in RAM or
+memory-mapped from disk.
+"""
+
+from typing import Dict, Any, List, Optional, Iterable
+from pathlib import Path
+import sys
+import numpy as np
+
+from ai_services.vector_db.sizing import deep_sizeof, sampled_bytes
+
+class ColumnarDocumentStore:
+    """Document columns aligned with index positions"""
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.contents: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self.positions: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.positions
+
+    def append(self, doc_id: str, content: str, metadata: Dict[str, Any]) -> int:
+        position = len(self.ids)
+        self.ids.append(doc_id)
+        self.contents.append(content)
+        self.metadatas.append(metadata)
+        self.positions[doc_id] = position
+        return position
+
+    def position(self, doc_id: str) -> int:
+        return self.positions[doc_id]
+
+    def compact(self, keep: List[int]):
+        """Keep only the given positions (ascending), renumbering them from 0"""
+        self.ids = [self.ids[p] for p in keep]
+        self.contents = [self.contents[p] for p in keep]
+        self.metadatas = [self.metadatas[p] for p in keep]
+        self.positions = {doc_id: position for position, doc_id in enumerate(self.ids)}
+
+    def clear(self):
+        self.compact([])
+
+    def memory_bytes(self) -> int:
+        """Approximate size of the columns, estimated from a sample of documents"""
+        rows = sampled_bytes(
+            zip(self.ids, self.contents, self.metadatas),
+            len(self.ids),
+            lambda row: sum(deep_sizeof(value) for value in row)
+        )
+        return rows + sum(sys.getsizeof(column) for column in (self.ids, self.contents, self.metadatas, self.positions))
+
+class VectorColumn:
+    """Growable (n, dimension) float32 matrix, optionally memory-mapped to a file"""
+
+    def __init__(self, dimension: int, path: Optional[str] = None, initial_capacity: int = 1024):
+        self.dimension = dimension
+        self.path = Path(path) if path else None
+        self.size = 0
+        self._data = self._allocate(initial_capacity)
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def nbytes(self) -> int:
+        return self.size * self.dimension * 4
+
+    def append(self, rows: np.ndarray):
+        rows = np.asarray(rows, dtype=np.float32).reshape(-1, self.dimension)
+        needed = self.size + len(rows)
+        if needed > len(self._data):
+            self._grow(max(needed, 2 * len(self._data)))
+        self._data[self.size:needed] = rows
+        self.size = needed
+
+    def take(self, positions: Iterable[int]) -> np.ndarray:
+        return np.asarray(self._data[np.fromiter(positions, dtype=np.int64)])
+
+    def compact(self, keep: List[int]):
+        kept = self.take(keep)
+        self._data[:len(kept)] = kept
+        self.size = len(kept)
+
+    def clear(self):
+        self.size = 0
+
+    def _allocate(self, capacity: int) -> np.ndarray:
+        capacity = max(capacity, 1)
+        if self.path is None:
+            return np.zeros((capacity, self.dimension), dtype=np.float32)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "wb") as f:
+            f.truncate(capacity * self.dimension * 4)
+        return np.memmap(self.path, dtype=np.float32, mode="r+", shape=(capacity, self.dimension))
+
+    def _grow(self, capacity: int):
+        if self.path is None:
+            data = np.zeros((capacity, self.dimension), dtype=np.float32)
+            data[:self.size] = self._data[:self.size]
+            self._data = data
+            return
+        # Extend the backing file in place and remap it
+        self._data.flush()
+        del self._data
+        with open(self.path, "r+b") as f:
+            f.truncate(capacity * self.dimension * 4)
+        self._data = np.memmap(self.path, dtype=np.float32, mode="r+", shape=(capacity, self.dimension))
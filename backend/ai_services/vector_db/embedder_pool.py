@@ -0,0 +1,133 @@
+"""
+Process-wide embedding model registry for LuminaOps
+Every vector DB backend and collection shares one lazily loaded
+SentenceTransformer per model name instead of loading its own copy. By
+default the search lane gets a second copy, so queries never wait for a bulk
+ingestion encode to release the model.
+"""
+
+from typing import Dict, List, Any, Optional
+import threading
+import time
+
+from core.config import settings
+from core.monitoring import record_embedding_model_load
+from ai_services.vector_db.executor import current_lane, Lane
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError as e:
+    print(f"Warning: sentence-transformers not installed: {e}")
+
+class SharedEmbedder:
+    """Lazily loaded, thread-safe wrapper around a SentenceTransformer.
+
+    The model is loaded on the first `encode` call (or an explicit `load`).
+    Calls to `encode` are serialized per model copy: Hugging Face fast
+    tokenizers are not re-entrant, and batching inputs is the way to get
+    throughput. With search_copy, search-lane threads encode with their own
+    copy and lock instead of waiting behind ingestion.
+    """
+
+    def __init__(self, model_name: str, device: Optional[str] = None, search_copy: bool = False):
+        self.model_name = model_name
+        self.device = device
+        self.search_copy = search_copy
+        self.load_seconds: Optional[float] = None
+        self.memory_bytes: Optional[int] = None
+        self._model = None
+        self._search_model = None
+        self._load_lock = threading.Lock()
+        self._encode_lock = threading.Lock()
+        self._search_encode_lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self):
+        """Load the model if needed and return it"""
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    self._model = self._load_copy()
+        return self._model
+
+    def load_search_copy(self):
+        if self._search_model is None:
+            with self._load_lock:
+                if self._search_model is None:
+                    self._search_model = self._load_copy()
+        return self._search_model
+
+    def _load_copy(self):
+        start = time.perf_counter()
+        model = SentenceTransformer(self.model_name, device=self.device)
+        load_seconds = time.perf_counter() - start
+        model_bytes = self._model_bytes(model)
+        if self.load_seconds is None:
+            self.load_seconds = load_seconds
+        self.memory_bytes = (self.memory_bytes or 0) + model_bytes
+        record_embedding_model_load(self.model_name, load_seconds, model_bytes)
+        return model
+
+    def encode(self, sentences, **kwargs):
+        """Encode text(s); same signature as SentenceTransformer.encode"""
+        if self.search_copy and current_lane() == Lane.SEARCH:
+            model, lock = self.load_search_copy(), self._search_encode_lock
+        else:
+            model, lock = self.load(), self._encode_lock
+        with lock:
+            return model.encode(sentences, **kwargs)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.load().get_sentence_embedding_dimension()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model_name": self.model_name,
+            "loaded": self.loaded,
+            "search_copy_loaded": self._search_model is not None,
+            "load_seconds": self.load_seconds,
+            "memory_bytes": self.memory_bytes
+        }
+
+    @staticmethod
+    def _model_bytes(model) -> int:
+        """Resident size of the model weights and buffers"""
+        total = 0
+        for tensor in list(model.parameters()) + list(model.buffers()):
+            total += tensor.numel() * tensor.element_size()
+        return total
+
+class EmbedderRegistry:
+    """One SharedEmbedder per model name for the whole process"""
+
+    def __init__(self):
+        self._embedders: Dict[str, SharedEmbedder] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_name: str) -> SharedEmbedder:
+        """Return the shared embedder for a model name without loading it"""
+        with self._lock:
+            embedder = self._embedders.get(model_name)
+            if embedder is None:
+                embedder = SharedEmbedder(model_name, search_copy=settings.VECTOR_DB_SEARCH_EMBEDDER)
+                self._embedders[model_name] = embedder
+            return embedder
+
+    def warm_up(self, model_names: List[str]):
+        """Eagerly load models, e.g. during application startup"""
+        for model_name in model_names:
+            embedder = self.get(model_name)
+            embedder.load()
+            if embedder.search_copy:
+                embedder.load_search_copy()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            embedders = list(self._embedders.values())
+        return [embedder.stats() for embedder in embedders]
+
+# Global registry instance
+embedder_registry = EmbedderRegistry()
@@ -0,0 +1,107 @@
+"""
+Dedicated executor for vector DB compute in LuminaOps
+Embedding, normalization and index calls are CPU-bound and must not run on
+the asyncio event loop. Work is split into two bounded lanes so interactive
+searches never queue behind bulk ingestion. Lane threads know their lane, so
+shared resources such as the embedding model can keep a copy per lane.
+"""
+
+from typing import Callable, Dict, Any, Optional, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+import asyncio
+import functools
+import threading
+import weakref
+
+from core.config import settings
+
+T = TypeVar("T")
+
+class Lane(Enum):
+    SEARCH = "search"   # Latency-sensitive: queries, single-document lookups
+    INGEST = "ingest"   # Throughput work: bulk embedding, index builds, rebuilds
+
+_thread_lane = threading.local()
+
+def _set_lane(lane: Lane):
+    _thread_lane.lane = lane
+
+def current_lane() -> Optional[Lane]:
+    """Lane of the calling executor thread; None outside the executor"""
+    return getattr(_thread_lane, "lane", None)
+
+class VectorDBExecutor:
+    """Two-lane thread pool with a bound on in-flight work per lane.
+
+    Callers await `run`; once a lane has `max_pending` tasks queued or running,
+    further callers wait on an asyncio semaphore (not in the thread pool queue),
+    which gives backpressure without blocking the loop.
+    """
+
+    def __init__(self, search_workers: int, ingest_workers: int, max_pending: int):
+        self.max_pending = max_pending
+        self._workers = {Lane.SEARCH: search_workers, Lane.INGEST: ingest_workers}
+        self._pools: Dict[Lane, ThreadPoolExecutor] = {}
+        # Per event loop, created on first use: the global instance is built at import
+        # time, and asyncio primitives stay bound to the first loop they wait on
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Lane, asyncio.Semaphore]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._pending: Dict[Lane, int] = {Lane.SEARCH: 0, Lane.INGEST: 0}
+        self._lock = threading.Lock()
+
+    def _pool(self, lane: Lane) -> ThreadPoolExecutor:
+        with self._lock:
+            pool = self._pools.get(lane)
+            if pool is None:
+                pool = ThreadPoolExecutor(
+                    max_workers=self._workers[lane],
+                    thread_name_prefix=f"vectordb-{lane.value}",
+                    initializer=_set_lane,
+                    initargs=(lane,)
+                )
+                self._pools[lane] = pool
+            return pool
+
+    def _semaphore(self, lane: Lane) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphores = self._semaphores.get(loop)
+            if semaphores is None:
+                semaphores = self._semaphores[loop] = {lane: asyncio.Semaphore(self.max_pending) for lane in Lane}
+            return semaphores[lane]
+
+    async def run(self, lane: Lane, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Run `fn(*args, **kwargs)` on the given lane and await its result"""
+        pool = self._pool(lane)
+        async with self._semaphore(lane):
+            with self._lock:
+                self._pending[lane] += 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(pool, functools.partial(fn, *args, **kwargs))
+            finally:
+                with self._lock:
+                    self._pending[lane] -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                lane.value: {"workers": self._workers[lane], "in_flight": self._pending[lane]}
+                for lane in Lane
+            }
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.shutdown(wait=wait)
+
+# Global executor instance
+vector_executor = VectorDBExecutor(
+    search_workers=settings.VECTOR_DB_SEARCH_WORKERS,
+    ingest_workers=settings.VECTOR_DB_INGEST_WORKERS,
+    max_pending=settings.VECTOR_DB_MAX_PENDING
+)
@@ -0,0 +1,333 @@
+"""
+Streaming ingestion pipeline for the LuminaOps vector database
+Files (plain text, Markdown, JSONL) are read in blocks, split into overlapping
+chunks and pushed through chunk -> embed -> index stages connected by bounded
+queues, so memory stays flat regardless of file size. Progress is tracked per
+job ID.
+"""
+
+from typing import Dict, Any, List, Optional, Iterator, AsyncIterator, Tuple
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+import asyncio
+import codecs
+import json
+import os
+import uuid
+
+from core.monitoring import record_ml_job
+from ai_services.vector_db.executor import vector_executor, Lane
+from ai_services.vector_db.vector_service import Document, encode_texts
+
+READ_BLOCK_SIZE = 64 * 1024
+
+class IngestionFormat(Enum):
+    TEXT = "text"
+    MARKDOWN = "markdown"
+    JSONL = "jsonl"
+
+    @classmethod
+    def from_filename(cls, filename: str) -> "IngestionFormat":
+        suffix = Path(filename or "").suffix.lower()
+        if suffix in (".md", ".markdown"):
+            return cls.MARKDOWN
+        if suffix in (".jsonl", ".ndjson"):
+            return cls.JSONL
+        return cls.TEXT
+
+class JobStatus(Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+@dataclass
+class ChunkingConfig:
+    chunk_size: int = 1000  # characters
+    chunk_overlap: int = 200
+    batch_size: int = 64  # chunks per embedding call
+    queue_size: int = 8  # batches buffered between stages
+
+    def validate(self):
+        if self.chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        if not 0 <= self.chunk_overlap < self.chunk_size // 2:
+            raise ValueError("chunk_overlap must be non-negative and less than half of chunk_size")
+        if self.batch_size <= 0 or self.queue_size <= 0:
+            raise ValueError("batch_size and queue_size must be positive")
+
+@dataclass
+class IngestionJob:
+    job_id: str
+    filename: str
+    format: str
+    total_bytes: int
+    status: JobStatus = JobStatus.PENDING
+    bytes_read: int = 0
+    records_read: int = 0
+    chunks_created: int = 0
+    chunks_embedded: int = 0
+    chunks_indexed: int = 0
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["status"] = self.status.value
+        data["progress"] = round(self.bytes_read / self.total_bytes, 4) if self.total_bytes else 1.0
+        data["created_at"] = self.created_at.isoformat()
+        data["finished_at"] = self.finished_at.isoformat() if self.finished_at else None
+        return data
+
+# (separator, cut offset within the separator); earlier entries are preferred
+TEXT_SEPARATORS = [("\n\n", 2), ("\n", 1), (". ", 2), (" ", 1)]
+MARKDOWN_SEPARATORS = [("\n#", 1)] + TEXT_SEPARATORS
+
+class TextChunker:
+    """Incremental fixed-size chunker with overlap and boundary preference.
+
+    Text is fed in arbitrary pieces; complete chunks are yielded as soon as the
+    buffer holds more than `chunk_size` characters. Cuts prefer the latest
+    paragraph/line/sentence/word boundary in the second half of the window.
+    """
+
+    def __init__(self, chunk_size: int, chunk_overlap: int, separators: List[Tuple[str, int]] = TEXT_SEPARATORS):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = separators
+        self.buffer = ""
+
+    def feed(self, text: str) -> Iterator[str]:
+        self.buffer += text
+        while len(self.buffer) > self.chunk_size:
+            cut = self._boundary()
+            chunk = self.buffer[:cut].strip()
+            self.buffer = self.buffer[cut - self.chunk_overlap:]
+            if chunk:
+                yield chunk
+
+    def flush(self) -> Iterator[str]:
+        chunk = self.buffer.strip()
+        self.buffer = ""
+        if chunk:
+            yield chunk
+
+    def _boundary(self) -> int:
+        window = self.buffer[:self.chunk_size]
+        floor = self.chunk_size // 2
+        for separator, offset in self.separators:
+            position = window.rfind(separator, floor)
+            if position != -1:
+                return position + offset
+        return self.chunk_size
+
+async def read_text_blocks(path: str, counter: IngestionJob) -> AsyncIterator[str]:
+    """Decode a UTF-8 file block by block, off the event loop"""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    with open(path, "rb") as f:
+        while True:
+            block = await asyncio.to_thread(f.read, READ_BLOCK_SIZE)
+            if not block:
+                break
+            counter.bytes_read += len(block)
+            text = decoder.decode(block)
+            if text:
+                yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+class IngestionManager:
+    """Runs ingestion jobs against the vector DB service and tracks their progress"""
+
+    def __init__(self, max_jobs_retained: int = 1000):
+        self.jobs: Dict[str, IngestionJob] = {}
+        self.max_jobs_retained = max_jobs_retained
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def get(self, job_id: str) -> IngestionJob:
+        if job_id not in self.jobs:
+            raise KeyError(f"Ingestion job {job_id} not found")
+        return self.jobs[job_id]
+
+    def start(
+        self,
+        vector_db,
+        path: str,
+        filename: str,
+        fmt: IngestionFormat,
+        config: ChunkingConfig,
+        base_metadata: Optional[Dict[str, Any]] = None,
+        delete_when_done: bool = True
+    ) -> IngestionJob:
+        """Launch a background ingestion job for a file already on local disk"""
+        config.validate()
+        job = IngestionJob(
+            job_id=str(uuid.uuid4()),
+            filename=filename,
+            format=fmt.value,
+            total_bytes=os.path.getsize(path)
+        )
+        self._retain(job)
+        task = asyncio.create_task(
+            self._run(job, vector_db, path, fmt, config, base_metadata or {}, delete_when_done)
+        )
+        self._tasks[job.job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.job_id, None))
+        return job
+
+    async def delete_documents(self, vector_db, job_id: str) -> int:
+        """Remove the chunks indexed by a job; raises RuntimeError while it is still running"""
+        if job_id in self._tasks:
+            raise RuntimeError(f"Ingestion job {job_id} is still running")
+        # Matched by metadata, so chunks of jobs no longer retained can be removed too
+        documents = await vector_db.db_service.list_documents()
+        ids = [doc.id for doc in documents if (doc.metadata or {}).get("ingestion_job") == job_id]
+        if ids and not await vector_db.delete_documents(ids):
+            raise RuntimeError("Vector database rejected the deletion")
+        return len(ids)
+
+    async def _run(
+        self,
+        job: IngestionJob,
+        vector_db,
+        path: str,
+        fmt: IngestionFormat,
+        config: ChunkingConfig,
+        base_metadata: Dict[str, Any],
+        delete_when_done: bool
+    ):
+        job.status = JobStatus.RUNNING
+        record_ml_job("vector_ingestion", "started")
+        # Both queues are bounded, so a slow stage pauses the ones before it
+        chunk_queue: asyncio.Queue = asyncio.Queue(maxsize=config.queue_size * config.batch_size)
+        index_queue: asyncio.Queue = asyncio.Queue(maxsize=config.queue_size)
+        separators = MARKDOWN_SEPARATORS if fmt == IngestionFormat.MARKDOWN else TEXT_SEPARATORS
+
+        async def emit(record_index: int, chunk_index: int, chunk: str, metadata: Dict[str, Any]):
+            doc = Document(
+                # Scoped to the job, so uploads sharing a file name never overwrite each other
+                id=f"{job.job_id}-{record_index}-{chunk_index}",
+                content=chunk,
+                metadata={
+                    **base_metadata,
+                    **metadata,
+                    "source": job.filename,
+                    "ingestion_job": job.job_id,
+                    "record": record_index,
+                    "chunk_index": chunk_index
+                }
+            )
+            job.chunks_created += 1
+            await chunk_queue.put(doc)
+
+        async def chunk_stage():
+            if fmt == IngestionFormat.JSONL:
+                async for record_index, content, metadata in self._jsonl_records(job, path):
+                    chunker = TextChunker(config.chunk_size, config.chunk_overlap, separators)
+                    chunks = list(chunker.feed(content)) + list(chunker.flush())
+                    for chunk_index, chunk in enumerate(chunks):
+                        await emit(record_index, chunk_index, chunk, metadata)
+            else:
+                # The whole file is one record; chunks are emitted while it streams in
+                job.records_read = 1
+                chunker = TextChunker(config.chunk_size, config.chunk_overlap, separators)
+                chunk_index = 0
+                async for block in read_text_blocks(path, job):
+                    for chunk in chunker.feed(block):
+                        await emit(0, chunk_index, chunk, {})
+                        chunk_index += 1
+                for chunk in chunker.flush():
+                    await emit(0, chunk_index, chunk, {})
+            await chunk_queue.put(None)
+
+        async def embed_stage():
+            embedder = vector_db.db_service.embedder
+            done = False
+            while not done:
+                batch = [await chunk_queue.get()]
+                while len(batch) < config.batch_size and batch[-1] is not None and not chunk_queue.empty():
+                    batch.append(chunk_queue.get_nowait())
+                if batch[-1] is None:
+                    batch.pop()
+                    done = True
+                if batch:
+                    embeddings = await vector_executor.run(
+                        Lane.INGEST, encode_texts, embedder, [doc.content for doc in batch]
+                    )
+                    for doc, embedding in zip(batch, embeddings):
+                        doc.embedding = embedding.tolist()
+                    job.chunks_embedded += len(batch)
+                    await index_queue.put(batch)
+            await index_queue.put(None)
+
+        async def index_stage():
+            while True:
+                batch = await index_queue.get()
+                if batch is None:
+                    break
+                if not await vector_db.add_documents(batch):
+                    raise RuntimeError("Vector database rejected a batch")
+                job.chunks_indexed += len(batch)
+
+        tasks = [asyncio.create_task(stage()) for stage in (chunk_stage, embed_stage, index_stage)]
+        try:
+            await asyncio.gather(*tasks)
+            job.status = JobStatus.COMPLETED
+            record_ml_job("vector_ingestion", "completed")
+        except Exception as e:
+            for task in tasks:
+                task.cancel()
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+            record_ml_job("vector_ingestion", "failed")
+        finally:
+            job.finished_at = datetime.utcnow()
+            if delete_when_done:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    async def _jsonl_records(self, job: IngestionJob, path: str) -> AsyncIterator[Tuple[int, str, Dict[str, Any]]]:
+        """Yield (record_index, content, metadata) for each JSONL line"""
+        pending = ""
+        record_index = 0
+        async for block in read_text_blocks(path, job):
+            pending += block
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                record = self._parse_jsonl(line)
+                if record is not None:
+                    yield (record_index, *record)
+                    record_index += 1
+                    job.records_read = record_index
+        record = self._parse_jsonl(pending)
+        if record is not None:
+            yield (record_index, *record)
+            job.records_read = record_index + 1
+
+    @staticmethod
+    def _parse_jsonl(line: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        line = line.strip()
+        if not line:
+            return None
+        record = json.loads(line)
+        content = record.get("content", record.get("text"))
+        if not isinstance(content, str):
+            raise ValueError("JSONL records need a string 'content' or 'text' field")
+        return content, record.get("metadata") or {}
+
+    def _retain(self, job: IngestionJob):
+        """Store a job, dropping the oldest finished jobs beyond the retention limit"""
+        self.jobs[job.job_id] = job
+        if len(self.jobs) > self.max_jobs_retained:
+            finished = [j for j in self.jobs.values() if j.finished_at is not None]
+            for old in sorted(finished, key=lambda j: j.finished_at)[:len(self.jobs) - self.max_jobs_retained]:
+                del self.jobs[old.job_id]
+
+# Global ingestion manager instance
+ingestion_manager = IngestionManager()
@@ -0,0 +1,147 @@
+"""
+BM25 lexical index for hybrid retrieval in LuminaOps
+Complements embedding search with exact matching on identifiers, error codes
+and model names. The inverted index is updated incrementally on add/delete.
+"""
+
+from typing import Dict, List, Optional, Tuple, Callable, Iterable
+from collections import Counter, defaultdict
+import heapq
+import math
+import re
+import sys
+import threading
+
+from ai_services.vector_db.sizing import CONTAINER_ENTRY_BYTES, sampled_bytes
+
+# Compound tokens such as "ERR_CONN_RESET", "gpt-4", "v1.2.3" or "all-MiniLM-L6-v2"
+# are kept whole and also split into their parts, so both exact and partial
+# identifier queries match.
+TOKEN_PATTERN = re.compile(r"[A-Za-z0-9_]+(?:[.\-/:][A-Za-z0-9_]+)*")
+PART_PATTERN = re.compile(r"[A-Za-z0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase tokens for BM25, including whole compound identifiers"""
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(text or ""):
+        token = match.group(0).lower()
+        tokens.append(token)
+        parts = PART_PATTERN.findall(token)
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+class BM25Index:
+    """Incrementally updated Okapi BM25 index over document content"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)  # term -> {doc_id: tf}
+        self.doc_lengths: Dict[str, int] = {}
+        self.doc_terms: Dict[str, List[str]] = {}  # doc_id -> distinct terms, for removal
+        self.total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, doc_id: str, content: str):
+        """Index a document, replacing any previous version with the same id"""
+        term_counts = Counter(tokenize(content))
+        with self._lock:
+            if doc_id in self.doc_lengths:
+                self._remove_locked(doc_id)
+            for term, count in term_counts.items():
+                self.postings[term][doc_id] = count
+            length = sum(term_counts.values())
+            self.doc_lengths[doc_id] = length
+            self.doc_terms[doc_id] = list(term_counts)
+            self.total_length += length
+
+    def add_many(self, items: Iterable[Tuple[str, str]]):
+        for doc_id, content in items:
+            self.add(doc_id, content)
+
+    def remove(self, doc_id: str):
+        with self._lock:
+            self._remove_locked(doc_id)
+
+    def clear(self):
+        with self._lock:
+            self.postings.clear()
+            self.doc_lengths.clear()
+            self.doc_terms.clear()
+            self.total_length = 0
+
+    def memory_bytes(self) -> int:
+        """Approximate size of the postings, lengths and per-document term lists"""
+        with self._lock:
+            # One postings entry per distinct term of a document, plus its term list and length
+            documents = sampled_bytes(
+                self.doc_terms.values(),
+                len(self.doc_terms),
+                lambda terms: sys.getsizeof(terms) + (len(terms) + 2) * CONTAINER_ENTRY_BYTES
+            )
+            terms = sampled_bytes(
+                self.postings, len(self.postings), lambda term: sys.getsizeof(term) + sys.getsizeof({})
+            )
+            return documents + terms
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        accept: Optional[Callable[[str], bool]] = None
+    ) -> List[Tuple[str, float]]:
+        """Return (doc_id, bm25_score) pairs, best first"""
+        query_terms = set(tokenize(query))
+        with self._lock:
+            n_docs = len(self.doc_lengths)
+            if not n_docs or not query_terms:
+                return []
+            avg_length = self.total_length / n_docs
+
+            scores: Dict[str, float] = defaultdict(float)
+            for term in query_terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                df = len(postings)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        if accept is not None:
+            scores = {doc_id: score for doc_id, score in scores.items() if accept(doc_id)}
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+    def _remove_locked(self, doc_id: str):
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(doc_id)
+
+def reciprocal_rank_fusion(
+    rankings: Dict[str, List[str]],
+    k: int = 60
+) -> List[Tuple[str, float, Dict[str, int]]]:
+    """Fuse ranked id lists with RRF: score(d) = sum over retrievers of 1 / (k + rank).
+
+    Returns (doc_id, fused_score, {retriever: 1-based rank}) sorted best first.
+    """
+    fused: Dict[str, float] = defaultdict(float)
+    ranks: Dict[str, Dict[str, int]] = defaultdict(dict)
+    for retriever, doc_ids in rankings.items():
+        for rank, doc_id in enumerate(doc_ids, start=1):
+            fused[doc_id] += 1.0 / (k + rank)
+            ranks[doc_id][retriever] = rank
+    ordered = sorted(fused.items(), key=lambda item: item[1], reverse=True)
+    return [(doc_id, score, ranks[doc_id]) for doc_id, score in ordered]
@@ -0,0 +1,210 @@
+"""
+Inverted metadata index for filtered vector search in LuminaOps
+Filters use the Chroma `where` operator syntax so they can be passed through
+to Chroma unchanged and evaluated locally for FAISS.
+"""
+
+from typing import Dict, Any, List, Optional, Set, Tuple
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+import sys
+
+from ai_services.vector_db.sizing import CONTAINER_ENTRY_BYTES, sampled_bytes
+
+# Operators accepted in filter expressions
+EQUALITY_OPERATORS = {"$eq", "$in"}
+RANGE_OPERATORS = {"$gt", "$gte", "$lt", "$lte"}
+SUPPORTED_OPERATORS = EQUALITY_OPERATORS | RANGE_OPERATORS
+
+Condition = Tuple[str, str, Any]  # (field, operator, value)
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _key(value: Any) -> Tuple[bool, Any]:
+    """Postings key; True == 1 and False == 0 in Python, but a bool filter must only match bools"""
+    return isinstance(value, bool), value
+
+def _equal(actual: Any, value: Any) -> bool:
+    return _key(actual) == _key(value)
+
+def parse_filters(filters: Optional[Dict[str, Any]]) -> List[Condition]:
+    """Normalize a filter expression into a flat list of AND-ed conditions.
+
+    Examples:
+        {"category": "ml"}                        -> equality
+        {"tag": {"$in": ["faq", "howto"]}}         -> set membership
+        {"year": {"$gte": 2020, "$lt": 2024}}      -> numeric range
+    """
+    conditions: List[Condition] = []
+    if not filters:
+        return conditions
+    if not isinstance(filters, dict):
+        raise ValueError("Filters must be an object mapping metadata fields to conditions")
+
+    for field, spec in filters.items():
+        if field.startswith("$"):
+            raise ValueError(f"Unsupported top-level filter operator: {field}")
+        if not isinstance(spec, dict):
+            conditions.append((field, "$eq", spec))
+            continue
+        if not spec:
+            raise ValueError(f"Empty condition for field '{field}'")
+        for operator, value in spec.items():
+            if operator not in SUPPORTED_OPERATORS:
+                raise ValueError(f"Unsupported filter operator '{operator}' for field '{field}'")
+            if operator == "$in":
+                if not isinstance(value, (list, tuple, set)):
+                    raise ValueError(f"'$in' for field '{field}' expects a list of values")
+                value = list(value)
+            elif operator in RANGE_OPERATORS and not _is_number(value):
+                raise ValueError(f"'{operator}' for field '{field}' expects a number")
+            conditions.append((field, operator, value))
+    return conditions
+
+def to_chroma_where(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Translate a filter expression into a Chroma `where` clause"""
+    clauses = [{field: {operator: value}} for field, operator, value in parse_filters(filters)]
+    if not clauses:
+        return None
+    if len(clauses) == 1:
+        return clauses[0]
+    return {"$and": clauses}
+
+def _condition_matches(actual: Any, operator: str, value: Any) -> bool:
+    values = actual if isinstance(actual, (list, tuple, set)) else [actual]
+    if operator == "$eq":
+        return any(_equal(v, value) for v in values)
+    if operator == "$in":
+        return any(_equal(v, candidate) for v in values for candidate in value)
+    numbers = [v for v in values if _is_number(v)]
+    if operator == "$gt":
+        return any(v > value for v in numbers)
+    if operator == "$gte":
+        return any(v >= value for v in numbers)
+    if operator == "$lt":
+        return any(v < value for v in numbers)
+    if operator == "$lte":
+        return any(v <= value for v in numbers)
+    return False
+
+def matches_filters(metadata: Dict[str, Any], conditions: List[Condition]) -> bool:
+    """Evaluate parsed conditions against a single document's metadata (post-filtering)"""
+    for field, operator, value in conditions:
+        if field not in metadata or not _condition_matches(metadata[field], operator, value):
+            return False
+    return True
+
+class MetadataIndex:
+    """Inverted index over document metadata.
+
+    Keeps field -> value -> ids postings for equality/membership lookups and a
+    sorted (value, id) list per numeric field for range lookups. Updated
+    incrementally on every add and delete.
+    """
+
+    def __init__(self):
+        # field -> (is_bool, value) -> ids
+        self.postings: Dict[str, Dict[Tuple[bool, Any], Set[str]]] = defaultdict(lambda: defaultdict(set))
+        self.numeric: Dict[str, List[Tuple[float, str]]] = defaultdict(list)
+        self.metadata: Dict[str, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.metadata)
+
+    def add(self, doc_id: str, metadata: Dict[str, Any]):
+        """Index a document's metadata, replacing any previous entry for the id"""
+        if doc_id in self.metadata:
+            self.remove(doc_id)
+        metadata = metadata or {}
+        self.metadata[doc_id] = metadata
+        for field, value in metadata.items():
+            for v in self._values(value):
+                self.postings[field][_key(v)].add(doc_id)
+                if _is_number(v):
+                    insort(self.numeric[field], (v, doc_id))
+
+    def remove(self, doc_id: str):
+        """Drop a document from the index"""
+        metadata = self.metadata.pop(doc_id, None)
+        if metadata is None:
+            return
+        for field, value in metadata.items():
+            for v in self._values(value):
+                ids = self.postings[field].get(_key(v))
+                if ids is not None:
+                    ids.discard(doc_id)
+                    if not ids:
+                        del self.postings[field][_key(v)]
+                if _is_number(v):
+                    entries = self.numeric[field]
+                    pos = bisect_left(entries, (v, doc_id))
+                    if pos < len(entries) and entries[pos] == (v, doc_id):
+                        entries.pop(pos)
+
+    def clear(self):
+        self.postings.clear()
+        self.numeric.clear()
+        self.metadata.clear()
+
+    def memory_bytes(self) -> int:
+        """Approximate size of the postings; the metadata dicts are shared with the document store"""
+        numeric_entry = sys.getsizeof((0.0, "")) + CONTAINER_ENTRY_BYTES
+
+        def document_bytes(metadata: Dict[str, Any]) -> int:
+            values = [v for value in metadata.values() for v in self._values(value)]
+            numeric = sum(1 for v in values if _is_number(v))
+            return (len(values) + 1) * CONTAINER_ENTRY_BYTES + numeric * numeric_entry
+
+        return sampled_bytes(self.metadata.values(), len(self.metadata), document_bytes)
+
+    def lookup(self, conditions: List[Condition]) -> Set[str]:
+        """Return the ids of documents that satisfy every condition"""
+        candidates: Optional[Set[str]] = None
+        # Evaluate the cheapest (smallest) postings first so intersections stay small
+        for field, operator, value in sorted(conditions, key=self._estimate):
+            ids = self._lookup_condition(field, operator, value)
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return set()
+        return candidates if candidates is not None else set(self.metadata)
+
+    def selectivity(self, matched: int) -> float:
+        """Fraction of indexed documents matched by a filter"""
+        return matched / len(self.metadata) if self.metadata else 0.0
+
+    def _lookup_condition(self, field: str, operator: str, value: Any) -> Set[str]:
+        postings = self.postings.get(field, {})
+        if operator == "$eq":
+            return set(postings.get(_key(value), ()))
+        if operator == "$in":
+            ids: Set[str] = set()
+            for v in value:
+                ids |= postings.get(_key(v), set())
+            return ids
+
+        entries = self.numeric.get(field, [])
+        if operator == "$gt":
+            start, end = bisect_right(entries, (value, chr(0x10FFFF))), len(entries)
+        elif operator == "$gte":
+            start, end = bisect_left(entries, (value, "")), len(entries)
+        elif operator == "$lt":
+            start, end = 0, bisect_left(entries, (value, ""))
+        else:  # $lte
+            start, end = 0, bisect_right(entries, (value, chr(0x10FFFF)))
+        return {doc_id for _, doc_id in entries[start:end]}
+
+    def _estimate(self, condition: Condition) -> int:
+        field, operator, value = condition
+        postings = self.postings.get(field, {})
+        if operator == "$eq":
+            return len(postings.get(_key(value), ()))
+        if operator == "$in":
+            return sum(len(postings.get(_key(v), ())) for v in value)
+        return len(self.numeric.get(field, []))
+
+    @staticmethod
+    def _values(value: Any) -> List[Any]:
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        # Only hashable scalars are indexable
+        return [v for v in values if isinstance(v, (str, int, float, bool)) or v is None]
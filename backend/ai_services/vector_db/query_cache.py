@@ -0,0 +1,107 @@
+"""
+Query caching for the LuminaOps vector database
+Two tiers: query text -> embedding, and (embedding, top_k, filters) -> search
+results. Result keys carry the index version, so any add or delete makes
+earlier entries unreachable; they are also dropped eagerly to free memory.
+"""
+
+from typing import Dict, Any, List, Optional, Hashable, Tuple
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+import time
+
+import numpy as np
+
+from core.monitoring import record_vector_query_cache
+
+class TTLCache:
+    """Thread-safe LRU cache with a size bound and per-entry expiry"""
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            hit_ratio, size = self.hit_ratio, len(self._entries)
+        record_vector_query_cache(self.name, entry is not None, hit_ratio, size)
+        return entry[1] if entry is not None else None
+
+    def put(self, key: Hashable, value: Any):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hit_ratio, 4)
+            }
+
+class QueryCache:
+    """Embedding and result caches for one vector DB service"""
+
+    def __init__(self, embedding_entries: int, result_entries: int, ttl_seconds: float):
+        self.embeddings = TTLCache("embedding", embedding_entries, ttl_seconds)
+        self.results = TTLCache("result", result_entries, ttl_seconds)
+        self.version = 0
+
+    def invalidate(self):
+        """Bump the index version after the index changed"""
+        self.version += 1
+        self.results.clear()
+
+    @staticmethod
+    def embedding_key(model_name: str, text: str) -> Tuple[str, str]:
+        return (model_name, text)
+
+    def result_key(self, vector: np.ndarray, top_k: int, filters: Optional[Dict[str, Any]]) -> Tuple:
+        digest = hashlib.blake2b(
+            np.ascontiguousarray(vector, dtype=np.float32).tobytes(), digest_size=16
+        ).digest()
+        filters_key = json.dumps(filters, sort_keys=True, default=str) if filters else ""
+        return (self.version, digest, top_k, filters_key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "index_version": self.version,
+            "embedding": self.embeddings.stats(),
+            "result": self.results.stats()
+        }
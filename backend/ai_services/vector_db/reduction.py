@@ -0,0 +1,79 @@
+"""
+Dimensionality reduction for LuminaOps FAISS indexes
+Embeddings are projected onto an orthonormal basis of lower dimension before
+indexing: either the top principal directions of a corpus sample (PCA) or a
+random basis. The projection is linear and uncentered, so inner products in the
+reduced space approximate the original cosine similarities.
+"""
+
+from typing import Dict, Any, Optional
+from enum import Enum
+from pathlib import Path
+
+import numpy as np
+
+class ReductionMethod(Enum):
+    PCA = "pca"
+    RANDOM = "random"
+
+class DimensionReducer:
+    """Orthonormal (input_dimension x output_dimension) projection"""
+
+    def __init__(self, method: ReductionMethod, input_dimension: int, output_dimension: int, seed: int = 0):
+        if output_dimension is None or not 0 < output_dimension < input_dimension:
+            raise ValueError("Reduced dimension must be positive and below the embedding dimension")
+        self.method = ReductionMethod(method)
+        self.input_dimension = input_dimension
+        self.output_dimension = output_dimension
+        self.seed = seed
+        self.matrix: Optional[np.ndarray] = None
+        self.explained_variance: Optional[float] = None
+
+    @property
+    def fitted(self) -> bool:
+        return self.matrix is not None
+
+    def fit(self, sample: np.ndarray):
+        """Learn the projection; a random basis ignores the sample"""
+        rng = np.random.default_rng(self.seed)
+        k = self.output_dimension
+        if self.method == ReductionMethod.RANDOM:
+            basis = rng.standard_normal((self.input_dimension, k))
+        else:
+            sample = np.asarray(sample, dtype=np.float64).reshape(-1, self.input_dimension)
+            _, singular_values, vt = np.linalg.svd(sample, full_matrices=False)
+            energy = singular_values ** 2
+            self.explained_variance = float(energy[:k].sum() / energy.sum()) if energy.sum() else 0.0
+            basis = vt[:k].T
+            if basis.shape[1] < k:
+                # Fewer sample rows than output dimensions: complete the basis randomly
+                basis = np.hstack([basis, rng.standard_normal((self.input_dimension, k - basis.shape[1]))])
+        # QR keeps the span of the leading columns and makes the basis orthonormal
+        q, _ = np.linalg.qr(basis)
+        self.matrix = np.ascontiguousarray(q[:, :k], dtype=np.float32)
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        return np.ascontiguousarray(np.asarray(vectors, dtype=np.float32) @ self.matrix)
+
+    def inverse_transform(self, reduced: np.ndarray) -> np.ndarray:
+        """Best full-dimension approximation of reduced vectors"""
+        return np.ascontiguousarray(np.asarray(reduced, dtype=np.float32) @ self.matrix.T)
+
+    def save(self, path: Path):
+        with open(path, "wb") as f:
+            np.save(f, self.matrix)
+
+    def load(self, path: Path):
+        matrix = np.load(path)
+        if matrix.shape != (self.input_dimension, self.output_dimension):
+            raise ValueError(f"Saved projection {path} has shape {matrix.shape}")
+        self.matrix = matrix.astype(np.float32)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "method": self.method.value,
+            "input_dimension": self.input_dimension,
+            "output_dimension": self.output_dimension,
+            "fitted": self.fitted,
+            "explained_variance": round(self.explained_variance, 4) if self.explained_variance is not None else None
+        }
@@ -0,0 +1,438 @@
+"""
+Sharded FAISS vector index for LuminaOps
+Documents are hash-partitioned across shard worker processes, each holding
+its own FAISSService. Queries are embedded once in the coordinator, scattered
+to every shard in parallel and the per-shard top-k lists are merged.
+
+Shards are local processes by default. A shard can also run on another host:
+    VECTOR_DB_SHARD_AUTHKEY=<secret> python -m ai_services.vector_db.sharding --host 10.0.0.5 --port 7101
+and be referenced by address in `shard_addresses`. Shard connections exchange
+pickles, so anyone who can connect with the key can run code on the shard:
+bind to loopback or a private interface, never a public one.
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from multiprocessing.connection import Client, Connection, Listener
+import argparse
+import asyncio
+import hashlib
+import heapq
+import multiprocessing
+import threading
+
+import numpy as np
+
+from core.config import settings
+from ai_services.vector_db.executor import vector_executor, Lane
+from ai_services.vector_db.metadata_index import parse_filters
+from ai_services.vector_db.vector_service import (
+    VectorDBInterface, FAISSService, Document, SearchResult, encode_texts, document_embeddings
+)
+from ai_services.vector_db.embedder_pool import embedder_registry
+
+# Former built-in default, rejected like an empty key
+INSECURE_AUTHKEYS = {"", "lumina-shard-key-change-in-production"}
+
+def shard_authkey() -> bytes:
+    """VECTOR_DB_SHARD_AUTHKEY; raises ValueError when it is unset or a known default"""
+    if settings.VECTOR_DB_SHARD_AUTHKEY in INSECURE_AUTHKEYS:
+        raise ValueError("Remote shards need VECTOR_DB_SHARD_AUTHKEY set to a private secret")
+    return settings.VECTOR_DB_SHARD_AUTHKEY.encode()
+
+def jump_hash(doc_id: str, num_shards: int) -> int:
+    """Jump consistent hash: growing from N to N+1 shards moves only ~1/(N+1) of the keys"""
+    key = int.from_bytes(hashlib.md5(doc_id.encode("utf-8")).digest()[:8], "little")
+    bucket, candidate = -1, 0
+    while candidate < num_shards:
+        bucket = candidate
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        candidate = int((bucket + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return bucket
+
+class LayoutLock:
+    """Shared/exclusive asyncio lock over the shard layout.
+
+    Adds, deletes, searches and listings hold it shared; a rebalance holds it
+    exclusively. Shared holders arriving while a rebalance waits queue behind
+    it, so a steady stream of searches cannot starve the migration.
+    """
+
+    def __init__(self):
+        self._condition = asyncio.Condition()
+        self._shared = 0
+        self._exclusive = False
+        self._exclusive_waiting = 0
+
+    @asynccontextmanager
+    async def shared(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._exclusive and not self._exclusive_waiting)
+            self._shared += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._shared -= 1
+                self._condition.notify_all()
+
+    @asynccontextmanager
+    async def exclusive(self):
+        async with self._condition:
+            self._exclusive_waiting += 1
+            try:
+                await self._condition.wait_for(lambda: not self._exclusive and not self._shared)
+            finally:
+                self._exclusive_waiting -= 1
+            self._exclusive = True
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._exclusive = False
+                self._condition.notify_all()
+
+class ShardServer:
+    """Command loop around one FAISSService, used inside a shard process"""
+
+    def __init__(self, service_kwargs: Dict[str, Any]):
+        self.service = FAISSService(**service_kwargs)
+        # Commands run synchronously; the one loop is only needed to initialize
+        self.loop = asyncio.new_event_loop()
+        self.loop.run_until_complete(self.service.initialize())
+
+    def handle(self, command: str, args: Tuple):
+        service = self.service
+        if command == "add":
+            service._add_documents_sync(args[0])
+            return len(service.store)
+        if command == "search":
+            query_matrix, top_k, conditions = args
+            return service._search_matrix(query_matrix, top_k, conditions)
+        if command == "delete":
+            service._delete_documents_sync(args[0])
+            return len(service.store)
+        if command == "extract":
+            return self._extract(*args)
+        if command == "list":
+            return service._list_documents_sync()
+        if command == "memory":
+            return service.memory_usage()
+        raise ValueError(f"Unknown shard command: {command}")
+
+    def _extract(self, num_shards: int, shard_index: int) -> List[Document]:
+        """Remove and return (with vectors) documents that now hash to another shard"""
+        service = self.service
+        with service._lock:
+            moving = [
+                position for position, doc_id in enumerate(service.store.ids)
+                if jump_hash(doc_id, num_shards) != shard_index
+            ]
+            if not moving:
+                return []
+            vectors = service._reconstruct(moving)
+            documents = []
+            for position, vector in zip(moving, vectors):
+                document = service._document(position)
+                document.embedding = vector.tolist()
+                documents.append(document)
+            service._delete_documents_sync([document.id for document in documents])
+        return documents
+
+    def serve(self, conn: Connection):
+        while True:
+            try:
+                command, args = conn.recv()
+            except EOFError:
+                return
+            if command == "close":
+                conn.send(("ok", None))
+                return
+            try:
+                conn.send(("ok", self.handle(command, args)))
+            except Exception as e:
+                conn.send(("error", f"{type(e).__name__}: {e}"))
+
+def _local_shard_main(conn: Connection, service_kwargs: Dict[str, Any]):
+    ShardServer(service_kwargs).serve(conn)
+
+def serve_remote_shard(host: str, port: int, authkey: bytes, service_kwargs: Dict[str, Any]):
+    """Serve one shard over TCP; the index persists across coordinator reconnects"""
+    if authkey.decode() in INSECURE_AUTHKEYS:
+        raise ValueError("Refusing to serve a shard without a private authkey")
+    server = ShardServer(service_kwargs)
+    with Listener((host, port), authkey=authkey) as listener:
+        print(f"Vector shard listening on {host}:{port}")
+        while True:
+            with listener.accept() as conn:
+                server.serve(conn)
+
+class ShardClient:
+    """Blocking request/response channel to one shard (local pipe or TCP)"""
+
+    def __init__(self, conn: Connection, process: Optional[multiprocessing.Process] = None):
+        self.conn = conn
+        self.process = process
+        self._lock = threading.Lock()
+
+    def call(self, command: str, *args):
+        with self._lock:
+            self.conn.send((command, args))
+            status, result = self.conn.recv()
+        if status != "ok":
+            raise RuntimeError(f"Shard {command} failed: {result}")
+        return result
+
+    def close(self):
+        try:
+            self.call("close")
+        except (EOFError, OSError, RuntimeError):
+            pass
+        self.conn.close()
+        if self.process is not None:
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                self.process.terminate()
+
+class ShardedFAISSService(VectorDBInterface):
+    """FAISS index partitioned across shard processes with scatter-gather search"""
+
+    def __init__(
+        self,
+        num_shards: int = settings.VECTOR_DB_SHARDS,
+        dimension: int = 384,
+        shard_addresses: Optional[List[str]] = None,
+        embedding_model: str = settings.EMBEDDING_MODEL_NAME,
+        **shard_options
+    ):
+        # Remote "host:port" addresses take precedence over spawning local shards
+        self.shard_addresses = shard_addresses or []
+        self.num_shards = len(self.shard_addresses) or num_shards
+        self.dimension = dimension
+        self.shard_options = {"dimension": dimension, "embedding_model": embedding_model, **shard_options}
+        self.embedder = embedder_registry.get(embedding_model)
+        self.shards: List[ShardClient] = []
+        self._layout = LayoutLock()
+        self._scatter_pool: Optional[ThreadPoolExecutor] = None
+        self._mp = multiprocessing.get_context("spawn")
+
+    async def initialize(self):
+        """Start (or connect to) the shard processes"""
+        try:
+            await self.close()
+            if self.shard_addresses:
+                self.shards = [self._connect(address) for address in self.shard_addresses]
+            else:
+                self.shards = await asyncio.gather(
+                    *(asyncio.to_thread(self._spawn) for _ in range(self.num_shards))
+                )
+            self._scatter_pool = ThreadPoolExecutor(
+                max_workers=self.num_shards, thread_name_prefix="vectordb-shard"
+            )
+            return True
+        except Exception as e:
+            print(f"Failed to initialize sharded FAISS: {e}")
+            return False
+
+    def _spawn(self) -> ShardClient:
+        parent_conn, child_conn = self._mp.Pipe()
+        process = self._mp.Process(
+            target=_local_shard_main, args=(child_conn, self.shard_options), daemon=True
+        )
+        process.start()
+        child_conn.close()
+        return ShardClient(parent_conn, process)
+
+    def _connect(self, address: str) -> ShardClient:
+        host, port = address.rsplit(":", 1)
+        conn = Client((host, int(port)), authkey=shard_authkey())
+        return ShardClient(conn)
+
+    async def _scatter(self, calls: List[Tuple[int, str, Tuple]]) -> List[Any]:
+        """Run (shard_index, command, args) calls in parallel and return results in order"""
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(*(
+            loop.run_in_executor(self._scatter_pool, lambda i=i, c=c, a=a: self.shards[i].call(c, *a))
+            for i, c, a in calls
+        ))
+
+    def _partition(self, documents: List[Document]) -> Dict[int, List[Document]]:
+        partitions: Dict[int, List[Document]] = {}
+        for doc in documents:
+            partitions.setdefault(jump_hash(doc.id, self.num_shards), []).append(doc)
+        return partitions
+
+    async def add_documents(self, documents: List[Document]) -> bool:
+        """Embed in the coordinator, then add each partition to its shard"""
+        try:
+            embeddings = await vector_executor.run(Lane.INGEST, document_embeddings, self.embedder, documents)
+            documents = [
+                Document(id=doc.id, content=doc.content, metadata=doc.metadata, embedding=embedding.tolist())
+                for doc, embedding in zip(documents, embeddings)
+            ]
+            async with self._layout.shared():
+                await self._scatter([
+                    (shard, "add", (docs,)) for shard, docs in self._partition(documents).items()
+                ])
+            return True
+        except Exception as e:
+            print(f"Failed to add documents to sharded FAISS: {e}")
+            return False
+
+    async def search(self, query: str, top_k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[SearchResult]:
+        """Search documents by text query"""
+        results = await self.search_batch([query], top_k, filters)
+        return results[0] if results else []
+
+    async def search_by_vector(self, vector: List[float], top_k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[SearchResult]:
+        """Search documents by embedding vector"""
+        try:
+            return (await self._search_matrix(np.array([vector], dtype=np.float32), top_k, filters))[0]
+        except Exception as e:
+            print(f"Sharded FAISS search failed: {e}")
+            return []
+
+    async def search_batch(self, queries: List[str], top_k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[List[SearchResult]]:
+        """Encode all queries once and scatter a single matrix search to every shard"""
+        if not queries:
+            return []
+        try:
+            query_matrix = await vector_executor.run(Lane.SEARCH, encode_texts, self.embedder, queries)
+            return await self._search_matrix(query_matrix, top_k, filters)
+        except Exception as e:
+            print(f"Sharded FAISS search failed: {e}")
+            return [[] for _ in queries]
+
+    async def search_batch_by_vector(self, vectors: np.ndarray, top_k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[List[SearchResult]]:
+        """Scatter a single matrix search of precomputed vectors to every shard"""
+        if len(vectors) == 0:
+            return []
+        try:
+            return await self._search_matrix(np.asarray(vectors, dtype=np.float32), top_k, filters)
+        except Exception as e:
+            print(f"Sharded FAISS search failed: {e}")
+            return [[] for _ in vectors]
+
+    async def _search_matrix(
+        self,
+        query_matrix: np.ndarray,
+        top_k: int,
+        filters: Optional[Dict[str, Any]]
+    ) -> List[List[SearchResult]]:
+        conditions = parse_filters(filters)
+        async with self._layout.shared():
+            per_shard = await self._scatter([
+                (shard, "search", (query_matrix, top_k, conditions)) for shard in range(len(self.shards))
+            ])
+        # Gather: merge each query's per-shard top-k lists into a global top-k
+        return [
+            heapq.nlargest(top_k, (result for shard_results in per_shard for result in shard_results[row]),
+                           key=lambda result: result.score)
+            for row in range(len(query_matrix))
+        ]
+
+    async def delete_documents(self, ids: List[str]) -> bool:
+        """Delete documents from the shards that own them"""
+        try:
+            async with self._layout.shared():
+                partitions: Dict[int, List[str]] = {}
+                for doc_id in ids:
+                    partitions.setdefault(jump_hash(doc_id, self.num_shards), []).append(doc_id)
+                await self._scatter([(shard, "delete", (doc_ids,)) for shard, doc_ids in partitions.items()])
+            return True
+        except Exception as e:
+            print(f"Failed to delete documents from sharded FAISS: {e}")
+            return False
+
+    async def list_documents(self) -> List[Document]:
+        """Return every stored document across shards"""
+        async with self._layout.shared():
+            per_shard = await self._scatter([(shard, "list", ()) for shard in range(len(self.shards))])
+        return [doc for docs in per_shard for doc in docs]
+
+    async def rebalance(self, num_shards: int) -> Dict[str, Any]:
+        """Change the number of local shards, moving only documents whose shard changed.
+
+        The migration holds the layout lock exclusively: adds, deletes and
+        searches wait for it to finish, so none of them sees or writes to a
+        half-moved layout.
+        """
+        if self.shard_addresses:
+            raise ValueError("Rebalancing is only supported for local shard processes")
+        if num_shards < 1:
+            raise ValueError("num_shards must be at least 1")
+        async with self._layout.exclusive():
+            return await self._rebalance(num_shards)
+
+    async def _rebalance(self, num_shards: int) -> Dict[str, Any]:
+        previous = self.num_shards
+        if num_shards > previous:
+            self.shards.extend(await asyncio.gather(
+                *(asyncio.to_thread(self._spawn) for _ in range(num_shards - previous))
+            ))
+            self._resize_scatter_pool(num_shards)
+
+        # Every current shard hands over the documents that hash elsewhere under the new count
+        extracted = await self._scatter([
+            (shard, "extract", (num_shards, shard)) for shard in range(len(self.shards))
+        ])
+        moving = [doc for docs in extracted for doc in docs]
+
+        retired = self.shards[num_shards:]
+        self.shards = self.shards[:num_shards]
+        self.num_shards = num_shards
+        for shard in retired:
+            await asyncio.to_thread(shard.close)
+        self._resize_scatter_pool(num_shards)
+
+        await self._scatter([
+            (shard, "add", (docs,)) for shard, docs in self._partition(moving).items()
+        ])
+        return {"previous_shards": previous, "shards": num_shards, "documents_moved": len(moving)}
+
+    def _resize_scatter_pool(self, num_shards: int):
+        old_pool = self._scatter_pool
+        self._scatter_pool = ThreadPoolExecutor(max_workers=num_shards, thread_name_prefix="vectordb-shard")
+        if old_pool is not None:
+            old_pool.shutdown(wait=False)
+
+    def memory_usage(self) -> Dict[str, Any]:
+        """Per-shard vector memory"""
+        shards = [shard.call("memory") for shard in self.shards]
+        return {
+            "shards": shards,
+            "documents": sum(shard["documents"] for shard in shards),
+            "index_bytes": sum(shard["index_bytes"] for shard in shards),
+            "document_bytes": sum(shard["document_bytes"] for shard in shards)
+        }
+
+    async def close(self):
+        """Stop local shard processes and disconnect from remote ones"""
+        shards, self.shards = self.shards, []
+        for shard in shards:
+            await asyncio.to_thread(shard.close)
+        if self._scatter_pool is not None:
+            self._scatter_pool.shutdown(wait=False)
+            self._scatter_pool = None
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a LuminaOps vector index shard server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7101)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--storage", default="float32", choices=["float32", "float16", "int8"])
+    args = parser.parse_args()
+    try:
+        authkey = shard_authkey()
+    except ValueError as e:
+        parser.error(str(e))
+    serve_remote_shard(
+        args.host,
+        args.port,
+        authkey,
+        {"dimension": args.dimension, "storage": args.storage}
+    )
+
+if __name__ == "__main__":
+    main()
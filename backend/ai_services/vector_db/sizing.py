@@ -0,0 +1,44 @@
+"""
+Approximate memory accounting for LuminaOps vector structures
+Python-side structures (document columns, BM25 and metadata postings, MinHash
+signatures) can outweigh a quantized index. They are sized by measuring a
+sample of entries and scaling to the total, so accounting stays cheap enough
+to run after every collection write.
+"""
+
+from typing import Any, Callable, Iterable, Optional
+from itertools import islice
+import sys
+
+import numpy as np
+
+SAMPLE_SIZE = 256
+# Hash table slot plus the object header of a small int or reference, for
+# entries of dicts and sets whose keys and values are counted elsewhere
+CONTAINER_ENTRY_BYTES = 48
+
+def deep_sizeof(obj: Any, seen: Optional[set] = None) -> int:
+    """Size of an object and everything it references, counting shared objects once"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, np.ndarray):
+        return size if obj.base is None else size + obj.nbytes
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+def sampled_bytes(items: Iterable[Any], total: int, measure: Callable[[Any], int] = deep_sizeof) -> int:
+    """Estimate the combined size of `total` items from the first SAMPLE_SIZE of them"""
+    if total <= 0:
+        return 0
+    sample = list(islice(items, SAMPLE_SIZE))
+    if not sample:
+        return 0
+    return int(sum(measure(item) for item in sample) * total / len(sample))
@@ -6,22 +6,72 @@ Supports ChromaDB, Weaviate, FAISS, and Pinecone
 from typing import List, Dict, Any, Optional, Tuple
 from abc import ABC, abstractmethod
 import numpy as np
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from enum import Enum
+from pathlib import Path
+import asyncio
+import json
+import math
+import os
+import sys
+import threading
+import time
 
+from ai_services.vector_db.metadata_index import (
+    MetadataIndex, Condition, parse_filters, matches_filters, to_chroma_where
+)
+from ai_services.vector_db.lexical_index import BM25Index, reciprocal_rank_fusion
+from ai_services.vector_db.embedder_pool import embedder_registry
+from ai_services.vector_db.executor import vector_executor, Lane
+from ai_services.vector_db.document_store import ColumnarDocumentStore, VectorColumn
+from ai_services.vector_db.query_cache import QueryCache
+from ai_services.vector_db.sizing import CONTAINER_ENTRY_BYTES, SAMPLE_SIZE, sampled_bytes
+from ai_services.vector_db.reduction import DimensionReducer, ReductionMethod
+from ai_services.vector_db.dedup import (
+    Deduplicator, DedupConfig, DedupMode, DUPLICATE_OF, duplicate_group, within_batch_matches
+)
+from core.config import settings
+from core.monitoring import record_vector_dedup
+
+# Backends are imported independently so FAISS works without Chroma/Weaviate installed
 try:
     import chromadb
     from chromadb.config import Settings
+except ImportError as e:
+    print(f"Warning: Vector DB libraries not installed: {e}")
+
+try:
     import faiss
+except ImportError as e:
+    print(f"Warning: Vector DB libraries not installed: {e}")
+
+try:
     import weaviate
-    from sentence_transformers import SentenceTransformer
 except ImportError as e:
     print(f"Warning: Vector DB libraries not installed: {e}")
 
+# Texts per encode call during ingestion; bounds how long one call holds the embedder
+ENCODE_CHUNK_SIZE = 64
+
+# Candidates fetched per result when collapsing duplicate groups
+COLLAPSE_OVERFETCH = 3
+
+# Files written by FAISSService.save under its persist directory
+FAISS_INDEX_FILE = "index.faiss"
+FAISS_DOCUMENTS_FILE = "documents.json"
+FAISS_FULL_VECTORS_FILE = "full_vectors.npy"
+FAISS_REDUCTION_FILE = "reduction.npy"
+
+class VectorStorage(Enum):
+    FLOAT32 = "float32"  # IndexFlatIP, exact
+    FLOAT16 = "float16"  # Scalar quantizer, half precision (2 bytes/dim)
+    INT8 = "int8"        # Scalar quantizer, 8-bit codes (1 byte/dim)
+
 class VectorDBProvider(Enum):
     CHROMA = "chroma"
     WEAVIATE = "weaviate"
     FAISS = "faiss"
+    FAISS_SHARDED = "faiss_sharded"
     PINECONE = "pinecone"
 
 @dataclass
@@ -37,6 +87,16 @@ class SearchResult:
     score: float
     distance: float
 
+@dataclass
+class HybridSearchResult(SearchResult):
+    # 1-based rank of the document in each retriever that returned it
+    ranks: Dict[str, int] = field(default_factory=dict)
+
+@dataclass
+class HybridSearchResponse:
+    results: List[HybridSearchResult]
+    latency_ms: Dict[str, float]
+
 class VectorDBInterface(ABC):
     """Abstract base class for vector databases"""
     
@@ -45,241 +105,671 @@ class VectorDBInterface(ABC):
         pass
     
     @abstractmethod
-    async def search(self, query: str, top_k: int = 10) -> List[SearchResult]:
+    async def search(self, query: str, top_k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[SearchResult]:
+        pass
+    
+    @abstractmethod
+    async def search_by_vector(self, vector: List[float], top_k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[SearchResult]:
+        pass
+    
+    @abstractmethod
+    async def search_batch(self, queries: List[str], top_k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[List[SearchResult]]:
         pass
     
     @abstractmethod
-    async def search_by_vector(self, vector: List[float], top_k: int = 10) -> List[SearchResult]:
+    async def search_batch_by_vector(self, vectors: np.ndarray, top_k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[List[SearchResult]]:
         pass
     
     @abstractmethod
     async def delete_documents(self, ids: List[str]) -> bool:
         pass
+    
+    @abstractmethod
+    async def list_documents(self) -> List[Document]:
+        pass
+
+def encode_texts(embedder, texts: List[str], chunk_size: int = ENCODE_CHUNK_SIZE) -> np.ndarray:
+    """Encode texts into a float32 matrix, one chunk at a time.
+
+    The shared embedder serializes `encode` calls, so bulk ingestion releases it
+    between chunks and lets other callers interleave. Search-lane queries use
+    their own model copy unless VECTOR_DB_SEARCH_EMBEDDER is off.
+    """
+    chunks = [
+        np.asarray(embedder.encode(texts[i:i + chunk_size]), dtype=np.float32)
+        for i in range(0, len(texts), chunk_size)
+    ]
+    return np.vstack(chunks)
+
+def document_embeddings(embedder, documents: List[Document]) -> np.ndarray:
+    """Return embeddings for documents, encoding only those without one"""
+    missing = [i for i, doc in enumerate(documents) if not doc.embedding]
+    encoded = encode_texts(embedder, [documents[i].content for i in missing]) if missing else None
+    
+    rows = []
+    encoded_rows = iter(encoded) if encoded is not None else iter(())
+    for doc in documents:
+        rows.append(np.asarray(doc.embedding, dtype=np.float32) if doc.embedding else next(encoded_rows))
+    return np.vstack(rows)
 
 class ChromaDBService(VectorDBInterface):
     """ChromaDB implementation for vector storage"""
     
-    def __init__(self, collection_name: str = "lumina_docs"):
+    def __init__(self, collection_name: str = "lumina_docs", embedding_model: str = settings.EMBEDDING_MODEL_NAME):
         self.collection_name = collection_name
         self.client = None
         self.collection = None
-        self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
+        self.embedder = embedder_registry.get(embedding_model)  # Shared, loaded on first encode
     
     async def initialize(self):
         """Initialize ChromaDB client and collection"""
         try:
-            self.client = chromadb.Client(Settings(
-                chroma_db_impl="duckdb+parquet",
-                persist_directory="./data/chroma"
-            ))
-            
-            self.collection = self.client.get_or_create_collection(
-                name=self.collection_name,
-                metadata={"hnsw:space": "cosine"}
-            )
+            await vector_executor.run(Lane.INGEST, self._initialize_sync)
             return True
         except Exception as e:
             print(f"Failed to initialize ChromaDB: {e}")
             return False
     
+    def _initialize_sync(self):
+        self.client = chromadb.Client(Settings(
+            chroma_db_impl="duckdb+parquet",
+            persist_directory="./data/chroma"
+        ))
+        
+        self.collection = self.client.get_or_create_collection(
+            name=self.collection_name,
+            metadata={"hnsw:space": "cosine"}
+        )
+    
     async def add_documents(self, documents: List[Document]) -> bool:
         """Add documents to ChromaDB"""
         try:
-            ids = [doc.id for doc in documents]
-            texts = [doc.content for doc in documents]
-            metadatas = [doc.metadata for doc in documents]
-            
-            # Generate embeddings if not provided
-            embeddings = []
-            for doc in documents:
-                if doc.embedding:
-                    embeddings.append(doc.embedding)
-                else:
-                    embedding = self.embedder.encode(doc.content).tolist()
-                    embeddings.append(embedding)
-            
-            self.collection.add(
-                ids=ids,
-                documents=texts,
-                metadatas=metadatas,
-                embeddings=embeddings
-            )
+            await vector_executor.run(Lane.INGEST, self._add_documents_sync, documents)
             return True
         except Exception as e:
             print(f"Failed to add documents: {e}")
             return False
     
-    async def search(self, query: str, top_k: int = 10) -> List[SearchResult]:
-        """Search documents by text query"""
-        try:
-            query_embedding = self.embedder.encode(query).tolist()
-            
-            results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=top_k,
-                include=['documents', 'metadatas', 'distances']
+    def _add_documents_sync(self, documents: List[Document]):
+        # Generate embeddings if not provided
+        embeddings = document_embeddings(self.embedder, documents)
+        
+        self.collection.add(
+            ids=[doc.id for doc in documents],
+            documents=[doc.content for doc in documents],
+            metadatas=[doc.metadata for doc in documents],
+            embeddings=embeddings.tolist()
+        )
+    
+    def _to_search_results(self, results: Dict[str, Any], row: int) -> List[SearchResult]:
+        """Convert one row of a Chroma query response into search results"""
+        search_results = []
+        for i, doc_id in enumerate(results['ids'][row]):
+            document = Document(
+                id=doc_id,
+                content=results['documents'][row][i],
+                metadata=results['metadatas'][row][i]
             )
             
-            search_results = []
-            for i, doc_id in enumerate(results['ids'][0]):
-                document = Document(
-                    id=doc_id,
-                    content=results['documents'][0][i],
-                    metadata=results['metadatas'][0][i]
-                )
-                
-                result = SearchResult(
-                    document=document,
-                    score=1 - results['distances'][0][i],  # Convert distance to similarity score
-                    distance=results['distances'][0][i]
-                )
-                search_results.append(result)
-            
-            return search_results
+            result = SearchResult(
+                document=document,
+                score=1 - results['distances'][row][i],  # Convert distance to similarity score
+                distance=results['distances'][row][i]
+            )
+            search_results.append(result)
+        
+        return search_results
+    
+    def _query_sync(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: int,
+        filters: Optional[Dict[str, Any]]
+    ) -> List[List[SearchResult]]:
+        # Chroma applies `where` as a pre-filter inside its own segment reader
+        results = self.collection.query(
+            query_embeddings=query_embeddings,
+            n_results=top_k,
+            where=to_chroma_where(filters),
+            include=['documents', 'metadatas', 'distances']
+        )
+        return [self._to_search_results(results, row) for row in range(len(query_embeddings))]
+    
+    def _search_texts_sync(
+        self,
+        queries: List[str],
+        top_k: int,
+        filters: Optional[Dict[str, Any]]
+    ) -> List[List[SearchResult]]:
+        query_embeddings = encode_texts(self.embedder, queries).tolist()
+        return self._query_sync(query_embeddings, top_k, filters)
+    
+    async def search(self, query: str, top_k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[SearchResult]:
+        """Search documents by text query"""
+        try:
+            results = await vector_executor.run(Lane.SEARCH, self._search_texts_sync, [query], top_k, filters)
+            return results[0]
         except Exception as e:
             print(f"Search failed: {e}")
             return []
     
-    async def search_by_vector(self, vector: List[float], top_k: int = 10) -> List[SearchResult]:
+    async def search_by_vector(self, vector: List[float], top_k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[SearchResult]:
         """Search documents by embedding vector"""
         try:
-            results = self.collection.query(
-                query_embeddings=[vector],
-                n_results=top_k,
-                include=['documents', 'metadatas', 'distances']
-            )
-            
-            search_results = []
-            for i, doc_id in enumerate(results['ids'][0]):
-                document = Document(
-                    id=doc_id,
-                    content=results['documents'][0][i],
-                    metadata=results['metadatas'][0][i]
-                )
-                
-                result = SearchResult(
-                    document=document,
-                    score=1 - results['distances'][0][i],
-                    distance=results['distances'][0][i]
-                )
-                search_results.append(result)
-            
-            return search_results
+            results = await vector_executor.run(Lane.SEARCH, self._query_sync, [vector], top_k, filters)
+            return results[0]
         except Exception as e:
             print(f"Vector search failed: {e}")
             return []
     
+    async def search_batch(self, queries: List[str], top_k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[List[SearchResult]]:
+        """Search many text queries with one batched encode and one query call"""
+        if not queries:
+            return []
+        try:
+            return await vector_executor.run(Lane.SEARCH, self._search_texts_sync, queries, top_k, filters)
+        except Exception as e:
+            print(f"Batch search failed: {e}")
+            return [[] for _ in queries]
+    
+    async def search_batch_by_vector(self, vectors: np.ndarray, top_k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[List[SearchResult]]:
+        """Search many embedding vectors with one query call"""
+        if len(vectors) == 0:
+            return []
+        try:
+            query_embeddings = np.asarray(vectors, dtype=np.float32).tolist()
+            return await vector_executor.run(Lane.SEARCH, self._query_sync, query_embeddings, top_k, filters)
+        except Exception as e:
+            print(f"Batch search failed: {e}")
+            return [[] for _ in vectors]
+    
     async def delete_documents(self, ids: List[str]) -> bool:
         """Delete documents from ChromaDB"""
         try:
-            self.collection.delete(ids=ids)
+            await vector_executor.run(Lane.INGEST, self.collection.delete, ids=ids)
             return True
         except Exception as e:
             print(f"Failed to delete documents: {e}")
             return False
+    
+    async def list_documents(self) -> List[Document]:
+        """Return every stored document (without embeddings)"""
+        try:
+            results = await vector_executor.run(
+                Lane.INGEST, self.collection.get, include=['documents', 'metadatas']
+            )
+            return [
+                Document(id=doc_id, content=content, metadata=metadata or {})
+                for doc_id, content, metadata in zip(
+                    results['ids'], results['documents'], results['metadatas']
+                )
+            ]
+        except Exception as e:
+            print(f"Failed to list documents: {e}")
+            return []
 
 class FAISSService(VectorDBInterface):
     """FAISS implementation for vector storage"""
     
-    def __init__(self, dimension: int = 384):
+    def __init__(
+        self,
+        dimension: int = 384,
+        prefilter_selectivity: float = 0.25,
+        embedding_model: str = settings.EMBEDDING_MODEL_NAME,
+        storage: VectorStorage = VectorStorage.FLOAT32,
+        rescore_factor: int = 0,
+        full_precision_path: Optional[str] = None,
+        persist_directory: Optional[str] = None,
+        reduction: Optional[ReductionMethod] = None,
+        reduced_dimension: Optional[int] = None,
+        reduction_sample: int = 20000
+    ):
         self.dimension = dimension
         self.index = None
-        self.documents = {}  # Store documents separately
-        self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
+        self.storage = VectorStorage(storage)
+        # Optional projection to reduced_dimension, fitted on (a sample of) the
+        # first batch; the index then holds only projected vectors
+        self.reducer = DimensionReducer(reduction, dimension, reduced_dimension) if reduction else None
+        self.reduction_sample = reduction_sample
+        # Documents are stored as columns aligned with index positions
+        self.store = ColumnarDocumentStore()
+        self.metadata_index = MetadataIndex()
+        # With rescore_factor > 0, quantized or reduced search fetches
+        # top_k * rescore_factor candidates and re-ranks them against full
+        # float32 vectors, kept in RAM or memory-mapped from full_precision_path
+        self.rescore_factor = rescore_factor
+        self.full_precision_path = full_precision_path
+        self.full_vectors: Optional[VectorColumn] = None
+        # Filters matching less than this fraction of the corpus are pre-filtered
+        # with an ID selector; broader filters over-fetch and post-filter instead
+        self.prefilter_selectivity = prefilter_selectivity
+        # When set, initialize() restores a previous save() from this directory
+        self.persist_directory = Path(persist_directory) if persist_directory else None
+        self.embedder = embedder_registry.get(embedding_model)  # Shared, loaded on first encode
+        # Guards the index and document store; encoding happens outside of it
+        self._lock = threading.RLock()
     
     async def initialize(self):
-        """Initialize FAISS index"""
+        """Initialize FAISS index, loading it from the persist directory if saved there"""
         try:
-            self.index = faiss.IndexFlatIP(self.dimension)  # Inner product similarity
+            await vector_executor.run(Lane.INGEST, self._initialize_sync)
             return True
         except Exception as e:
             print(f"Failed to initialize FAISS: {e}")
             return False
     
-    async def add_documents(self, documents: List[Document]) -> bool:
-        """Add documents to FAISS index"""
+    def _initialize_sync(self):
+        with self._lock:
+            self.index = self._new_index()
+            self.store.clear()
+            self.metadata_index.clear()
+            if self.rescore_factor > 0:
+                self.full_vectors = VectorColumn(self.dimension, self.full_precision_path)
+            if self.reducer is not None:
+                self.reducer.matrix = None
+            if self.persist_directory and (self.persist_directory / FAISS_INDEX_FILE).exists():
+                self._load_sync()
+    
+    def _load_sync(self):
+        directory = self.persist_directory
+        index = faiss.read_index(str(directory / FAISS_INDEX_FILE))
+        with open(directory / FAISS_DOCUMENTS_FILE) as f:
+            columns = json.load(f)
+        if index.d != self.index_dimension or index.ntotal != len(columns["ids"]):
+            raise ValueError(f"Saved index in {directory} does not match its documents or dimension")
+        if self.reducer is not None and index.ntotal:
+            self.reducer.load(directory / FAISS_REDUCTION_FILE)
+        
+        self.index = index
+        for doc_id, content, metadata in zip(columns["ids"], columns["contents"], columns["metadatas"]):
+            self.store.append(doc_id, content, metadata)
+            self.metadata_index.add(doc_id, metadata)
+        if self.full_vectors is not None and index.ntotal:
+            vectors_path = directory / FAISS_FULL_VECTORS_FILE
+            if vectors_path.exists():
+                self.full_vectors.append(np.load(vectors_path, mmap_mode="r"))
+            else:
+                # Saved without rescoring; decoded codes are the best available
+                self.full_vectors.append(self._decode(range(index.ntotal)))
+    
+    async def save(self) -> bool:
+        """Write the index and documents to the persist directory"""
+        if self.persist_directory is None:
+            raise ValueError("FAISSService has no persist_directory")
         try:
-            embeddings = []
-            for doc in documents:
-                if doc.embedding:
-                    embeddings.append(doc.embedding)
-                else:
-                    embedding = self.embedder.encode(doc.content).tolist()
-                    embeddings.append(embedding)
-                
-                # Store document separately
-                self.documents[doc.id] = doc
-            
-            embeddings_array = np.array(embeddings, dtype=np.float32)
+            await vector_executor.run(Lane.INGEST, self._save_sync)
+            return True
+        except Exception as e:
+            print(f"Failed to save FAISS index: {e}")
+            return False
+    
+    def _save_sync(self):
+        directory = self.persist_directory
+        directory.mkdir(parents=True, exist_ok=True)
+        
+        def replace(name: str, write):
+            # Write next to the target and rename, so a crash never leaves a torn file
+            tmp_path = directory / f"{name}.tmp"
+            write(str(tmp_path))
+            os.replace(tmp_path, directory / name)
+        
+        with self._lock:
+            columns = {"ids": self.store.ids, "contents": self.store.contents, "metadatas": self.store.metadatas}
             
-            # Normalize embeddings for cosine similarity
-            faiss.normalize_L2(embeddings_array)
+            def write_documents(path: str):
+                with open(path, "w") as f:
+                    json.dump(columns, f)
             
-            self.index.add(embeddings_array)
+            replace(FAISS_DOCUMENTS_FILE, write_documents)
+            if self.full_vectors is not None:
+                vectors = self.full_vectors.take(range(len(self.full_vectors)))
+                
+                def write_vectors(path: str):
+                    with open(path, "wb") as f:
+                        np.save(f, vectors)
+                
+                replace(FAISS_FULL_VECTORS_FILE, write_vectors)
+            if self.reducer is not None and self.reducer.fitted:
+                replace(FAISS_REDUCTION_FILE, lambda path: self.reducer.save(path))
+            # Index last; _load_sync rejects an index that disagrees with the documents
+            replace(FAISS_INDEX_FILE, lambda path: faiss.write_index(self.index, path))
+    
+    async def add_documents(self, documents: List[Document]) -> bool:
+        """Add documents to FAISS index"""
+        try:
+            await vector_executor.run(Lane.INGEST, self._add_documents_sync, documents)
             return True
         except Exception as e:
             print(f"Failed to add documents to FAISS: {e}")
             return False
     
-    async def search(self, query: str, top_k: int = 10) -> List[SearchResult]:
-        """Search documents by text query"""
-        query_embedding = self.embedder.encode(query).reshape(1, -1).astype(np.float32)
-        faiss.normalize_L2(query_embedding)
+    @property
+    def index_dimension(self) -> int:
+        return self.reducer.output_dimension if self.reducer is not None else self.dimension
+    
+    def _reduce(self, vectors: np.ndarray) -> np.ndarray:
+        return self.reducer.transform(vectors) if self.reducer is not None else vectors
+    
+    def _reconstruct(self, positions) -> np.ndarray:
+        """Full-dimension vectors for positions, exact when full vectors are kept"""
+        if self.full_vectors is not None:
+            return self.full_vectors.take(np.fromiter(positions, dtype=np.int64))
+        return self._decode(positions)
+    
+    def _decode(self, positions) -> np.ndarray:
+        """Full-dimension vectors for positions, decoded from the index codes"""
+        positions = np.fromiter(positions, dtype=np.int64)
+        if not len(positions):
+            return np.empty((0, self.dimension), dtype=np.float32)
+        vectors = self.index.reconstruct_batch(positions)
+        return self.reducer.inverse_transform(vectors) if self.reducer is not None else vectors
+    
+    def _new_index(self):
+        """Create an empty index for the configured storage mode"""
+        dimension = self.index_dimension
+        if self.storage == VectorStorage.FLOAT32:
+            return faiss.IndexFlatIP(dimension)  # Inner product similarity
         
-        return await self.search_by_vector(query_embedding[0].tolist(), top_k)
+        quantizer_type = (
+            faiss.ScalarQuantizer.QT_fp16 if self.storage == VectorStorage.FLOAT16
+            else faiss.ScalarQuantizer.QT_8bit
+        )
+        index = faiss.IndexScalarQuantizer(dimension, quantizer_type, faiss.METRIC_INNER_PRODUCT)
+        # Widen the trained per-dimension range so later batches are not clipped
+        index.sq.rangestat = faiss.ScalarQuantizer.RS_minmax
+        index.sq.rangestat_arg = 0.2
+        return index
     
-    async def search_by_vector(self, vector: List[float], top_k: int = 10) -> List[SearchResult]:
-        """Search documents by embedding vector"""
-        try:
-            vector_array = np.array([vector], dtype=np.float32)
-            faiss.normalize_L2(vector_array)
+    def _add_documents_sync(self, documents: List[Document]):
+        # Last write wins for duplicate ids within the batch
+        documents = list({doc.id: doc for doc in documents}.values())
+        embeddings_array = np.ascontiguousarray(document_embeddings(self.embedder, documents))
+        
+        # Normalize embeddings for cosine similarity
+        faiss.normalize_L2(embeddings_array)
+        
+        with self._lock:
+            # Re-added ids replace their previous version
+            existing = [doc.id for doc in documents if doc.id in self.store]
+            if existing:
+                self._delete_documents_sync(existing)
             
-            scores, indices = self.index.search(vector_array, top_k)
+            if self.reducer is not None and not self.reducer.fitted:
+                self._fit_reducer(embeddings_array)
+            index_vectors = self._reduce(embeddings_array)
             
-            search_results = []
-            doc_ids = list(self.documents.keys())
+            if not self.index.is_trained:
+                # int8 codes need per-dimension ranges; learn them from the first batch
+                self.index.train(index_vectors if len(index_vectors) > 1 else self._unit_range())
             
-            for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-                if idx < len(doc_ids):
-                    doc_id = doc_ids[idx]
-                    document = self.documents[doc_id]
-                    
-                    result = SearchResult(
-                        document=document,
-                        score=float(score),
-                        distance=1 - float(score)
-                    )
-                    search_results.append(result)
+            for doc in documents:
+                # Only id, content and metadata are kept; embeddings live in the index
+                self.store.append(doc.id, doc.content, doc.metadata)
+                self.metadata_index.add(doc.id, doc.metadata)
             
-            return search_results
+            self.index.add(index_vectors)
+            if self.full_vectors is not None:
+                self.full_vectors.append(embeddings_array)
+    
+    def _fit_reducer(self, embeddings: np.ndarray):
+        if len(embeddings) > self.reduction_sample:
+            rows = np.random.default_rng(0).choice(len(embeddings), self.reduction_sample, replace=False)
+            embeddings = embeddings[rows]
+        if self.reducer.method == ReductionMethod.PCA and len(embeddings) < 2 * self.reducer.output_dimension:
+            print(
+                f"Warning: fitting PCA on {len(embeddings)} vectors for {self.reducer.output_dimension} "
+                "dimensions; add a larger, representative first batch for better recall"
+            )
+        self.reducer.fit(embeddings)
+    
+    def _unit_range(self) -> np.ndarray:
+        """Training sample spanning [-1, 1] per dimension, for tiny first batches"""
+        dimension = self.index_dimension
+        return np.vstack([-np.ones(dimension), np.ones(dimension)]).astype(np.float32)
+    
+    def _document(self, position: int) -> Document:
+        return Document(
+            id=self.store.ids[position],
+            content=self.store.contents[position],
+            metadata=self.store.metadatas[position]
+        )
+    
+    def _index_search(self, query_matrix: np.ndarray, top_k: int, params=None) -> Tuple[np.ndarray, np.ndarray]:
+        """Search the index, re-scoring candidates at full precision when enabled"""
+        index_queries = self._reduce(query_matrix)
+        exact_index = self.storage == VectorStorage.FLOAT32 and self.reducer is None
+        if self.full_vectors is None or exact_index:
+            return self.index.search(index_queries, top_k, params=params)
+        
+        fetch_k = min(self.index.ntotal, top_k * self.rescore_factor)
+        _, indices = self.index.search(index_queries, max(fetch_k, 1), params=params)
+        
+        scores = np.full(indices.shape, -np.inf, dtype=np.float32)
+        for row, row_indices in enumerate(indices):
+            valid = row_indices >= 0
+            if valid.any():
+                scores[row, valid] = self.full_vectors.take(row_indices[valid]) @ query_matrix[row]
+        order = np.argsort(-scores, axis=1)
+        scores = np.take_along_axis(scores, order, axis=1)
+        indices = np.take_along_axis(indices, order, axis=1)
+        indices[np.isneginf(scores)] = -1
+        return scores, indices
+    
+    def memory_usage(self) -> Dict[str, Any]:
+        """Vector memory footprint, with a projection to one million documents"""
+        with self._lock:
+            count = self.index.ntotal if self.index is not None else 0
+            code_size = self.index.code_size if self.index is not None else 0
+            full_precision_bytes = self.full_vectors.nbytes if self.full_vectors is not None else 0
+            document_bytes = self.store.memory_bytes() + self.metadata_index.memory_bytes()
+        return {
+            "storage": self.storage.value,
+            "documents": count,
+            "bytes_per_vector": code_size,
+            "index_bytes": count * code_size,
+            "full_precision_bytes": full_precision_bytes,
+            "full_precision_on_disk": self.full_precision_path is not None,
+            "document_bytes": document_bytes,  # Contents, metadata and metadata postings (estimated)
+            "index_bytes_per_million_documents": code_size * 1_000_000,
+            "reduction": self.reducer.stats() if self.reducer is not None else None
+        }
+    
+    def _search_texts_sync(
+        self,
+        queries: List[str],
+        top_k: int,
+        conditions: List[Condition]
+    ) -> List[List[SearchResult]]:
+        return self._search_matrix(encode_texts(self.embedder, queries), top_k, conditions)
+    
+    async def search(self, query: str, top_k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[SearchResult]:
+        """Search documents by text query"""
+        try:
+            results = await vector_executor.run(
+                Lane.SEARCH, self._search_texts_sync, [query], top_k, parse_filters(filters)
+            )
+            return results[0]
         except Exception as e:
             print(f"FAISS search failed: {e}")
             return []
     
-    async def delete_documents(self, ids: List[str]) -> bool:
-        """Delete documents from FAISS (requires rebuilding index)"""
+    async def search_by_vector(self, vector: List[float], top_k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[SearchResult]:
+        """Search documents by embedding vector"""
         try:
-            for doc_id in ids:
-                if doc_id in self.documents:
-                    del self.documents[doc_id]
+            vector_array = np.array([vector], dtype=np.float32)
+            results = await vector_executor.run(
+                Lane.SEARCH, self._search_matrix, vector_array, top_k, parse_filters(filters)
+            )
+            return results[0]
+        except Exception as e:
+            print(f"FAISS search failed: {e}")
+            return []
+    
+    async def search_batch(self, queries: List[str], top_k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[List[SearchResult]]:
+        """Search many text queries with one batched encode and one index search"""
+        if not queries:
+            return []
+        try:
+            return await vector_executor.run(
+                Lane.SEARCH, self._search_texts_sync, queries, top_k, parse_filters(filters)
+            )
+        except Exception as e:
+            print(f"FAISS batch search failed: {e}")
+            return [[] for _ in queries]
+    
+    async def search_batch_by_vector(self, vectors: np.ndarray, top_k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[List[SearchResult]]:
+        """Search many embedding vectors with one index search"""
+        if len(vectors) == 0:
+            return []
+        try:
+            return await vector_executor.run(
+                Lane.SEARCH, self._search_matrix, np.asarray(vectors, dtype=np.float32), top_k, parse_filters(filters)
+            )
+        except Exception as e:
+            print(f"FAISS batch search failed: {e}")
+            return [[] for _ in vectors]
+    
+    def _search_matrix(
+        self,
+        query_matrix: np.ndarray,
+        top_k: int,
+        conditions: Optional[List[Condition]] = None
+    ) -> List[List[SearchResult]]:
+        """Run a single index search for a (n_queries, dimension) matrix"""
+        query_matrix = np.ascontiguousarray(query_matrix, dtype=np.float32)
+        faiss.normalize_L2(query_matrix)
+        
+        with self._lock:
+            if not conditions:
+                scores, indices = self._index_search(query_matrix, top_k)
+                return [self._to_search_results(row_scores, row_indices, top_k)
+                        for row_scores, row_indices in zip(scores, indices)]
+            
+            candidates = self.metadata_index.lookup(conditions)
+            if not candidates:
+                return [[] for _ in range(len(query_matrix))]
+            
+            selectivity = self.metadata_index.selectivity(len(candidates))
+            if selectivity < self.prefilter_selectivity:
+                return self._prefiltered_search(query_matrix, top_k, candidates)
             
-            # Rebuild index without deleted documents
-            await self.initialize()
-            if self.documents:
-                remaining_docs = list(self.documents.values())
-                await self.add_documents(remaining_docs)
+            # Broad filter: over-fetch in proportion to selectivity, then post-filter.
+            # Rows that still come up short are retried with a pre-filter.
+            fetch_k = min(self.index.ntotal, math.ceil(top_k / selectivity) * 2)
+            scores, indices = self._index_search(query_matrix, fetch_k)
+            all_results = [self._to_search_results(row_scores, row_indices, top_k, candidates)
+                           for row_scores, row_indices in zip(scores, indices)]
             
+            short_rows = [row for row, results in enumerate(all_results)
+                          if len(results) < min(top_k, len(candidates))]
+            if short_rows:
+                retried = self._prefiltered_search(query_matrix[short_rows], top_k, candidates)
+                for row, results in zip(short_rows, retried):
+                    all_results[row] = results
+            
+            return all_results
+    
+    def _prefiltered_search(self, query_matrix: np.ndarray, top_k: int, candidates: set) -> List[List[SearchResult]]:
+        """Restrict the index search to candidate documents with an ID selector"""
+        allowed = np.array(sorted(self.store.position(doc_id) for doc_id in candidates), dtype=np.int64)
+        selector = faiss.IDSelectorBatch(len(allowed), faiss.swig_ptr(allowed))
+        params = faiss.SearchParameters(sel=selector)
+        
+        scores, indices = self._index_search(query_matrix, min(top_k, len(allowed)), params=params)
+        return [self._to_search_results(row_scores, row_indices, top_k)
+                for row_scores, row_indices in zip(scores, indices)]
+    
+    def _to_search_results(
+        self,
+        scores: np.ndarray,
+        indices: np.ndarray,
+        top_k: int,
+        allowed_ids: Optional[set] = None
+    ) -> List[SearchResult]:
+        """Convert one row of FAISS output into search results"""
+        search_results = []
+        for score, idx in zip(scores, indices):
+            if not 0 <= idx < len(self.store):
+                continue
+            if allowed_ids is not None and self.store.ids[idx] not in allowed_ids:
+                continue
+            
+            result = SearchResult(
+                document=self._document(idx),
+                score=float(score),
+                distance=1 - float(score)
+            )
+            search_results.append(result)
+            if len(search_results) >= top_k:
+                break
+        
+        return search_results
+    
+    async def delete_documents(self, ids: List[str]) -> bool:
+        """Delete documents from FAISS (requires rebuilding index)"""
+        try:
+            await vector_executor.run(Lane.INGEST, self._delete_documents_sync, ids)
             return True
         except Exception as e:
             print(f"Failed to delete documents from FAISS: {e}")
             return False
+    
+    def _delete_documents_sync(self, ids: List[str]):
+        with self._lock:
+            positions = sorted({self.store.position(doc_id) for doc_id in ids if doc_id in self.store})
+            if not positions:
+                return
+            for position in positions:
+                self.metadata_index.remove(self.store.ids[position])
+            
+            # Flat and scalar-quantized indexes compact in place and keep the
+            # relative order of the remaining rows, so columns compact the same way
+            removed = np.array(positions, dtype=np.int64)
+            self.index.remove_ids(faiss.IDSelectorBatch(len(removed), faiss.swig_ptr(removed)))
+            
+            removed_set = set(positions)
+            keep = [position for position in range(len(self.store)) if position not in removed_set]
+            self.store.compact(keep)
+            if self.full_vectors is not None:
+                self.full_vectors.compact(keep)
+    
+    async def list_documents(self) -> List[Document]:
+        """Return every stored document"""
+        return self._list_documents_sync()
+
+    def _list_documents_sync(self) -> List[Document]:
+        with self._lock:
+            return [self._document(position) for position in range(len(self.store))]
 
 class VectorDBService:
     """Unified vector database service"""
     
-    def __init__(self, provider: VectorDBProvider = VectorDBProvider.CHROMA):
+    def __init__(
+        self,
+        provider: VectorDBProvider = VectorDBProvider.CHROMA,
+        enable_lexical: bool = True,
+        enable_query_cache: bool = settings.VECTOR_QUERY_CACHE_ENABLED,
+        dedup_config: Optional[DedupConfig] = None
+    ):
         self.provider = provider
         self.db_service = None
+        # BM25 index kept alongside the vector backend for hybrid retrieval
+        self.enable_lexical = enable_lexical
+        self.lexical_index = BM25Index()
+        self.lexical_documents: Dict[str, Document] = {}
+        # Repeated queries skip re-encoding and, until the index changes, the index search
+        self.query_cache = QueryCache(
+            settings.VECTOR_EMBEDDING_CACHE_SIZE,
+            settings.VECTOR_RESULT_CACHE_SIZE,
+            settings.VECTOR_QUERY_CACHE_TTL
+        ) if enable_query_cache else None
+        # Near-duplicate detection at ingestion; defaults to the VECTOR_DEDUP_* settings
+        dedup_config = dedup_config or DedupConfig(
+            mode=DedupMode(settings.VECTOR_DEDUP_MODE),
+            jaccard_threshold=settings.VECTOR_DEDUP_JACCARD,
+            cosine_threshold=settings.VECTOR_DEDUP_COSINE
+        )
+        self.deduplicator = Deduplicator(dedup_config) if dedup_config.mode != DedupMode.OFF else None
     
     async def initialize(self, **kwargs):
         """Initialize the selected vector database"""
@@ -287,34 +777,323 @@ class VectorDBService:
             self.db_service = ChromaDBService(**kwargs)
         elif self.provider == VectorDBProvider.FAISS:
             self.db_service = FAISSService(**kwargs)
+        elif self.provider == VectorDBProvider.FAISS_SHARDED:
+            # Imported here because the sharding module builds on FAISSService
+            from ai_services.vector_db.sharding import ShardedFAISSService
+            kwargs.setdefault("shard_addresses", settings.VECTOR_DB_SHARD_ADDRESSES)
+            self.db_service = ShardedFAISSService(**kwargs)
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
         
-        return await self.db_service.initialize()
+        initialized = await self.db_service.initialize()
+        self._invalidate_cache()
+        if initialized and (self.enable_lexical or self.deduplicator):
+            # Rebuild in-memory indexes from documents already persisted by the backend
+            documents = await self.db_service.list_documents()
+            if self.enable_lexical:
+                self.lexical_index.clear()
+                self.lexical_documents = {}
+                self._index_lexical(documents)
+            if self.deduplicator:
+                self.deduplicator.clear()
+                for doc in documents:
+                    if DUPLICATE_OF not in (doc.metadata or {}):
+                        self.deduplicator.register(doc.id, doc.content)
+        return initialized
     
     async def add_documents(self, documents: List[Document]) -> bool:
         """Add documents to vector database"""
         if not self.db_service:
             raise ValueError("Database service not initialized")
-        return await self.db_service.add_documents(documents)
+        if self.deduplicator:
+            documents = await self._deduplicate(documents)
+            if not documents:
+                return True
+        success = await self.db_service.add_documents(documents)
+        self._invalidate_cache()  # Even on failure: a batch may have been partially applied
+        if success and self.enable_lexical:
+            self._index_lexical(documents)
+        return success
     
-    async def search(self, query: str, top_k: int = 10) -> List[SearchResult]:
-        """Search documents by text query"""
+    async def _deduplicate(self, documents: List[Document]) -> List[Document]:
+        """Drop or link near-duplicates of indexed documents and of each other"""
+        start = time.perf_counter()
+        dedup = self.deduplicator
+        documents = list({doc.id: doc for doc in documents}.values())  # Last write wins
+        canonical: Dict[str, str] = {}
+        
+        def match_contents():
+            for doc in documents:
+                match = dedup.match_content(doc.id, doc.content)
+                if match is not None:
+                    canonical[doc.id] = match
+        
+        await vector_executor.run(Lane.INGEST, match_contents)
+        by_content = len(canonical)
+        
+        threshold = dedup.config.cosine_threshold
+        rest = [i for i, doc in enumerate(documents) if doc.id not in canonical]
+        if threshold is not None and rest:
+            embeddings = await vector_executor.run(
+                Lane.INGEST, document_embeddings, self.db_service.embedder, [documents[i] for i in rest]
+            )
+            embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+            # Keep the embeddings so the backend does not encode these documents again
+            for i, embedding in zip(rest, embeddings):
+                documents[i] = replace(documents[i], embedding=embedding.tolist())
+            
+            # A re-added id can find its previous version and that version's
+            # duplicates, so skip its own group and look a few hits deep
+            hits = await self.db_service.search_batch_by_vector(embeddings, 4)
+            earlier = within_batch_matches(embeddings, threshold)
+            for row, i in enumerate(rest):
+                doc_id = documents[i].id
+                group = next(
+                    (duplicate_group(h.document) for h in hits[row]
+                     if h.score >= threshold and doc_id not in (h.document.id, duplicate_group(h.document))),
+                    None
+                )
+                if group is not None:
+                    canonical[doc_id] = group
+                elif earlier[row] is not None:
+                    first = documents[rest[earlier[row]]].id
+                    canonical[doc_id] = canonical.get(first, first)
+                if doc_id in canonical:
+                    dedup.forget(doc_id)  # Registered as canonical by the content pass
+        
+        seconds = time.perf_counter() - start
+        dedup.record(len(documents), by_content, len(canonical) - by_content, seconds)
+        record_vector_dedup(len(documents), len(canonical), seconds)
+        
+        if dedup.config.mode == DedupMode.SKIP:
+            return [doc for doc in documents if doc.id not in canonical]
+        return [
+            replace(doc, metadata={**doc.metadata, DUPLICATE_OF: canonical[doc.id]}) if doc.id in canonical else doc
+            for doc in documents
+        ]
+    
+    @staticmethod
+    def _collapse(results: List[SearchResult], top_k: int) -> List[SearchResult]:
+        """Keep the best-scoring result of each duplicate group"""
+        seen = set()
+        collapsed = []
+        for result in results:
+            group = duplicate_group(result.document)
+            if group not in seen:
+                seen.add(group)
+                collapsed.append(result)
+        return collapsed[:top_k]
+    
+    async def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        filters: Optional[Dict[str, Any]] = None,
+        collapse_duplicates: bool = False
+    ) -> List[SearchResult]:
+        """Search documents by text query, optionally filtered on metadata"""
+        if collapse_duplicates:
+            results = await self.search(query, top_k * COLLAPSE_OVERFETCH, filters)
+            return self._collapse(results, top_k)
         if not self.db_service:
             raise ValueError("Database service not initialized")
-        return await self.db_service.search(query, top_k)
+        parse_filters(filters)  # Reject malformed filters before touching the backend
+        if self.query_cache is None:
+            return await self.db_service.search(query, top_k, filters)
+        vectors = await self._query_embeddings([query])
+        return (await self._cached_vector_search(vectors, top_k, filters))[0]
     
-    async def search_by_vector(self, vector: List[float], top_k: int = 10) -> List[SearchResult]:
-        """Search documents by embedding vector"""
+    async def search_by_vector(self, vector: List[float], top_k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[SearchResult]:
+        """Search documents by embedding vector, optionally filtered on metadata"""
         if not self.db_service:
             raise ValueError("Database service not initialized")
-        return await self.db_service.search_by_vector(vector, top_k)
+        parse_filters(filters)
+        if self.query_cache is None:
+            return await self.db_service.search_by_vector(vector, top_k, filters)
+        vectors = np.asarray([vector], dtype=np.float32)
+        return (await self._cached_vector_search(vectors, top_k, filters))[0]
+    
+    async def search_batch(
+        self,
+        queries: List[str],
+        top_k: int = 10,
+        filters: Optional[Dict[str, Any]] = None,
+        collapse_duplicates: bool = False
+    ) -> List[List[SearchResult]]:
+        """Search documents for many text queries at once, one result list per query"""
+        if collapse_duplicates:
+            batch_results = await self.search_batch(queries, top_k * COLLAPSE_OVERFETCH, filters)
+            return [self._collapse(results, top_k) for results in batch_results]
+        if not self.db_service:
+            raise ValueError("Database service not initialized")
+        parse_filters(filters)
+        if self.query_cache is None or not queries:
+            return await self.db_service.search_batch(queries, top_k, filters)
+        vectors = await self._query_embeddings(queries)
+        return await self._cached_vector_search(vectors, top_k, filters)
+    
+    async def _query_embeddings(self, queries: List[str]) -> np.ndarray:
+        """Embed query texts, encoding only those missing from the embedding cache"""
+        embedder = self.db_service.embedder
+        cache = self.query_cache.embeddings
+        vectors = [cache.get(QueryCache.embedding_key(embedder.model_name, query)) for query in queries]
+        missing = list(dict.fromkeys(query for query, vector in zip(queries, vectors) if vector is None))
+        if missing:
+            encoded = await vector_executor.run(Lane.SEARCH, encode_texts, embedder, missing)
+            fresh = dict(zip(missing, encoded))
+            for query, vector in fresh.items():
+                cache.put(QueryCache.embedding_key(embedder.model_name, query), vector)
+            vectors = [vector if vector is not None else fresh[query] for query, vector in zip(queries, vectors)]
+        return np.vstack(vectors)
+    
+    async def _cached_vector_search(
+        self,
+        vectors: np.ndarray,
+        top_k: int,
+        filters: Optional[Dict[str, Any]]
+    ) -> List[List[SearchResult]]:
+        """Serve result lists from the cache, searching the backend once for all misses"""
+        cache = self.query_cache
+        # Keys embed the current index version, so results computed while an
+        # add/delete is in flight are stored under a version that is already stale
+        keys = [cache.result_key(vector, top_k, filters) for vector in vectors]
+        results = [cache.results.get(key) for key in keys]
+        missing = [i for i, hits in enumerate(results) if hits is None]
+        if missing:
+            fetched = await self.db_service.search_batch_by_vector(vectors[missing], top_k, filters)
+            for i, hits in zip(missing, fetched):
+                if hits:  # Backends return [] on failure; don't pin that for the TTL
+                    cache.results.put(keys[i], hits)
+                results[i] = hits
+        return [list(hits) for hits in results]
+    
+    def _invalidate_cache(self):
+        if self.query_cache is not None:
+            self.query_cache.invalidate()
+    
+    async def rebalance_shards(self, num_shards: int) -> Dict[str, Any]:
+        """Resize a sharded index, moving documents to their new shards"""
+        if not self.db_service:
+            raise ValueError("Database service not initialized")
+        if self.provider != VectorDBProvider.FAISS_SHARDED:
+            raise ValueError("Rebalancing requires the faiss_sharded provider")
+        result = await self.db_service.rebalance(num_shards)
+        self._invalidate_cache()
+        return result
+    
+    async def stats(self) -> Dict[str, Any]:
+        """Backend and memory statistics"""
+        if not self.db_service:
+            raise ValueError("Database service not initialized")
+        stats: Dict[str, Any] = {
+            "provider": self.provider.value,
+            "lexical_documents": len(self.lexical_index)
+        }
+        if hasattr(self.db_service, "memory_usage"):
+            # Sharded backends ask every shard, so keep the blocking calls off the event loop
+            stats["memory"] = await vector_executor.run(Lane.SEARCH, self.memory_usage)
+        if self.query_cache is not None:
+            stats["query_cache"] = self.query_cache.stats()
+        if self.deduplicator is not None:
+            stats["dedup"] = self.deduplicator.stats()
+        return stats
+    
+    def memory_usage(self) -> Dict[str, Any]:
+        """Backend memory plus the lexical index and dedup signatures kept by this service"""
+        memory = dict(self.db_service.memory_usage())
+        # Lexical documents share content and metadata with the backend's store
+        lexical_documents = sampled_bytes(
+            list(self.lexical_documents.values())[:SAMPLE_SIZE],
+            len(self.lexical_documents),
+            lambda doc: sys.getsizeof(doc) + sys.getsizeof(vars(doc)) + CONTAINER_ENTRY_BYTES
+        )
+        memory["lexical_bytes"] = self.lexical_index.memory_bytes() + lexical_documents if self.enable_lexical else 0
+        memory["dedup_bytes"] = self.deduplicator.memory_bytes() if self.deduplicator else 0
+        return memory
     
     async def delete_documents(self, ids: List[str]) -> bool:
         """Delete documents from vector database"""
         if not self.db_service:
             raise ValueError("Database service not initialized")
-        return await self.db_service.delete_documents(ids)
+        success = await self.db_service.delete_documents(ids)
+        self._invalidate_cache()
+        if success and self.deduplicator:
+            for doc_id in ids:
+                self.deduplicator.forget(doc_id)
+        if success and self.enable_lexical:
+            for doc_id in ids:
+                self.lexical_index.remove(doc_id)
+                self.lexical_documents.pop(doc_id, None)
+        return success
+    
+    async def hybrid_search(
+        self,
+        query: str,
+        top_k: int = 10,
+        filters: Optional[Dict[str, Any]] = None,
+        candidate_k: Optional[int] = None,
+        rrf_k: int = 60
+    ) -> HybridSearchResponse:
+        """Query the vector backend and the BM25 index concurrently and fuse with RRF"""
+        if not self.db_service:
+            raise ValueError("Database service not initialized")
+        if not self.enable_lexical:
+            raise ValueError("Lexical index is disabled for this service")
+        conditions = parse_filters(filters)
+        candidate_k = candidate_k or max(top_k * 3, 20)
+        
+        async def timed(coro):
+            start = time.perf_counter()
+            result = await coro
+            return result, (time.perf_counter() - start) * 1000
+        
+        def lexical_search():
+            accept = None
+            if conditions:
+                accept = lambda doc_id: matches_filters(self.lexical_documents[doc_id].metadata, conditions)
+            return self.lexical_index.search(query, candidate_k, accept)
+        
+        (vector_hits, vector_ms), (lexical_hits, lexical_ms) = await asyncio.gather(
+            timed(self.search(query, candidate_k, filters)),
+            timed(vector_executor.run(Lane.SEARCH, lexical_search))
+        )
+        
+        fusion_start = time.perf_counter()
+        vector_by_id = {hit.document.id: hit for hit in vector_hits}
+        fused = reciprocal_rank_fusion(
+            {
+                "vector": [hit.document.id for hit in vector_hits],
+                "lexical": [doc_id for doc_id, _ in lexical_hits]
+            },
+            k=rrf_k
+        )
+        
+        results = []
+        for doc_id, score, ranks in fused[:top_k]:
+            vector_hit = vector_by_id.get(doc_id)
+            document = vector_hit.document if vector_hit else self.lexical_documents[doc_id]
+            results.append(HybridSearchResult(
+                document=document,
+                score=score,
+                distance=vector_hit.distance if vector_hit else 1.0,
+                ranks=ranks
+            ))
+        fusion_ms = (time.perf_counter() - fusion_start) * 1000
+        
+        return HybridSearchResponse(
+            results=results,
+            latency_ms={
+                "vector": round(vector_ms, 3),
+                "lexical": round(lexical_ms, 3),
+                "fusion": round(fusion_ms, 3)
+            }
+        )
+    
+    def _index_lexical(self, documents: List[Document]):
+        for doc in documents:
+            self.lexical_index.add(doc.id, doc.content)
+            # Keep id/content/metadata only; embeddings are owned by the backend
+            self.lexical_documents[doc.id] = Document(id=doc.id, content=doc.content, metadata=doc.metadata)
 
 # Global service instance
-vector_db_service = VectorDBService()
\ No newline at end of file
+vector_db_service = VectorDBService(VectorDBProvider(settings.VECTOR_DB_PROVIDER))
\ No newline at end of file
@@ -1,12 +1,30 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi import APIRouter, HTTPException, UploadFile, File, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncGenerator
 import pandas as pd
+import json
+import math
+import time
 import numpy as np
 from io import StringIO
+import os
+import tempfile
 # Temporarily disabled for development: from api.v1.endpoints.auth import verify_token
 from ai_services.llm.llm_service import llm_service, code_service, LLMConfig, LLMProvider
+from ai_services.llm.response_cache import llm_response_cache
+from ai_services.llm.semantic_cache import llm_semantic_cache
+from ai_services.llm.http_pool import llm_http_pool
+from ai_services.llm.coalescing import llm_request_coalescer
+from ai_services.llm.admission import llm_admission, AdmissionRejected
+from ai_services.llm.router import llm_router
+from ai_services.llm.model_registry import local_model_registry, ModelKey
+from ai_services.llm.batch_jobs import llm_batch_manager, LLMBatchJob
+from ai_services.llm.mock_provider import mock_llm_provider
+from core.config import settings
 from ai_services.vector_db.vector_service import vector_db_service, Document
+from ai_services.vector_db.ingestion import ingestion_manager, IngestionFormat, ChunkingConfig
+from ai_services.vector_db.collection_manager import collection_manager, CollectionConfig
 from ai_services.automl.automl_service import automl_service, AutoMLConfig, ProblemType, ModelType
 
 router = APIRouter()
@@ -27,6 +45,14 @@ def convert_numpy_types(obj):
         return obj
 
 # LLM Endpoints
+def _rejected(e: AdmissionRejected) -> HTTPException:
+    """429 telling the client when the provider is expected to have capacity"""
+    return HTTPException(
+        status_code=429,
+        detail=str(e),
+        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+    )
+
 class LLMRequest(BaseModel):
     prompt: str
     provider: Optional[str] = "openai"
@@ -34,37 +60,62 @@ class LLMRequest(BaseModel):
     temperature: Optional[float] = 0.7
     max_tokens: Optional[int] = 1000
     system_prompt: Optional[str] = None
+    use_cache: bool = True  # False bypasses the response cache
+    fallbacks: Optional[List[str]] = None  # "provider/model" targets; defaults to LLM_ROUTER_FALLBACKS
+    hedge: Optional[bool] = None  # Defaults to LLM_ROUTER_HEDGING
+    dtype: Optional[str] = None  # Local models: float32, float16, bfloat16 or int8
 
 class CodeGenerationRequest(BaseModel):
     task_description: str
     code_type: Optional[str] = "python_ml"
     language: Optional[str] = "python"
+    use_cache: bool = True
+
+def _llm_config(request: LLMRequest) -> LLMConfig:
+    """Config for an LLM request; raises ValueError for unknown providers or fallback targets"""
+    config = LLMConfig(
+        provider=LLMProvider(request.provider),
+        model_name=request.model_name,
+        temperature=request.temperature,
+        max_tokens=request.max_tokens,
+        dtype=request.dtype
+    )
+    if config.provider == LLMProvider.HUGGINGFACE:
+        ModelKey.for_config(config)  # Validates the dtype
+    for target in request.fallbacks or []:
+        llm_router.parse_target(target, config)
+    return config
 
 @router.post("/llm/generate")
 async def generate_text(request: LLMRequest):
     """Generate text using LLM"""
     try:
-        config = LLMConfig(
-            provider=LLMProvider(request.provider),
-            model_name=request.model_name,
-            temperature=request.temperature,
-            max_tokens=request.max_tokens
-        )
-        
-        response = await llm_service.generate_text(
+        config = _llm_config(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        result = await llm_service.generate(
             request.prompt,
             config,
-            request.system_prompt
+            request.system_prompt,
+            use_cache=request.use_cache,
+            fallbacks=request.fallbacks,
+            hedge=request.hedge,
+            semantic_route="/llm/generate"
         )
         
         return {
-            "response": response,
+            "response": result.text,
             "config": {
                 "provider": request.provider,
                 "model": request.model_name,
                 "temperature": request.temperature
-            }
+            },
+            "metadata": result.metadata
         }
+    except AdmissionRejected as e:
+        raise _rejected(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Text generation failed: {str(e)}")
 
@@ -75,7 +126,8 @@ async def generate_code(request: CodeGenerationRequest):
         code = await code_service.generate_code(
             request.task_description,
             request.code_type,
-            request.language
+            request.language,
+            use_cache=request.use_cache
         )
         
         return {
@@ -84,22 +136,377 @@ async def generate_code(request: CodeGenerationRequest):
             "code_type": request.code_type,
             "language": request.language
         }
+    except AdmissionRejected as e:
+        raise _rejected(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Code generation failed: {str(e)}")
 
 @router.post("/llm/explain-code")
-async def explain_code(code: str):
+async def explain_code(code: str, use_cache: bool = True):
     """Explain code using AI"""
     try:
-        explanation = await code_service.explain_code(code)
+        explanation = await code_service.explain_code(code, use_cache=use_cache)
         
         return {
             "explanation": explanation,
             "code": code
         }
+    except AdmissionRejected as e:
+        raise _rejected(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Code explanation failed: {str(e)}")
 
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _sse_response(
+    request: Request,
+    chunks: AsyncGenerator[str, None],
+    metadata: Optional[Dict[str, Any]] = None
+) -> StreamingResponse:
+    """Relay a text stream as Server-Sent Events: token*, then done or error.
+
+    The client is checked between tokens; once it has gone, the generator is
+    closed, which cancels the upstream generation. metadata, filled in by the
+    generator, is sent with the done event.
+    """
+    async def events():
+        start_time = time.perf_counter()
+        ttft_ms = None
+        tokens = 0
+        try:
+            async for chunk in chunks:
+                if await request.is_disconnected():
+                    break
+                if ttft_ms is None:
+                    ttft_ms = round((time.perf_counter() - start_time) * 1000, 3)
+                tokens += 1
+                yield _sse_event("token", {"text": chunk})
+            else:
+                yield _sse_event("done", {
+                    "chunks": tokens,
+                    "ttft_ms": ttft_ms,
+                    "total_ms": round((time.perf_counter() - start_time) * 1000, 3),
+                    **({"metadata": metadata} if metadata is not None else {})
+                })
+        except Exception as e:
+            yield _sse_event("error", {"detail": str(e)})
+        finally:
+            await chunks.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/llm/generate/stream")
+async def generate_text_stream(request: LLMRequest, http_request: Request):
+    """Stream generated text as Server-Sent Events"""
+    try:
+        config = _llm_config(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    metadata = {}
+    return _sse_response(
+        http_request,
+        llm_service.generate_stream(
+            request.prompt,
+            config,
+            request.system_prompt,
+            use_cache=request.use_cache,
+            fallbacks=request.fallbacks,
+            metadata=metadata,
+            # Shares entries with /llm/generate
+            semantic_route="/llm/generate"
+        ),
+        metadata
+    )
+
+@router.post("/llm/generate-code/stream")
+async def generate_code_stream(request: CodeGenerationRequest, http_request: Request):
+    """Stream generated code as Server-Sent Events"""
+    return _sse_response(
+        http_request,
+        code_service.stream_code(
+            request.task_description,
+            request.code_type,
+            request.language,
+            use_cache=request.use_cache
+        )
+    )
+
+@router.post("/llm/explain-code/stream")
+async def explain_code_stream(code: str, http_request: Request, use_cache: bool = True):
+    """Stream a code explanation as Server-Sent Events"""
+    return _sse_response(http_request, code_service.stream_explanation(code, use_cache=use_cache))
+
+@router.get("/llm/cache/stats")
+async def get_llm_cache_stats():
+    """Get LLM response cache statistics"""
+    return llm_response_cache.stats()
+
+@router.delete("/llm/cache")
+async def clear_llm_cache():
+    """Drop all cached LLM responses"""
+    try:
+        await llm_response_cache.clear()
+        return {"message": "LLM response cache cleared"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to clear LLM cache: {str(e)}")
+
+@router.get("/llm/semantic-cache/stats")
+async def get_llm_semantic_cache_stats():
+    """Get LLM semantic cache statistics"""
+    return {"enabled": settings.LLM_SEMANTIC_CACHE_ENABLED, **llm_semantic_cache.stats()}
+
+@router.delete("/llm/semantic-cache")
+async def invalidate_llm_semantic_cache(
+    route: Optional[str] = None,
+    provider: Optional[str] = None,
+    model: Optional[str] = None
+):
+    """Drop semantic cache entries matching the given route, provider and model (all when none are given)"""
+    try:
+        removed = await llm_semantic_cache.invalidate(route=route, provider=provider, model=model)
+        return {"removed": removed}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to invalidate LLM semantic cache: {str(e)}")
+
+@router.get("/llm/http-pool/stats")
+async def get_llm_http_pool_stats():
+    """Get shared LLM HTTP connection pool statistics"""
+    return llm_http_pool.stats()
+
+@router.get("/llm/coalescing/stats")
+async def get_llm_coalescing_stats():
+    """Get in-flight LLM request coalescing statistics"""
+    return llm_request_coalescer.stats()
+
+@router.get("/llm/admission/stats")
+async def get_llm_admission_stats():
+    """Get LLM admission control limits, queue depths and rejections"""
+    return llm_admission.stats()
+
+@router.get("/llm/router/stats")
+async def get_llm_router_stats():
+    """Get rolling latency and error rates per provider/model used for routing"""
+    return llm_router.stats()
+
+@router.get("/llm/local/batching/stats")
+async def get_llm_batching_stats():
+    """Get batch sizes and throughput of the local-model batch schedulers"""
+    return local_model_registry.batching_stats()
+
+class LocalModelRequest(BaseModel):
+    model_name: str
+    dtype: Optional[str] = None  # Defaults to LLM_LOCAL_DTYPE
+
+@router.get("/llm/local/models")
+async def get_local_models():
+    """Get loaded local models with load time, memory and last use"""
+    return local_model_registry.stats()
+
+@router.post("/llm/local/models")
+async def load_local_model(request: LocalModelRequest):
+    """Load and warm up a local model ahead of traffic"""
+    try:
+        key = ModelKey.create(LLMProvider.HUGGINGFACE.value, request.model_name, request.dtype)
+        await local_model_registry.prewarm([key])
+        return (await local_model_registry.get(key)).stats()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load model: {str(e)}")
+
+@router.delete("/llm/local/models")
+async def unload_local_model(model_name: str, dtype: Optional[str] = None):
+    """Unload a local model and free its memory"""
+    try:
+        key = ModelKey.create(LLMProvider.HUGGINGFACE.value, model_name, dtype)
+        local_model_registry.unload(key)
+        return {"message": f"Unloaded {key.name}"}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Model {model_name} is not loaded")
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+class MockProfileRequest(BaseModel):
+    latency_distribution: Optional[str] = None  # fixed, uniform, normal, lognormal or exponential
+    latency_ms: Optional[float] = None
+    latency_jitter_ms: Optional[float] = None
+    tokens_per_second: Optional[float] = None
+    completion_tokens: Optional[int] = None
+    error_rate: Optional[float] = None
+    error_types: Optional[List[str]] = None  # rate_limit, server, timeout, interrupted
+
+@router.get("/llm/mock")
+async def get_mock_provider():
+    """Get the mock ("local") provider's profile and call statistics"""
+    return mock_llm_provider.stats()
+
+@router.put("/llm/mock")
+async def configure_mock_provider(request: MockProfileRequest):
+    """Change the mock provider's latency, token rate or error injection; omitted fields are kept"""
+    try:
+        mock_llm_provider.configure(**request.dict(exclude_none=True))
+        return mock_llm_provider.stats()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+class LLMBatchRequest(BaseModel):
+    prompts: List[str]
+    provider: Optional[str] = "openai"
+    model_name: Optional[str] = "gpt-4-turbo-preview"
+    temperature: Optional[float] = 0.7
+    max_tokens: Optional[int] = 1000
+    system_prompt: Optional[str] = None
+    dtype: Optional[str] = None
+    use_cache: bool = True
+    concurrency: Optional[int] = None  # Defaults to LLM_BATCH_CONCURRENCY
+    stream: bool = True  # Stream results as Server-Sent Events; False returns the batch ID at once
+
+def _batch_events(http_request: Request, job: LLMBatchJob, after: int) -> StreamingResponse:
+    """Relay batch results as Server-Sent Events: batch, result*, then done.
+
+    A client that disconnects stops receiving, but the batch keeps running;
+    GET /llm/batch/{batch_id}/results?after=N picks the stream up again.
+    """
+    async def events():
+        yield _sse_event("batch", job.to_dict())
+        results = job.subscribe(after)
+        try:
+            async for result in results:
+                if await http_request.is_disconnected():
+                    break
+                yield _sse_event("result", result)
+            else:
+                yield _sse_event("done", job.to_dict())
+        finally:
+            await results.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _start_batch(http_request: Request, request: LLMBatchRequest):
+    concurrency = request.concurrency or settings.LLM_BATCH_CONCURRENCY
+    try:
+        if len(request.prompts) > settings.LLM_BATCH_MAX_PROMPTS:
+            raise ValueError(f"A batch holds at most {settings.LLM_BATCH_MAX_PROMPTS} prompts")
+        if concurrency > settings.LLM_BATCH_MAX_CONCURRENCY:
+            raise ValueError(f"concurrency must be at most {settings.LLM_BATCH_MAX_CONCURRENCY}")
+        config = _llm_config(LLMRequest(prompt="", **request.dict(exclude={"prompts", "concurrency", "stream"})))
+        job = await llm_batch_manager.start(
+            llm_service,
+            request.prompts,
+            config,
+            request.system_prompt,
+            use_cache=request.use_cache,
+            concurrency=concurrency
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch request: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to start batch: {str(e)}")
+    
+    if request.stream:
+        return _batch_events(http_request, job, 0)
+    return job.to_dict()
+
+@router.post("/llm/batch")
+async def generate_batch(request: LLMBatchRequest, http_request: Request):
+    """Generate a list of prompts with bounded concurrency, streaming results as they complete"""
+    return await _start_batch(http_request, request)
+
+@router.post("/llm/batch/upload")
+async def generate_batch_upload(
+    http_request: Request,
+    file: UploadFile = File(...),
+    provider: str = "openai",
+    model_name: str = "gpt-4-turbo-preview",
+    temperature: float = 0.7,
+    max_tokens: int = 1000,
+    system_prompt: Optional[str] = None,
+    dtype: Optional[str] = None,
+    use_cache: bool = True,
+    concurrency: Optional[int] = None,
+    stream: bool = True
+):
+    """Generate one prompt per line of a JSONL file ({"prompt": ...} objects or JSON strings)"""
+    prompts = []
+    try:
+        for number, line in enumerate((await file.read()).decode("utf-8").splitlines(), start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            prompt = record if isinstance(record, str) else record.get("prompt", record.get("text"))
+            if not isinstance(prompt, str):
+                raise ValueError(f"line {number} needs a string 'prompt' or 'text' field")
+            prompts.append(prompt)
+    except (ValueError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSONL: {str(e)}")
+    
+    request = LLMBatchRequest(
+        prompts=prompts,
+        provider=provider,
+        model_name=model_name,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        system_prompt=system_prompt,
+        dtype=dtype,
+        use_cache=use_cache,
+        concurrency=concurrency,
+        stream=stream
+    )
+    return await _start_batch(http_request, request)
+
+@router.get("/llm/batch/{batch_id}")
+async def get_batch(batch_id: str):
+    """Get progress, throughput and per-item failures of a batch"""
+    try:
+        return llm_batch_manager.get(batch_id).to_dict()
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/llm/batch/{batch_id}/results")
+async def get_batch_results(batch_id: str, http_request: Request, after: int = 0):
+    """Stream a batch's results in completion order, skipping the first `after`"""
+    try:
+        job = llm_batch_manager.get(batch_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return _batch_events(http_request, job, after)
+
+@router.post("/llm/batch/{batch_id}/resume")
+async def resume_batch(batch_id: str, http_request: Request, retry_failed: bool = False, stream: bool = True):
+    """Run the prompts of a cancelled or interrupted batch that have no result yet"""
+    try:
+        job = llm_batch_manager.get(batch_id)
+        after = len(job.results)
+        llm_batch_manager.resume(llm_service, batch_id, retry_failed=retry_failed)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    if stream:
+        return _batch_events(http_request, job, after)
+    return job.to_dict()
+
+@router.delete("/llm/batch/{batch_id}")
+async def cancel_batch(batch_id: str):
+    """Stop a running batch; results so far are kept and it can be resumed"""
+    try:
+        return llm_batch_manager.cancel(batch_id).to_dict()
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
 # Vector Database Endpoints
 class DocumentRequest(BaseModel):
     id: str
@@ -109,6 +516,44 @@ class DocumentRequest(BaseModel):
 class SearchRequest(BaseModel):
     query: str
     top_k: Optional[int] = 10
+    filters: Optional[Dict[str, Any]] = None
+    collapse_duplicates: Optional[bool] = False
+
+class BatchSearchRequest(BaseModel):
+    queries: List[str]
+    top_k: Optional[int] = 10
+    filters: Optional[Dict[str, Any]] = None
+    collapse_duplicates: Optional[bool] = False
+
+class RebalanceRequest(BaseModel):
+    num_shards: int
+
+class CollectionRequest(BaseModel):
+    name: str
+    dimension: Optional[int] = 384
+    storage: Optional[str] = "float32"
+    rescore_factor: Optional[int] = 0
+    reduction: Optional[str] = None
+    reduced_dimension: Optional[int] = None
+    dedup: Optional[bool] = True
+    lexical: Optional[bool] = True
+
+class HybridSearchRequest(BaseModel):
+    query: str
+    top_k: Optional[int] = 10
+    filters: Optional[Dict[str, Any]] = None
+    candidate_k: Optional[int] = None
+    rrf_k: Optional[int] = 60
+
+def serialize_search_result(result) -> Dict[str, Any]:
+    """Convert a SearchResult into a JSON-friendly dict"""
+    return {
+        "id": result.document.id,
+        "content": result.document.content,
+        "metadata": result.document.metadata,
+        "score": result.score,
+        "distance": result.distance
+    }
 
 @router.post("/vector-db/add-documents")
 async def add_documents(documents: List[DocumentRequest]):
@@ -137,24 +582,266 @@ async def search_documents(request: SearchRequest):
         if not hasattr(vector_db_service, 'db_service') or not vector_db_service.db_service:
             await vector_db_service.initialize()
         
-        results = await vector_db_service.search(request.query, request.top_k)
+        results = await vector_db_service.search(
+            request.query, request.top_k, request.filters, request.collapse_duplicates
+        )
         
         return {
             "query": request.query,
+            "results": [serialize_search_result(result) for result in results]
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid search request: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+
+@router.post("/vector-db/search-batch")
+async def search_documents_batch(request: BatchSearchRequest):
+    """Search documents for many queries in a single batched call"""
+    try:
+        # Initialize vector DB if not already done
+        if not hasattr(vector_db_service, 'db_service') or not vector_db_service.db_service:
+            await vector_db_service.initialize()
+        
+        batch_results = await vector_db_service.search_batch(
+            request.queries, request.top_k, request.filters, request.collapse_duplicates
+        )
+        
+        return {
             "results": [
                 {
-                    "id": result.document.id,
-                    "content": result.document.content,
-                    "metadata": result.document.metadata,
-                    "score": result.score,
-                    "distance": result.distance
+                    "query": query,
+                    "results": [serialize_search_result(result) for result in results]
                 }
-                for result in results
+                for query, results in zip(request.queries, batch_results)
             ]
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid search request: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch search failed: {str(e)}")
+
+@router.post("/vector-db/hybrid-search")
+async def hybrid_search_documents(request: HybridSearchRequest):
+    """Search with BM25 and embeddings together, fused by reciprocal rank"""
+    try:
+        # Initialize vector DB if not already done
+        if not hasattr(vector_db_service, 'db_service') or not vector_db_service.db_service:
+            await vector_db_service.initialize()
+        
+        response = await vector_db_service.hybrid_search(
+            request.query,
+            request.top_k,
+            request.filters,
+            request.candidate_k,
+            request.rrf_k or 60
+        )
+        
+        return {
+            "query": request.query,
+            "results": [
+                {**serialize_search_result(result), "ranks": result.ranks}
+                for result in response.results
+            ],
+            "latency_ms": response.latency_ms
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid search request: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Hybrid search failed: {str(e)}")
+
+@router.post("/vector-db/ingest")
+async def ingest_file(
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    batch_size: int = 64
+):
+    """Chunk, embed and index an uploaded text, Markdown or JSONL file in the background"""
+    try:
+        # Initialize vector DB if not already done
+        if not hasattr(vector_db_service, 'db_service') or not vector_db_service.db_service:
+            await vector_db_service.initialize()
+        
+        fmt = IngestionFormat(format) if format else IngestionFormat.from_filename(file.filename)
+        config = ChunkingConfig(chunk_size=chunk_size, chunk_overlap=chunk_overlap, batch_size=batch_size)
+        config.validate()
+        
+        # Spool the upload to disk in blocks; the job streams it back from there
+        fd, path = tempfile.mkstemp(prefix="lumina_ingest_")
+        with os.fdopen(fd, "wb") as spool:
+            while block := await file.read(1024 * 1024):
+                spool.write(block)
+        
+        job = ingestion_manager.start(vector_db_service, path, file.filename or "upload", fmt, config)
+        return job.to_dict()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid ingestion request: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to start ingestion: {str(e)}")
+
+@router.get("/vector-db/ingest/{job_id}")
+async def get_ingestion_job(job_id: str):
+    """Get progress of an ingestion job"""
+    try:
+        return ingestion_manager.get(job_id).to_dict()
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.delete("/vector-db/ingest/{job_id}")
+async def delete_ingested_documents(job_id: str):
+    """Remove the chunks an ingestion job indexed, e.g. before re-uploading a changed file"""
+    try:
+        if not hasattr(vector_db_service, 'db_service') or not vector_db_service.db_service:
+            await vector_db_service.initialize()
+        
+        removed = await ingestion_manager.delete_documents(vector_db_service, job_id)
+        if not removed:
+            raise KeyError(job_id)
+        return {"job_id": job_id, "removed": removed}
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"No documents indexed by ingestion job {job_id}")
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to delete ingested documents: {str(e)}")
+
+@router.post("/vector-db/shards/rebalance")
+async def rebalance_shards(request: RebalanceRequest):
+    """Change the number of index shards and move documents accordingly"""
+    try:
+        # Initialize vector DB if not already done
+        if not hasattr(vector_db_service, 'db_service') or not vector_db_service.db_service:
+            await vector_db_service.initialize()
+        
+        return await vector_db_service.rebalance_shards(request.num_shards)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid rebalance request: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Shard rebalance failed: {str(e)}")
+
+@router.get("/vector-db/stats")
+async def vector_db_stats():
+    """Get vector database statistics, including vector memory usage"""
+    try:
+        # Initialize vector DB if not already done
+        if not hasattr(vector_db_service, 'db_service') or not vector_db_service.db_service:
+            await vector_db_service.initialize()
+        
+        return await vector_db_service.stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get vector DB stats: {str(e)}")
+
+@router.post("/vector-db/collections")
+async def create_collection(request: CollectionRequest):
+    """Create a named collection with its own index"""
+    try:
+        config = await collection_manager.create(CollectionConfig(
+            name=request.name,
+            dimension=request.dimension,
+            storage=request.storage,
+            rescore_factor=request.rescore_factor,
+            reduction=request.reduction,
+            reduced_dimension=request.reduced_dimension,
+            dedup=request.dedup,
+            lexical=request.lexical
+        ))
+        return {"success": True, "collection": config.name}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid collection: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create collection: {str(e)}")
+
+@router.get("/vector-db/collections")
+async def list_collections():
+    """List collections with their size and residency"""
+    try:
+        return {
+            "collections": collection_manager.list(),
+            **collection_manager.stats()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to list collections: {str(e)}")
+
+@router.delete("/vector-db/collections/{name}")
+async def drop_collection(name: str):
+    """Delete a collection and its files"""
+    try:
+        await collection_manager.drop(name)
+        return {"success": True, "collection": name}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to drop collection: {str(e)}")
+
+@router.post("/vector-db/collections/{name}/add-documents")
+async def add_collection_documents(name: str, documents: List[DocumentRequest]):
+    """Add documents to a named collection"""
+    try:
+        docs = [Document(id=doc.id, content=doc.content, metadata=doc.metadata) for doc in documents]
+        async with collection_manager.use(name, write=True) as service:
+            success = await service.add_documents(docs)
+        
+        return {
+            "success": success,
+            "message": f"Added {len(documents)} documents to {name}",
+            "document_ids": [doc.id for doc in documents]
+        }
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to add documents: {str(e)}")
+
+@router.post("/vector-db/collections/{name}/search")
+async def search_collection(name: str, request: SearchRequest):
+    """Search documents in a named collection"""
+    try:
+        async with collection_manager.use(name) as service:
+            results = await service.search(
+                request.query, request.top_k, request.filters, request.collapse_duplicates
+            )
+        
+        return {
+            "collection": name,
+            "query": request.query,
+            "results": [serialize_search_result(result) for result in results]
+        }
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid search request: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
+@router.post("/vector-db/collections/{name}/search-batch")
+async def search_collection_batch(name: str, request: BatchSearchRequest):
+    """Search a named collection for many queries in a single batched call"""
+    try:
+        async with collection_manager.use(name) as service:
+            batch_results = await service.search_batch(
+                request.queries, request.top_k, request.filters, request.collapse_duplicates
+            )
+        
+        return {
+            "collection": name,
+            "results": [
+                {
+                    "query": query,
+                    "results": [serialize_search_result(result) for result in results]
+                }
+                for query, results in zip(request.queries, batch_results)
+            ]
+        }
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid search request: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch search failed: {str(e)}")
+
 # AutoML Endpoints
 class AutoMLTrainRequest(BaseModel):
     target_column: str
@@ -355,6 +1042,8 @@ Please provide:
             "dataset_info": data_info,
             "analysis_type": analysis_type
         }
+    except AdmissionRejected as e:
+        raise _rejected(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Data analysis failed: {str(e)}")
 
@@ -385,7 +1074,8 @@ Please provide:
         
         recommendation = await llm_service.generate_text(
             prompt,
-            system_prompt="You are an ML expert providing model recommendations. Be specific and practical."
+            system_prompt="You are an ML expert providing model recommendations. Be specific and practical.",
+            semantic_route="/assistant/recommend-model"
         )
         
         return {
@@ -393,5 +1083,7 @@ Please provide:
             "dataset_info": dataset_info,
             "problem_description": problem_description
         }
+    except AdmissionRejected as e:
+        raise _rejected(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Model recommendation failed: {str(e)}")
\ No newline at end of file
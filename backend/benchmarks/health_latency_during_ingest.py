@@ -0,0 +1,109 @@
+"""
+Event loop responsiveness benchmark for LuminaOps
+Measures /health latency while a bulk vector DB ingestion runs in the same
+process. With vector DB compute on the dedicated executor, p99 /health latency
+during ingestion should stay close to the idle baseline.
+
+Usage (from backend/):
+    python -m benchmarks.health_latency_during_ingest --provider faiss --docs 5000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List
+
+import httpx
+import numpy as np
+
+from main import app
+from ai_services.vector_db.vector_service import vector_db_service, VectorDBProvider
+
+def summarize(latencies_ms: List[float]) -> Dict[str, float]:
+    if not latencies_ms:
+        return {"count": 0}
+    values = np.asarray(latencies_ms)
+    return {
+        "count": int(values.size),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "max_ms": round(float(values.max()), 3)
+    }
+
+async def poll_health(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> List[float]:
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get("/health")
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return latencies
+
+async def ingest(client: httpx.AsyncClient, n_docs: int, batch_size: int) -> float:
+    start = time.perf_counter()
+    for offset in range(0, n_docs, batch_size):
+        batch = [
+            {
+                "id": f"bench-{i}",
+                "content": f"Benchmark document {i} about model training, drift and feature pipelines.",
+                "metadata": {"batch": offset // batch_size}
+            }
+            for i in range(offset, min(offset + batch_size, n_docs))
+        ]
+        response = await client.post("/api/v1/ai/vector-db/add-documents", json=batch, timeout=None)
+        response.raise_for_status()
+    return time.perf_counter() - start
+
+async def run(args) -> Dict[str, object]:
+    vector_db_service.provider = VectorDBProvider(args.provider)
+    await vector_db_service.initialize()
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        interval = args.interval_ms / 1000
+        
+        # Idle baseline
+        stop = asyncio.Event()
+        poller = asyncio.create_task(poll_health(client, stop, interval))
+        await asyncio.sleep(args.baseline_seconds)
+        stop.set()
+        baseline = await poller
+        
+        # Same probe while ingesting
+        stop = asyncio.Event()
+        poller = asyncio.create_task(poll_health(client, stop, interval))
+        ingest_seconds = await ingest(client, args.docs, args.batch_size)
+        stop.set()
+        during_ingest = await poller
+    
+    return {
+        "provider": args.provider,
+        "documents": args.docs,
+        "batch_size": args.batch_size,
+        "ingest_seconds": round(ingest_seconds, 3),
+        "ingest_docs_per_second": round(args.docs / ingest_seconds, 1),
+        "health_idle": summarize(baseline),
+        "health_during_ingest": summarize(during_ingest)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="p99 /health latency during vector DB ingestion")
+    parser.add_argument("--provider", default="faiss", choices=["faiss", "chroma"])
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--interval-ms", type=float, default=10.0)
+    parser.add_argument("--baseline-seconds", type=float, default=3.0)
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args()
+    
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+LLM admission control benchmark for LuminaOps
+Fires a burst of requests at the mock provider server while it enforces a
+requests-per-minute limit, once unguarded and once through an
+AdmissionController configured with the same limit. Reports how many requests
+the provider rejected with 429, how many admission control turned away up
+front, and queue-wait and end-to-end latency percentiles.
+
+Usage (from backend/):
+    python -m benchmarks.llm_admission --requests 300 --requests-per-minute 1200 --max-wait 10
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List
+
+import httpx
+import numpy as np
+
+from benchmarks.mock_llm_server import MockLLMServer
+from ai_services.llm.admission import AdmissionController, AdmissionLimits, AdmissionRejected
+
+CONFIGURATIONS = ["unguarded", "admission"]
+
+def percentiles(values_ms: List[float]) -> Dict[str, float]:
+    if not values_ms:
+        return {}
+    values = np.asarray(values_ms)
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "max_ms": round(float(values.max()), 3)
+    }
+
+async def benchmark_configuration(name: str, args) -> Dict:
+    server = MockLLMServer(
+        latency_ms=args.latency_ms,
+        requests_per_minute=args.requests_per_minute,
+        burst_seconds=args.burst_seconds
+    )
+    await server.start()
+    controller = AdmissionController(
+        limits={"openai": AdmissionLimits(
+            max_concurrency=args.concurrency,
+            requests_per_minute=args.requests_per_minute,
+            burst_seconds=args.burst_seconds
+        )},
+        default_limits=AdmissionLimits(),
+        max_queue=args.max_queue,
+        max_wait_seconds=args.max_wait
+    )
+    payload = {"model": "gpt-mock", "max_tokens": 64, "messages": [{"role": "user", "content": "hello"}]}
+    outcomes = {"ok": 0, "provider_429": 0, "admission_rejected": 0}
+    latencies: List[float] = []
+    queue_waits: List[float] = []
+
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=None), timeout=60) as client:
+        async def call():
+            response = await client.post(server.base_url + "/v1/chat/completions", json=payload)
+            outcomes["ok" if response.status_code == 200 else "provider_429"] += 1
+
+        async def request(delay: float):
+            await asyncio.sleep(delay)
+            start = time.perf_counter()
+            if name == "unguarded":
+                await call()
+            else:
+                try:
+                    async with controller.admit("openai", "gpt-mock", estimated_tokens=80) as permit:
+                        queue_waits.append(permit.queue_seconds * 1000)
+                        await call()
+                except AdmissionRejected:
+                    outcomes["admission_rejected"] += 1
+                    return
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        # Requests arrive over burst_window seconds, faster than the provider allows
+        delays = np.linspace(0, args.burst_window, args.requests)
+        start = time.perf_counter()
+        await asyncio.gather(*(request(float(delay)) for delay in delays))
+        seconds = time.perf_counter() - start
+
+    await server.stop()
+    report = {
+        "configuration": name,
+        **outcomes,
+        "success_rate": round(outcomes["ok"] / args.requests, 4),
+        "seconds": round(seconds, 3),
+        "latency": percentiles(latencies),
+        "server": server.stats()
+    }
+    if name == "admission":
+        report["queue_wait"] = percentiles(queue_waits)
+        report["admission"] = controller.stats()
+    return report
+
+async def run(args) -> Dict:
+    results = []
+    for name in args.configurations:
+        print(f"Sending {args.requests} requests over {args.burst_window}s ({name})...")
+        results.append(await benchmark_configuration(name, args))
+    return {
+        "requests": args.requests,
+        "burst_window_seconds": args.burst_window,
+        "provider_requests_per_minute": args.requests_per_minute,
+        "provider_burst_seconds": args.burst_seconds,
+        "results": results
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LLM admission control against a rate-limited provider")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--burst-window", type=float, default=2.0, help="Seconds over which requests arrive")
+    parser.add_argument("--requests-per-minute", type=float, default=1200.0, help="Mock provider rate limit")
+    parser.add_argument("--burst-seconds", type=float, default=1.0, help="Mock provider bucket size")
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--concurrency", type=int, default=32, help="Admission concurrency limit")
+    parser.add_argument("--max-queue", type=int, default=256)
+    parser.add_argument("--max-wait", type=float, default=10.0, help="Admission deadline in seconds")
+    parser.add_argument("--configurations", nargs="+", default=CONFIGURATIONS, choices=CONFIGURATIONS)
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+LLM provider connection pooling benchmark for LuminaOps
+Sends concurrent OpenAI- and Anthropic-style requests to the local mock
+provider server and compares the shared keep-alive pool with a fresh client
+per request. When the provider SDKs are installed, the llm-service
+configuration goes through LLMService.generate_text with both async clients
+pointed at the mock server. Reports throughput, latency percentiles and how
+many TCP connections the server accepted.
+
+Usage (from backend/):
+    python -m benchmarks.llm_http_pool --requests 2000 --concurrency 64 --latency-ms 300
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List
+
+import httpx
+import numpy as np
+
+from benchmarks.mock_llm_server import MockLLMServer
+from core.config import settings
+from ai_services.llm.http_pool import llm_http_pool
+
+CONFIGURATIONS = ["shared-pool", "client-per-request", "llm-service"]
+
+def request_payload(i: int) -> tuple:
+    """Alternate between the two remote provider APIs"""
+    if i % 2:
+        return "/v1/messages", {
+            "model": "claude-mock",
+            "max_tokens": 64,
+            "messages": [{"role": "user", "content": f"request {i}"}]
+        }
+    return "/v1/chat/completions", {
+        "model": "gpt-mock",
+        "max_tokens": 64,
+        "messages": [{"role": "user", "content": f"request {i}"}]
+    }
+
+def summarize(latencies_ms: List[float], seconds: float) -> Dict[str, float]:
+    values = np.asarray(latencies_ms)
+    return {
+        "requests": int(values.size),
+        "throughput_rps": round(values.size / seconds, 2) if seconds else None,
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3)
+    }
+
+def make_sender(name: str, server: MockLLMServer):
+    if name == "shared-pool":
+        async def send(i: int):
+            path, payload = request_payload(i)
+            response = await llm_http_pool.client.post(server.base_url + path, json=payload)
+            response.raise_for_status()
+        return send
+
+    if name == "client-per-request":
+        async def send(i: int):
+            path, payload = request_payload(i)
+            async with httpx.AsyncClient(timeout=llm_http_pool.timeout) as client:
+                response = await client.post(server.base_url + path, json=payload)
+                response.raise_for_status()
+        return send
+
+    # Imported here so the raw configurations run without the SDKs installed
+    from ai_services.llm.llm_service import LLMService, LLMConfig, LLMProvider
+    settings.OPENAI_BASE_URL = server.base_url + "/v1"
+    settings.ANTHROPIC_BASE_URL = server.base_url
+    service = LLMService()
+    configs = [
+        LLMConfig(provider=LLMProvider.OPENAI, model_name="gpt-mock", api_key="mock", max_tokens=64),
+        LLMConfig(provider=LLMProvider.ANTHROPIC, model_name="claude-mock", api_key="mock", max_tokens=64)
+    ]
+
+    async def send(i: int):
+        response = await service.generate_text(f"request {i}", configs[i % 2], use_cache=False)
+        if response.startswith("Error generating text"):
+            raise RuntimeError(response)
+    return send
+
+async def benchmark_configuration(name: str, args) -> Dict:
+    server = MockLLMServer(latency_ms=args.latency_ms, tokens=args.tokens)
+    await server.start()
+    await llm_http_pool.aclose()
+    try:
+        send = make_sender(name, server)
+        await send(0)  # Warm-up; fails fast if the SDKs are missing
+    except Exception as e:
+        await server.stop()
+        return {"configuration": name, "error": str(e)}
+
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def timed(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await send(i)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(timed(i) for i in range(args.requests)), return_exceptions=True)
+    seconds = time.perf_counter() - start
+    errors = [r for r in results if isinstance(r, BaseException)]
+
+    report = {"configuration": name, **summarize(latencies, seconds)}
+    report["errors"] = len(errors)
+    if errors:
+        report["first_error"] = str(errors[0])
+    report["server"] = server.stats()
+    if name != "client-per-request":
+        report["pool"] = llm_http_pool.stats()
+    await llm_http_pool.aclose()
+    await server.stop()
+    return report
+
+async def run(args) -> Dict:
+    results = []
+    for name in args.configurations:
+        print(f"Benchmarking {name} with {args.requests} requests at concurrency {args.concurrency}...")
+        results.append(await benchmark_configuration(name, args))
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "server_latency_ms": args.latency_ms,
+        "pool_limits": {
+            "max_connections": llm_http_pool.limits.max_connections,
+            "max_keepalive_connections": llm_http_pool.limits.max_keepalive_connections
+        },
+        "results": results
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the shared LLM HTTP connection pool")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Mock provider response delay")
+    parser.add_argument("--tokens", type=int, default=32, help="Completion tokens per response")
+    parser.add_argument("--configurations", nargs="+", default=CONFIGURATIONS, choices=CONFIGURATIONS)
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""
+Load test for the LuminaOps AI endpoints
+Drives /ai/llm/* and /ai/assistant/* at a target request rate and reports,
+per endpoint, throughput, status codes and latency percentiles (plus time to
+first token for streams). Load is open-loop: requests are sent on a fixed or
+Poisson schedule whether or not earlier ones have finished, and latency is
+measured from each request's scheduled start, so an overloaded server shows
+up as growing latency instead of a quietly reduced send rate.
+
+Without --base-url the app is served in-process by uvicorn with the mock
+"local" provider as the default provider, so nothing is sent to real
+providers. Against a separate server, start it with LLM_DEFAULT_PROVIDER=local
+for the assistant and code endpoints to use the mock too. The --mock-* options
+reconfigure the mock provider through PUT /ai/llm/mock before the run.
+
+Usage (from backend/):
+    python -m benchmarks.llm_load_test --rps 50 --duration 30
+    python -m benchmarks.llm_load_test --base-url http://localhost:8002 --rps 200 \\
+        --endpoints llm-generate=3 llm-stream=1 --mock-error-rate 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+API_PREFIX = "/api/v1/ai"
+
+DATASET_CSV = "age,income,churned\n34,52000,0\n51,61000,1\n27,38000,0\n45,72000,1\n"
+
+def _llm_request(args, prompt: str) -> Dict[str, Any]:
+    return {
+        "prompt": prompt,
+        "provider": args.provider,
+        "model_name": args.model,
+        "temperature": args.temperature,
+        "max_tokens": args.max_tokens,
+        "use_cache": not args.no_cache
+    }
+
+# Endpoint name -> (path, streaming, builder of httpx request arguments from (args, prompt))
+SCENARIOS: Dict[str, Tuple[str, bool, Callable[[Any, str], Dict[str, Any]]]] = {
+    "llm-generate": ("/llm/generate", False, lambda args, prompt: {"json": _llm_request(args, prompt)}),
+    "llm-stream": ("/llm/generate/stream", True, lambda args, prompt: {"json": _llm_request(args, prompt)}),
+    "llm-generate-code": ("/llm/generate-code", False, lambda args, prompt: {
+        "json": {"task_description": prompt, "use_cache": not args.no_cache}
+    }),
+    "llm-generate-code-stream": ("/llm/generate-code/stream", True, lambda args, prompt: {
+        "json": {"task_description": prompt, "use_cache": not args.no_cache}
+    }),
+    "llm-explain-code": ("/llm/explain-code", False, lambda args, prompt: {
+        "params": {"code": f"# {prompt}\nprint('hello')", "use_cache": str(not args.no_cache).lower()}
+    }),
+    "assistant-recommend-model": ("/assistant/recommend-model", False, lambda args, prompt: {
+        "params": {"problem_description": prompt},
+        "json": {"rows": 1000, "columns": ["age", "income", "churned"], "target": "churned"}
+    }),
+    "assistant-analyze-data": ("/assistant/analyze-data", False, lambda args, prompt: {
+        "files": {"file": ("dataset.csv", f"# {prompt}\n{DATASET_CSV}".encode("utf-8"), "text/csv")}
+    })
+}
+
+DEFAULT_ENDPOINTS = ["llm-generate", "llm-stream", "assistant-recommend-model"]
+
+MOCK_OPTIONS = {
+    "mock_distribution": "latency_distribution",
+    "mock_latency_ms": "latency_ms",
+    "mock_jitter_ms": "latency_jitter_ms",
+    "mock_tokens_per_second": "tokens_per_second",
+    "mock_completion_tokens": "completion_tokens",
+    "mock_error_rate": "error_rate",
+    "mock_error_types": "error_types"
+}
+
+@dataclass
+class EndpointResults:
+    requests: int = 0
+    outcomes: Dict[str, int] = field(default_factory=dict)
+    latencies_ms: List[float] = field(default_factory=list)  # Successful requests, from their scheduled start
+    ttft_ms: List[float] = field(default_factory=list)
+
+    def record(self, outcome: str, latency_ms: float, ttft_ms: Optional[float] = None):
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        if outcome == "200":
+            self.latencies_ms.append(latency_ms)
+            if ttft_ms is not None:
+                self.ttft_ms.append(ttft_ms)
+
+def percentiles(values_ms: List[float]) -> Dict[str, float]:
+    if not values_ms:
+        return {}
+    values = np.asarray(values_ms)
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p90_ms": round(float(np.percentile(values, 90)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "max_ms": round(float(values.max()), 3)
+    }
+
+def parse_endpoints(specs: List[str]) -> Dict[str, float]:
+    """"name" or "name=weight" -> weight"""
+    weights = {}
+    for spec in specs:
+        name, _, weight = spec.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown endpoint {name!r}; expected one of {', '.join(SCENARIOS)}")
+        weights[name] = float(weight) if weight else 1.0
+    return weights
+
+def schedule(args, rng: np.random.Generator) -> np.ndarray:
+    """Send offsets in seconds for --rps over --duration"""
+    count = int(args.rps * args.duration)
+    if args.arrivals == "poisson":
+        # Draw more gaps than needed and keep those inside the window
+        offsets = np.cumsum(rng.exponential(1 / args.rps, size=int(count * 1.5) + 10))
+        return offsets[offsets < args.duration]
+    return np.arange(count) / args.rps
+
+async def send(client: httpx.AsyncClient, name: str, args, prompt: str) -> Tuple[str, Optional[float]]:
+    """Outcome (status code, "stream_error" or exception name) and, for streams, seconds to the first token"""
+    path, streaming, build = SCENARIOS[name]
+    start = time.perf_counter()
+    try:
+        if not streaming:
+            response = await client.post(API_PREFIX + path, **build(args, prompt))
+            return str(response.status_code), None
+        ttft = None
+        async with client.stream("POST", API_PREFIX + path, **build(args, prompt)) as response:
+            if response.status_code != 200:
+                return str(response.status_code), None
+            outcome = "stream_error"  # Unless the stream ends with a done event
+            async for line in response.aiter_lines():
+                if line == "event: token" and ttft is None:
+                    ttft = time.perf_counter() - start
+                elif line == "event: done":
+                    outcome = "200"
+                elif line == "event: error":
+                    outcome = "stream_error"
+            return outcome, ttft
+    except httpx.HTTPError as e:
+        return type(e).__name__, None
+
+async def configure_mock(client: httpx.AsyncClient, args) -> Optional[Dict]:
+    profile = {
+        field_name: getattr(args, option)
+        for option, field_name in MOCK_OPTIONS.items()
+        if getattr(args, option) is not None
+    }
+    if profile:
+        response = await client.put(API_PREFIX + "/llm/mock", json=profile)
+        if response.status_code != 200:
+            raise SystemExit(f"Failed to configure the mock provider: {response.text}")
+    response = await client.get(API_PREFIX + "/llm/mock")
+    return response.json() if response.status_code == 200 else None
+
+async def run(args, client: httpx.AsyncClient) -> Dict:
+    weights = parse_endpoints(args.endpoints)
+    rng = np.random.default_rng(args.seed)
+    names = list(weights)
+    probabilities = np.asarray([weights[name] for name in names])
+    probabilities /= probabilities.sum()
+    offsets = schedule(args, rng)
+    chosen = rng.choice(names, size=len(offsets), p=probabilities)
+    results = {name: EndpointResults() for name in names}
+    mock_before = await configure_mock(client, args)
+
+    in_flight = 0
+    peak_in_flight = 0
+    lags_ms: List[float] = []
+
+    async def request(index: int, offset: float, name: str):
+        nonlocal in_flight, peak_in_flight
+        scheduled = start + offset
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        lags_ms.append((time.perf_counter() - scheduled) * 1000)
+        in_flight += 1
+        peak_in_flight = max(peak_in_flight, in_flight)
+        # Repeating prompts lets the response caches and coalescing take part
+        prompt = f"Load test prompt {index % args.distinct_prompts if args.distinct_prompts else index}"
+        sent = time.perf_counter()
+        try:
+            outcome, ttft = await send(client, name, args, prompt)
+        finally:
+            in_flight -= 1
+        results[name].requests += 1
+        results[name].record(
+            outcome,
+            (time.perf_counter() - scheduled) * 1000,
+            (sent - scheduled + ttft) * 1000 if ttft is not None else None
+        )
+
+    print(f"Sending {len(offsets)} requests at {args.rps} rps ({args.arrivals}) to {', '.join(names)}...")
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        request(index, float(offset), str(name)) for index, (offset, name) in enumerate(zip(offsets, chosen))
+    ))
+    seconds = time.perf_counter() - start
+    mock_after = (await client.get(API_PREFIX + "/llm/mock")).json() if mock_before is not None else None
+
+    endpoints = {}
+    for name, result in results.items():
+        ok = result.outcomes.get("200", 0)
+        endpoints[name] = {
+            "path": API_PREFIX + SCENARIOS[name][0],
+            "requests": result.requests,
+            "ok": ok,
+            "outcomes": result.outcomes,
+            "success_rate": round(ok / result.requests, 4) if result.requests else 0.0,
+            "throughput_rps": round(ok / seconds, 3),
+            "latency": percentiles(result.latencies_ms),
+            **({"ttft": percentiles(result.ttft_ms)} if SCENARIOS[name][1] else {})
+        }
+    total_ok = sum(endpoint["ok"] for endpoint in endpoints.values())
+    return {
+        "target_rps": args.rps,
+        "arrivals": args.arrivals,
+        "duration_seconds": args.duration,
+        "requests": len(offsets),
+        "seconds": round(seconds, 3),
+        "throughput_rps": round(total_ok / seconds, 3),
+        "success_rate": round(total_ok / len(offsets), 4) if len(offsets) else 0.0,
+        "peak_in_flight": peak_in_flight,
+        # Well above zero means the load generator itself fell behind the schedule
+        "send_lag": percentiles(lags_ms),
+        "endpoints": endpoints,
+        "mock_provider": {
+            "profile": mock_after["profile"],
+            "calls": mock_after["calls"] - mock_before["calls"],
+            "peak_in_flight": mock_after["peak_in_flight"],
+            "injected_errors": {
+                name: count - mock_before["injected_errors"].get(name, 0)
+                for name, count in mock_after["injected_errors"].items()
+            }
+        } if mock_after is not None else None
+    }
+
+async def run_in_process(args) -> Dict:
+    """Serve the app with uvicorn on a free local port for the duration of the run"""
+    import uvicorn
+    from main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        if serving.done():
+            serving.result()  # Raises the startup error
+        await asyncio.sleep(0.05)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        async with client_for(f"http://127.0.0.1:{port}", args) as client:
+            return await run(args, client)
+    finally:
+        server.should_exit = True
+        await serving
+
+def client_for(base_url: str, args) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=base_url,
+        limits=httpx.Limits(max_connections=None, max_keepalive_connections=args.keepalive),
+        timeout=args.timeout
+    )
+
+async def run_remote(args) -> Dict:
+    async with client_for(args.base_url, args) as client:
+        return await run(args, client)
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the AI endpoints at a target request rate")
+    parser.add_argument("--base-url", help="Running server to test; by default the app is served in-process")
+    parser.add_argument("--rps", type=float, default=20.0, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds over which requests are sent")
+    parser.add_argument("--arrivals", choices=["uniform", "poisson"], default="poisson")
+    parser.add_argument(
+        "--endpoints", nargs="+", default=DEFAULT_ENDPOINTS,
+        help=f"name or name=weight; one of {', '.join(SCENARIOS)}"
+    )
+    parser.add_argument("--provider", default="local", help="Provider of the /llm/generate requests")
+    parser.add_argument("--model", default="mock")
+    parser.add_argument("--temperature", type=float, default=0.7)
+    parser.add_argument("--max-tokens", type=int, default=256)
+    parser.add_argument("--distinct-prompts", type=int, default=0, help="Cycle through this many prompts (0: all unique)")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the response caches")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Client timeout in seconds")
+    parser.add_argument("--keepalive", type=int, default=100, help="Idle client connections kept open")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mock-distribution", choices=["fixed", "uniform", "normal", "lognormal", "exponential"])
+    parser.add_argument("--mock-latency-ms", type=float, help="Mean time to first token")
+    parser.add_argument("--mock-jitter-ms", type=float, help="Latency standard deviation (uniform: half-width)")
+    parser.add_argument("--mock-tokens-per-second", type=float)
+    parser.add_argument("--mock-completion-tokens", type=int)
+    parser.add_argument("--mock-error-rate", type=float)
+    parser.add_argument("--mock-error-types", nargs="+", choices=["rate_limit", "server", "timeout", "interrupted"])
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args()
+
+    if args.base_url:
+        report = asyncio.run(run_remote(args))
+    else:
+        # Must be set before the app's settings are loaded
+        os.environ.setdefault("LLM_DEFAULT_PROVIDER", "local")
+        os.environ.setdefault("LLM_DEFAULT_MODEL", "mock")
+        report = asyncio.run(run_in_process(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
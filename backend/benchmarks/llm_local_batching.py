@@ -0,0 +1,128 @@
+"""
+Local model batching benchmark for LuminaOps
+Sends concurrent prompts to a tiny Hugging Face causal LM on the CPU through
+three paths: the text-generation pipeline called per request in a worker
+thread (the unbatched service path), the batch scheduler limited to one
+sequence per batch, and the batch scheduler with dynamic batching. Reports
+requests and generated tokens per second, latency percentiles and the mean
+batch size.
+
+Usage (from backend/):
+    python -m benchmarks.llm_local_batching --model sshleifer/tiny-gpt2 --requests 64 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from ai_services.llm.batching import LocalBatchScheduler
+
+CONFIGURATIONS = ["pipeline", "batch-1", "batched"]
+
+def percentiles(values_ms: List[float]) -> Dict[str, float]:
+    values = np.asarray(values_ms)
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3)
+    }
+
+def make_prompts(n: int, rng: np.random.Generator) -> List[str]:
+    """Prompts of varying length, so batches need padding"""
+    words = ["model", "data", "training", "feature", "latency", "vector", "pipeline", "metric", "cluster", "batch"]
+    return [" ".join(rng.choice(words, size=int(rng.integers(4, 32)))) for _ in range(n)]
+
+async def benchmark_configuration(name: str, generator, prompts: List[str], args) -> Dict:
+    scheduler = None
+    if name != "pipeline":
+        scheduler = LocalBatchScheduler(
+            generator.model,
+            generator.tokenizer,
+            args.model,
+            max_batch_size=1 if name == "batch-1" else args.max_batch_size,
+            max_wait_ms=args.max_wait_ms
+        )
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: List[float] = []
+    generated_tokens = 0
+
+    async def request(prompt: str):
+        nonlocal generated_tokens
+        async with semaphore:
+            start = time.perf_counter()
+            if scheduler is None:
+                result = await asyncio.to_thread(
+                    generator, prompt, max_new_tokens=args.max_new_tokens, do_sample=False, return_full_text=False
+                )
+                text = result[0]["generated_text"]
+            else:
+                text = await scheduler.generate(prompt, args.max_new_tokens)
+            latencies.append((time.perf_counter() - start) * 1000)
+            generated_tokens += len(generator.tokenizer(text)["input_ids"])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request(prompt) for prompt in prompts))
+    seconds = time.perf_counter() - start
+    report = {
+        "configuration": name,
+        "seconds": round(seconds, 3),
+        "requests_per_second": round(len(prompts) / seconds, 3),
+        "generated_tokens_per_second": round(generated_tokens / seconds, 3),
+        "latency": percentiles(latencies)
+    }
+    if scheduler is not None:
+        report["scheduler"] = scheduler.stats()
+    return report
+
+async def run(args) -> Dict:
+    import torch
+    from transformers import pipeline
+
+    torch.manual_seed(args.seed)
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    generator = pipeline("text-generation", model=args.model, torch_dtype=torch.float32, device="cpu")
+    prompts = make_prompts(args.requests, np.random.default_rng(args.seed))
+
+    # Warm up so one-off allocation cost is not charged to the first configuration
+    await asyncio.to_thread(generator, prompts[0], max_new_tokens=2, do_sample=False)
+
+    results = []
+    for name in args.configurations:
+        print(f"Generating {args.requests} completions at concurrency {args.concurrency} ({name})...")
+        results.append(await benchmark_configuration(name, generator, prompts, args))
+    return {
+        "model": args.model,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "max_new_tokens": args.max_new_tokens,
+        "torch_threads": torch.get_num_threads(),
+        "results": results
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dynamic batching for a local Hugging Face model on CPU")
+    parser.add_argument("--model", default="sshleifer/tiny-gpt2", help="Hub ID or local path of a causal LM")
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--max-new-tokens", type=int, default=32)
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=10.0)
+    parser.add_argument("--threads", type=int, default=0, help="torch CPU threads; 0 keeps the default")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--configurations", nargs="+", default=CONFIGURATIONS, choices=CONFIGURATIONS)
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+Mock LLM provider server for LuminaOps benchmarks
+A minimal HTTP/1.1 server on asyncio streams that answers the OpenAI chat
+completions and Anthropic messages APIs, including their streaming formats,
+after a configurable delay. Point the SDKs at it with OPENAI_BASE_URL=
+http://127.0.0.1:<port>/v1 and ANTHROPIC_BASE_URL=http://127.0.0.1:<port>.
+It counts accepted TCP connections, so benchmarks can tell whether clients
+reuse kept-alive connections. With a requests-per-minute limit it answers
+excess requests with 429 and a Retry-After header, as the providers do.
+
+Usage (from backend/):
+    python -m benchmarks.mock_llm_server --port 8089 --latency-ms 200
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+class MockLLMServer:
+    """OpenAI- and Anthropic-compatible endpoints with fixed latency"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 100.0,
+        tokens: int = 32,
+        token_interval_ms: float = 5.0,
+        requests_per_minute: Optional[float] = None,
+        burst_seconds: float = 1.0
+    ):
+        self.host = host
+        self.port = port
+        self.latency = latency_ms / 1000
+        self.tokens = tokens
+        self.token_interval = token_interval_ms / 1000
+        # Token bucket holding burst_seconds' worth of the rate
+        self.rate = requests_per_minute / 60 if requests_per_minute else None
+        self.capacity = max(1.0, self.rate * burst_seconds) if self.rate else None
+        self._allowance = self.capacity
+        self._allowance_updated = time.monotonic()
+        self.rate_limited = 0
+        self.connections_opened = 0
+        self.requests_served = 0
+        self.open_connections = 0
+        self.peak_open_connections = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "connections_opened": self.connections_opened,
+            "peak_open_connections": self.peak_open_connections,
+            "requests_served": self.requests_served,
+            "rate_limited": self.rate_limited
+        }
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections_opened += 1
+        self.open_connections += 1
+        self.peak_open_connections = max(self.peak_open_connections, self.open_connections)
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                path, headers, body = request
+                await self._respond(writer, path, body)
+                self.requests_served += 1
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass  # Client went away or the server is shutting down
+        finally:
+            self.open_connections -= 1
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, Dict[str, str], dict]]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None  # Client closed a kept-alive connection
+        lines = head.decode("latin-1").split("\r\n")
+        path = lines[0].split(" ")[1]
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+        body = json.loads(await reader.readexactly(length)) if length else {}
+        return path, headers, body
+
+    def _admit(self) -> Optional[float]:
+        """None if the request is within the rate limit, else seconds until it would be"""
+        if self.rate is None:
+            return None
+        now = time.monotonic()
+        self._allowance = min(self.capacity, self._allowance + (now - self._allowance_updated) * self.rate)
+        self._allowance_updated = now
+        if self._allowance >= 1:
+            self._allowance -= 1
+            return None
+        return (1 - self._allowance) / self.rate
+
+    def _completion_tokens(self, body: dict) -> List[str]:
+        count = min(self.tokens, int(body.get("max_tokens") or self.tokens))
+        return [f"token{i} " for i in range(count)]
+
+    async def _respond(self, writer: asyncio.StreamWriter, path: str, body: dict):
+        retry_after = self._admit()
+        if retry_after is not None:
+            self.rate_limited += 1
+            await self._write(
+                writer, 429,
+                {"error": {"type": "rate_limit_error", "message": "Rate limit exceeded"}},
+                {"retry-after": f"{retry_after:.3f}"}
+            )
+            return
+        await asyncio.sleep(self.latency)
+        tokens = self._completion_tokens(body)
+        if path.endswith("/chat/completions"):
+            events = self._openai_events(body, tokens) if body.get("stream") else None
+            payload = self._openai_completion(body, tokens)
+        elif path.endswith("/messages"):
+            events = self._anthropic_events(body, tokens) if body.get("stream") else None
+            payload = self._anthropic_message(body, tokens)
+        else:
+            await self._write(writer, 404, {"error": {"message": f"Unknown path {path}"}})
+            return
+
+        if events is None:
+            await self._write(writer, 200, payload)
+            return
+        writer.write(
+            b"HTTP/1.1 200 OK\r\ncontent-type: text/event-stream\r\n"
+            b"transfer-encoding: chunked\r\nconnection: keep-alive\r\n\r\n"
+        )
+        for event in events:
+            chunk = event.encode("utf-8")
+            writer.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            await writer.drain()
+            await asyncio.sleep(self.token_interval)
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    @staticmethod
+    async def _write(writer: asyncio.StreamWriter, status: int, payload: dict, headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(payload).encode("utf-8")
+        reason = {200: "OK", 404: "Not Found", 429: "Too Many Requests"}[status]
+        extra = "".join(f"{name}: {value}\r\n" for name, value in (headers or {}).items())
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\ncontent-type: application/json\r\n{extra}"
+            f"content-length: {len(data)}\r\nconnection: keep-alive\r\n\r\n".encode() + data
+        )
+        await writer.drain()
+
+    @staticmethod
+    def _prompt_tokens(body: dict) -> int:
+        return sum(len(str(message.get("content", "")).split()) for message in body.get("messages", []))
+
+    def _openai_completion(self, body: dict, tokens: List[str]) -> dict:
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(tokens)},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": self._prompt_tokens(body),
+                "completion_tokens": len(tokens),
+                "total_tokens": self._prompt_tokens(body) + len(tokens)
+            }
+        }
+
+    def _openai_events(self, body: dict, tokens: List[str]) -> List[str]:
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+        def chunk(choices: List[dict], **extra) -> str:
+            return "data: " + json.dumps({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "mock"),
+                "choices": choices,
+                **extra
+            }) + "\n\n"
+
+        def delta(content: dict, finish_reason=None) -> str:
+            return chunk([{"index": 0, "delta": content, "finish_reason": finish_reason}])
+
+        events = [delta({"role": "assistant", "content": ""})]
+        events += [delta({"content": token}) for token in tokens]
+        events.append(delta({}, "stop"))
+        if (body.get("stream_options") or {}).get("include_usage"):
+            # Usage arrives in a final chunk without choices
+            events.append(chunk([], usage=self._openai_completion(body, tokens)["usage"]))
+        events.append("data: [DONE]\n\n")
+        return events
+
+    def _anthropic_message(self, body: dict, tokens: List[str]) -> dict:
+        return {
+            "id": f"msg_{uuid.uuid4().hex}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "mock"),
+            "content": [{"type": "text", "text": "".join(tokens)}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": self._prompt_tokens(body), "output_tokens": len(tokens)}
+        }
+
+    def _anthropic_events(self, body: dict, tokens: List[str]) -> List[str]:
+        def event(name: str, data: dict) -> str:
+            return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+        message = self._anthropic_message(body, [])
+        events = [
+            event("message_start", {"type": "message_start", "message": message}),
+            event("content_block_start", {
+                "type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}
+            })
+        ]
+        events += [
+            event("content_block_delta", {
+                "type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": token}
+            })
+            for token in tokens
+        ]
+        events += [
+            event("content_block_stop", {"type": "content_block_stop", "index": 0}),
+            event("message_delta", {
+                "type": "message_delta",
+                "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                "usage": {"output_tokens": len(tokens)}
+            }),
+            event("message_stop", {"type": "message_stop"})
+        ]
+        return events
+
+async def serve(args):
+    server = MockLLMServer(
+        args.host, args.port, args.latency_ms, args.tokens, args.token_interval_ms,
+        args.requests_per_minute, args.burst_seconds
+    )
+    await server.start()
+    print(f"Mock LLM server listening on {server.base_url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve mock OpenAI and Anthropic APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--tokens", type=int, default=32, help="Completion tokens per response")
+    parser.add_argument("--token-interval-ms", type=float, default=5.0, help="Delay between streamed tokens")
+    parser.add_argument("--requests-per-minute", type=float, help="Answer requests above this rate with 429")
+    parser.add_argument("--burst-seconds", type=float, default=1.0, help="Rate limit bucket size in seconds of rate")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
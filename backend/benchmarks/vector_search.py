@@ -0,0 +1,313 @@
+"""
+Vector search benchmark suite for LuminaOps
+Generates synthetic corpora of precomputed embeddings (random, clustered, or
+with a power-law spectrum like real sentence embeddings),
+loads them into each backend/index configuration through the public
+vector DB service API and measures ingestion rate, build time, memory, QPS,
+latency percentiles and recall@k against exact brute-force search.
+
+Runs fully offline: documents carry their embeddings and queries go through
+`search_by_vector`, so the embedding model is never loaded.
+
+Usage (from backend/):
+    python -m benchmarks.vector_search --sizes 10000,100000 --output results.json
+    python -m benchmarks.vector_search --sizes 10000 --compare results.json
+    python -m benchmarks.vector_search --corpora spectral --reduced-dimensions 64,128,192
+"""
+
+from typing import Dict, Any, List, Callable
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import time
+import uuid
+from datetime import datetime
+
+import numpy as np
+
+from ai_services.vector_db.vector_service import VectorDBService, VectorDBProvider, Document
+from ai_services.vector_db.dedup import DedupConfig
+
+# name -> (provider, initialize kwargs)
+CONFIGURATIONS: Dict[str, tuple] = {
+    "faiss-flat": (VectorDBProvider.FAISS, {"storage": "float32"}),
+    "faiss-fp16": (VectorDBProvider.FAISS, {"storage": "float16"}),
+    "faiss-int8": (VectorDBProvider.FAISS, {"storage": "int8"}),
+    "faiss-int8-rescore4": (VectorDBProvider.FAISS, {"storage": "int8", "rescore_factor": 4}),
+    "faiss-sharded-4": (VectorDBProvider.FAISS_SHARDED, {"num_shards": 4}),
+    "chroma": (VectorDBProvider.CHROMA, {"collection_name": "benchmark"}),
+}
+
+def random_vectors(n: int, dimension: int, rng: np.random.Generator) -> np.ndarray:
+    """Isotropic Gaussian directions; the hardest case for approximate indexes"""
+    vectors = rng.standard_normal((n, dimension), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def clustered_vectors(n: int, dimension: int, rng: np.random.Generator, clusters: int = 100) -> np.ndarray:
+    """Gaussian blobs around random centers, similar in spread to sentence embeddings"""
+    centers = rng.standard_normal((clusters, dimension), dtype=np.float32)
+    labels = rng.integers(0, clusters, size=n)
+    vectors = centers[labels] + 0.35 * rng.standard_normal((n, dimension), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def spectral_vectors(n: int, dimension: int, rng: np.random.Generator, decay: float = 1.0) -> np.ndarray:
+    """Power-law variance spectrum in a random rotation, like real sentence embeddings.
+
+    The variance of the i-th principal direction falls off as i^-decay, so a
+    few dozen directions carry most of the signal; the seed fixes the rotation
+    so corpus and queries share it.
+    """
+    rotation_rng = np.random.default_rng(dimension)
+    rotation, _ = np.linalg.qr(rotation_rng.standard_normal((dimension, dimension)))
+    scales = np.arange(1, dimension + 1, dtype=np.float32) ** (-decay / 2)
+    vectors = (rng.standard_normal((n, dimension), dtype=np.float32) * scales) @ rotation.T.astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+CORPORA: Dict[str, Callable[..., np.ndarray]] = {
+    "random": random_vectors,
+    "clustered": clustered_vectors,
+    "spectral": spectral_vectors,
+}
+
+def reduction_configurations(dimensions: List[int]) -> Dict[str, tuple]:
+    """PCA and random-projection variants for each target dimension"""
+    configurations = {}
+    for dimension in dimensions:
+        for method in ("pca", "random"):
+            options = {"reduction": method, "reduced_dimension": dimension}
+            configurations[f"faiss-{method}{dimension}"] = (VectorDBProvider.FAISS, options)
+            configurations[f"faiss-{method}{dimension}-rescore4"] = (
+                VectorDBProvider.FAISS, {**options, "rescore_factor": 4}
+            )
+    return configurations
+
+def add_baseline_deltas(runs: List[Dict[str, Any]], top_k: int, baseline: str = "faiss-flat"):
+    """Speedup, memory ratio and recall loss of each run against the flat index"""
+    recall_key = f"recall@{top_k}"
+    flat = {
+        (run["corpus"], run["size"]): run for run in runs
+        if run["configuration"] == baseline and "error" not in run
+    }
+    for run in runs:
+        base = flat.get((run["corpus"], run["size"]))
+        if base is None or "error" in run or run is base:
+            continue
+        index_bytes = run.get("index_memory", {}).get("index_bytes")
+        base_bytes = base.get("index_memory", {}).get("index_bytes")
+        run["vs_flat"] = {
+            "speedup": round(run["qps"] / base["qps"], 3),
+            "p50_speedup": round(base["latency"]["p50_ms"] / run["latency"]["p50_ms"], 3),
+            "index_memory_ratio": round(index_bytes / base_bytes, 4) if index_bytes and base_bytes else None,
+            "recall_loss": round(base[recall_key] - run[recall_key], 4)
+        }
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, top_k: int, block: int = 100_000) -> List[set]:
+    """Brute-force ground truth by inner product, scanning the corpus in blocks"""
+    best_scores = np.full((len(queries), top_k), -np.inf, dtype=np.float32)
+    best_ids = np.zeros((len(queries), top_k), dtype=np.int64)
+    for offset in range(0, len(corpus), block):
+        scores = queries @ corpus[offset:offset + block].T
+        ids = np.broadcast_to(np.arange(offset, offset + scores.shape[1]), scores.shape)
+        merged_scores = np.concatenate([best_scores, scores], axis=1)
+        merged_ids = np.concatenate([best_ids, ids], axis=1)
+        keep = np.argpartition(-merged_scores, top_k - 1, axis=1)[:, :top_k]
+        best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+        best_ids = np.take_along_axis(merged_ids, keep, axis=1)
+    return [set(str(i) for i in row) for row in best_ids]
+
+def resident_memory_bytes() -> int:
+    """Current RSS of this process (Linux)"""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+def percentiles(latencies_ms: List[float]) -> Dict[str, float]:
+    values = np.asarray(latencies_ms)
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "mean_ms": round(float(values.mean()), 3)
+    }
+
+async def benchmark_configuration(
+    name: str,
+    corpus: np.ndarray,
+    queries: np.ndarray,
+    truth: List[set],
+    args
+) -> Dict[str, Any]:
+    provider, options = CONFIGURATIONS[name]
+    kwargs = dict(options)
+    if provider == VectorDBProvider.CHROMA:
+        # Fresh collection per run so earlier runs don't skew counts or recall
+        kwargs["collection_name"] = f"{options['collection_name']}_{uuid.uuid4().hex[:8]}"
+    else:
+        kwargs["dimension"] = corpus.shape[1]
+    # Query cache and dedup off: every vector is indexed and every query reaches the index
+    service = VectorDBService(
+        provider, enable_lexical=False, enable_query_cache=False, dedup_config=DedupConfig()
+    )
+    if not await service.initialize(**kwargs):
+        return {"configuration": name, "error": "initialization failed"}
+
+    rss_before = resident_memory_bytes()
+    start = time.perf_counter()
+    for offset in range(0, len(corpus), args.batch_size):
+        batch = [
+            Document(id=str(i), content="", metadata={}, embedding=corpus[i].tolist())
+            for i in range(offset, min(offset + args.batch_size, len(corpus)))
+        ]
+        if not await service.add_documents(batch):
+            return {"configuration": name, "error": "ingestion failed"}
+    build_seconds = time.perf_counter() - start
+    rss_after = resident_memory_bytes()
+
+    # Warm up, then fire queries with bounded concurrency
+    for query in queries[:min(10, len(queries))]:
+        await service.search_by_vector(query.tolist(), args.top_k)
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: List[float] = [0.0] * len(queries)
+    results: List[List[str]] = [[] for _ in queries]
+
+    async def one(i: int):
+        async with semaphore:
+            query_start = time.perf_counter()
+            hits = await service.search_by_vector(queries[i].tolist(), args.top_k)
+            latencies[i] = (time.perf_counter() - query_start) * 1000
+            results[i] = [hit.document.id for hit in hits]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(len(queries))))
+    search_seconds = time.perf_counter() - start
+
+    recall = sum(len(set(row) & expected) for row, expected in zip(results, truth)) / (len(truth) * args.top_k)
+    report = {
+        "configuration": name,
+        "provider": provider.value,
+        "options": options,
+        "build_seconds": round(build_seconds, 3),
+        "ingest_docs_per_second": round(len(corpus) / build_seconds, 1),
+        "rss_delta_bytes": rss_after - rss_before,
+        "qps": round(len(queries) / search_seconds, 1),
+        "latency": percentiles(latencies),
+        f"recall@{args.top_k}": round(recall, 4)
+    }
+    if hasattr(service.db_service, "memory_usage"):
+        report["index_memory"] = service.db_service.memory_usage()
+    if hasattr(service.db_service, "close"):
+        await service.db_service.close()
+    return report
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        commit = None
+    info = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "numpy": np.__version__
+    }
+    try:
+        import faiss
+        info["faiss"] = faiss.__version__
+    except ImportError:
+        pass
+    return info
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Human-readable deltas for runs that share corpus, size and configuration"""
+    def key(run):
+        return (run["corpus"], run["size"], run["configuration"])
+    previous = {key(run): run for run in baseline.get("runs", []) if "error" not in run}
+    lines = []
+    for run in current["runs"]:
+        old = previous.get(key(run))
+        if old is None or "error" in run:
+            continue
+        recall_key = next(k for k in run if k.startswith("recall@"))
+        lines.append(
+            f"{run['corpus']:>9} {run['size']:>9} {run['configuration']:<22} "
+            f"qps {old['qps']:>9} -> {run['qps']:<9} "
+            f"p99 {old['latency']['p99_ms']:>8} -> {run['latency']['p99_ms']:<8} ms "
+            f"{recall_key} {old.get(recall_key)} -> {run[recall_key]}"
+        )
+    return lines
+
+async def run(args) -> Dict[str, Any]:
+    rng = np.random.default_rng(args.seed)
+    runs = []
+    for corpus_name in args.corpora:
+        for size in args.sizes:
+            corpus = CORPORA[corpus_name](size, args.dimension, rng)
+            queries = CORPORA[corpus_name](args.queries, args.dimension, rng)
+            truth = exact_top_k(corpus, queries, args.top_k)
+            for name in args.configurations:
+                print(f"Benchmarking {name} on {corpus_name} corpus of {size} vectors...")
+                try:
+                    report = await benchmark_configuration(name, corpus, queries, truth, args)
+                except Exception as e:
+                    report = {"configuration": name, "error": str(e)}
+                runs.append({"corpus": corpus_name, "size": size, **report})
+    add_baseline_deltas(runs, args.top_k)
+    return {
+        "environment": environment(),
+        "parameters": {
+            "dimension": args.dimension,
+            "queries": args.queries,
+            "top_k": args.top_k,
+            "concurrency": args.concurrency,
+            "seed": args.seed
+        },
+        "runs": runs
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vector search backends")
+    parser.add_argument("--sizes", type=lambda v: [int(x) for x in v.split(",")], default=[10_000])
+    parser.add_argument("--corpora", type=lambda v: v.split(","), default=["random", "clustered", "spectral"])
+    parser.add_argument("--configurations", type=lambda v: v.split(","),
+                        default=["faiss-flat", "faiss-fp16", "faiss-int8", "faiss-int8-rescore4"])
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--reduced-dimensions", type=lambda v: [int(x) for x in v.split(",")], default=[],
+                        help="Also run PCA/random-projection configurations for these target dimensions")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    parser.add_argument("--compare", help="Print deltas against a previous JSON report")
+    args = parser.parse_args()
+
+    if args.reduced_dimensions:
+        reduced = reduction_configurations(args.reduced_dimensions)
+        CONFIGURATIONS.update(reduced)
+        args.configurations = list(dict.fromkeys(["faiss-flat", *args.configurations, *reduced]))
+
+    unknown = set(args.configurations) - set(CONFIGURATIONS)
+    if unknown:
+        parser.error(f"Unknown configurations: {', '.join(sorted(unknown))}")
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            for line in compare(report, json.load(f)):
+                print(line)
+
+if __name__ == "__main__":
+    main()
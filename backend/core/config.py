@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Optional
 import os
 
 class Settings(BaseSettings):
@@ -39,6 +39,88 @@ class Settings(BaseSettings):
     ANTHROPIC_API_KEY: str = os.getenv("ANTHROPIC_API_KEY", "")
     HUGGINGFACE_API_TOKEN: str = os.getenv("HUGGINGFACE_API_TOKEN", "")
     
+    # Vector DB / Embedding Settings
+    EMBEDDING_MODEL_NAME: str = os.getenv("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
+    EMBEDDING_WARMUP: bool = False  # Load the embedding model during startup
+    VECTOR_DB_SEARCH_WORKERS: int = 4  # Threads for latency-sensitive searches
+    VECTOR_DB_INGEST_WORKERS: int = 2  # Threads for bulk embedding and index builds
+    VECTOR_DB_MAX_PENDING: int = 64  # In-flight tasks per lane before callers wait
+    VECTOR_DB_SEARCH_EMBEDDER: bool = True  # Second embedding model copy for searches, so they never wait on ingestion
+    VECTOR_DB_PROVIDER: str = "chroma"  # Backend of the default vector DB: chroma, faiss or faiss_sharded
+    VECTOR_DB_SHARDS: int = 4  # Local shard processes for the faiss_sharded provider
+    VECTOR_DB_SHARD_ADDRESSES: List[str] = []  # "host:port" remote shards for faiss_sharded, instead of local ones
+    VECTOR_QUERY_CACHE_ENABLED: bool = True
+    VECTOR_EMBEDDING_CACHE_SIZE: int = 10000  # Cached query embeddings
+    VECTOR_RESULT_CACHE_SIZE: int = 2000  # Cached (embedding, top_k, filters) result lists
+    VECTOR_QUERY_CACHE_TTL: int = 300  # Seconds
+    VECTOR_DEDUP_MODE: str = "off"  # off | skip | link
+    VECTOR_DEDUP_JACCARD: float = 0.8  # MinHash similarity for near-identical content
+    VECTOR_DEDUP_COSINE: Optional[float] = None  # Embedding similarity check, disabled when unset
+    VECTOR_COLLECTIONS_DIR: str = "./data/collections"  # Persisted named collections
+    VECTOR_COLLECTIONS_MEMORY_BUDGET_MB: int = 1024  # Resident index memory before LRU eviction
+    VECTOR_DB_SHARD_AUTHKEY: str = os.getenv("VECTOR_DB_SHARD_AUTHKEY", "")  # Required for remote shards
+    
+    # LLM Settings
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 1000  # In-memory cached responses
+    LLM_CACHE_TTL: int = 3600  # Seconds
+    LLM_CACHE_PERSISTENT_PATH: Optional[str] = None  # SQLite file for a restart-safe tier, disabled when unset
+    LLM_CACHE_NONDETERMINISTIC: bool = False  # Also cache requests with temperature > 0
+    LLM_SEMANTIC_CACHE_ENABLED: bool = False  # Reuse responses to similar prompts on routes that pass a route name
+    LLM_SEMANTIC_CACHE_COLLECTION: str = "llm_semantic_cache"  # Vector collection holding cached prompts
+    LLM_SEMANTIC_CACHE_DIMENSION: int = 384  # Embedding size of EMBEDDING_MODEL_NAME
+    LLM_SEMANTIC_CACHE_THRESHOLD: float = 0.92  # Minimum cosine similarity for a hit
+    # Route (e.g. "/assistant/recommend-model") -> similarity threshold overriding LLM_SEMANTIC_CACHE_THRESHOLD
+    LLM_SEMANTIC_CACHE_ROUTE_THRESHOLDS: Dict[str, float] = {}
+    LLM_SEMANTIC_CACHE_TTL: int = 86400  # Seconds
+    LLM_SEMANTIC_CACHE_MAX_ENTRIES: int = 50000  # Oldest entries are pruned beyond this
+    LLM_COALESCE_ENABLED: bool = True  # Identical concurrent requests share one provider call
+    LLM_COALESCE_SAMPLED: bool = True  # Also share calls with temperature > 0; joined requests get the same sample
+    LLM_ADMISSION_ENABLED: bool = True
+    LLM_MAX_CONCURRENCY: int = 32  # In-flight calls per provider unless LLM_ADMISSION_LIMITS overrides it
+    # "provider" or "provider/model" -> max_concurrency, requests_per_minute, tokens_per_minute, burst_seconds
+    LLM_ADMISSION_LIMITS: Dict[str, Dict[str, float]] = {}
+    LLM_ADMISSION_MAX_QUEUE: int = 256  # Waiting requests per provider (or configured model) before rejecting
+    LLM_ADMISSION_MAX_WAIT: float = 30.0  # Seconds a request may wait for admission
+    LLM_ROUTER_MAX_RETRIES: int = 2  # Retries of a transient error before falling back
+    LLM_ROUTER_BACKOFF_BASE: float = 0.5  # Seconds; doubles per retry, with full jitter
+    # "provider" or "provider/model" -> ordered "provider/model" fallback targets
+    LLM_ROUTER_FALLBACKS: Dict[str, List[str]] = {}
+    LLM_ROUTER_HEDGING: bool = False  # Duplicate calls that outlast the target's p95 latency
+    LLM_ROUTER_MIN_SAMPLES: int = 20  # Samples before hedging or marking a target unhealthy
+    LLM_ROUTER_WINDOW: int = 200  # Recent calls kept per provider/model
+    LLM_ROUTER_ERROR_THRESHOLD: float = 0.5  # Error rate at which a target is tried after its fallbacks
+    LLM_LOCAL_BATCHING_ENABLED: bool = True  # Batch concurrent prompts to local Hugging Face models
+    LLM_LOCAL_MAX_BATCH_SIZE: int = 8
+    LLM_LOCAL_BATCH_WAIT_MS: float = 10.0  # Longest a request waits for its batch to fill
+    LLM_LOCAL_DTYPE: str = "float16"  # float32, float16, bfloat16 or int8 (dynamic quantization, CPU)
+    LLM_LOCAL_MEMORY_BUDGET_MB: int = 8192  # Resident weights of all local models before idle ones are evicted
+    LLM_LOCAL_PREWARM: List[str] = []  # "model_name" or "model_name@dtype" to load during startup
+    LLM_BATCH_CONCURRENCY: int = 8  # Default provider calls in flight per batch
+    LLM_BATCH_MAX_CONCURRENCY: int = 64
+    LLM_BATCH_MAX_PROMPTS: int = 10000
+    LLM_BATCH_ADMISSION_MAX_WAIT: float = 300.0  # Seconds an item retries admission rejections before it fails
+    LLM_BATCH_STATE_DIR: Optional[str] = None  # Checkpoint batches here so they can resume after a restart
+    OPENAI_BASE_URL: Optional[str] = None  # Override the API endpoint, e.g. a proxy or mock server
+    ANTHROPIC_BASE_URL: Optional[str] = None
+    LLM_HTTP_MAX_CONNECTIONS: int = 100  # Shared pool across all remote providers
+    LLM_HTTP_MAX_KEEPALIVE: int = 100  # Idle connections kept open; below peak concurrency, bursts reconnect
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 30.0  # Seconds an idle connection stays open
+    LLM_HTTP_CONNECT_TIMEOUT: float = 5.0  # Seconds
+    LLM_HTTP_READ_TIMEOUT: float = 120.0  # Seconds between bytes of a response
+    LLM_HTTP_POOL_TIMEOUT: float = 10.0  # Seconds to wait for a free connection
+    LLM_DEFAULT_PROVIDER: str = "openai"  # Used by requests that do not choose one (assistant, code generation)
+    LLM_DEFAULT_MODEL: str = "gpt-4-turbo-preview"
+    # The "local" provider is a mock for load tests: no model, simulated latency, tokens and errors
+    LLM_MOCK_LATENCY_DISTRIBUTION: str = "lognormal"  # fixed, uniform, normal, lognormal or exponential
+    LLM_MOCK_LATENCY_MS: float = 300.0  # Mean time to first token
+    LLM_MOCK_LATENCY_JITTER_MS: float = 100.0  # Standard deviation (uniform: half-width)
+    LLM_MOCK_TOKENS_PER_SECOND: float = 50.0  # Streaming rate after the first token
+    LLM_MOCK_COMPLETION_TOKENS: int = 64  # Tokens per response, capped by max_tokens
+    LLM_MOCK_ERROR_RATE: float = 0.0  # Fraction of calls that fail
+    LLM_MOCK_ERROR_TYPES: List[str] = ["rate_limit", "server", "timeout", "interrupted"]
+    LLM_MOCK_SEED: Optional[int] = None  # Seed for reproducible latencies and errors
+    
     # CORS Settings
     ALLOWED_HOSTS: List[str] = [
         "http://localhost:3000",
@@ -1,6 +1,7 @@
 from prometheus_client import Counter, Histogram, Gauge, generate_latest
 from fastapi import FastAPI
 import time
+from typing import Optional
 
 # Prometheus metrics
 REQUEST_COUNT = Counter(
@@ -31,6 +32,232 @@ MODELS_DEPLOYED = Gauge(
     'Total number of deployed models'
 )
 
+EMBEDDING_MODEL_LOAD_SECONDS = Gauge(
+    'embedding_model_load_seconds',
+    'Time taken to load an embedding model',
+    ['model']
+)
+
+EMBEDDING_MODEL_MEMORY_BYTES = Gauge(
+    'embedding_model_memory_bytes',
+    'Resident memory of a loaded embedding model',
+    ['model']
+)
+
+VECTOR_QUERY_CACHE_REQUESTS = Counter(
+    'vector_query_cache_requests_total',
+    'Vector query cache lookups',
+    ['tier', 'result']
+)
+
+VECTOR_QUERY_CACHE_HIT_RATIO = Gauge(
+    'vector_query_cache_hit_ratio',
+    'Hit ratio of a vector query cache tier since startup',
+    ['tier']
+)
+
+VECTOR_QUERY_CACHE_ENTRIES = Gauge(
+    'vector_query_cache_entries',
+    'Entries held by a vector query cache tier',
+    ['tier']
+)
+
+VECTOR_COLLECTION_DOCUMENTS = Gauge(
+    'vector_collection_documents',
+    'Documents stored in a vector collection',
+    ['collection']
+)
+
+VECTOR_COLLECTION_MEMORY_BYTES = Gauge(
+    'vector_collection_memory_bytes',
+    'Index memory of a vector collection while resident',
+    ['collection']
+)
+
+VECTOR_COLLECTION_RESIDENT = Gauge(
+    'vector_collection_resident',
+    'Whether a vector collection is loaded in memory (1) or only on disk (0)',
+    ['collection']
+)
+
+VECTOR_COLLECTION_EVENTS = Counter(
+    'vector_collection_events_total',
+    'Vector collection loads and evictions',
+    ['collection', 'event']
+)
+
+VECTOR_DEDUP_DOCUMENTS = Counter(
+    'vector_dedup_documents_total',
+    'Documents checked for near-duplicates at ingestion',
+    ['result']
+)
+
+VECTOR_DEDUP_SECONDS = Histogram(
+    'vector_dedup_seconds',
+    'Time spent on near-duplicate detection per add_documents call'
+)
+
+LLM_CACHE_REQUESTS = Counter(
+    'llm_cache_requests_total',
+    'LLM response cache lookups',
+    ['provider', 'result']
+)
+
+LLM_CACHE_SAVED_SECONDS = Counter(
+    'llm_cache_saved_seconds_total',
+    'Generation time avoided by LLM response cache hits',
+    ['provider']
+)
+
+LLM_SEMANTIC_CACHE_REQUESTS = Counter(
+    'llm_semantic_cache_requests_total',
+    'LLM semantic cache lookups',
+    ['route', 'result']
+)
+
+LLM_SEMANTIC_CACHE_SIMILARITY = Histogram(
+    'llm_semantic_cache_similarity',
+    'Cosine similarity of the nearest cached prompt per semantic cache lookup',
+    ['route'],
+    buckets=[0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.92, 0.94, 0.96, 0.98, 1.0]
+)
+
+LLM_SEMANTIC_CACHE_SAVED_SECONDS = Counter(
+    'llm_semantic_cache_saved_seconds_total',
+    'Provider generation time avoided by LLM semantic cache hits',
+    ['route']
+)
+
+LLM_COALESCED_REQUESTS = Counter(
+    'llm_coalesced_requests_total',
+    'LLM requests served by joining an identical in-flight generation',
+    ['provider']
+)
+
+LLM_ADMISSION_QUEUE_WAIT = Histogram(
+    'llm_admission_queue_wait_seconds',
+    'Time LLM calls waited for admission (concurrency slot and rate budget)',
+    ['provider', 'model'],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+
+LLM_ADMISSION_REJECTIONS = Counter(
+    'llm_admission_rejections_total',
+    'LLM calls rejected by admission control',
+    ['provider', 'model', 'reason']
+)
+
+LLM_ADMISSION_QUEUED = Gauge(
+    'llm_admission_queued',
+    'LLM calls waiting for admission',
+    ['provider', 'model']
+)
+
+LLM_ADMISSION_IN_FLIGHT = Gauge(
+    'llm_admission_in_flight',
+    'Admitted LLM calls in progress',
+    ['provider', 'model']
+)
+
+LLM_TIME_TO_FIRST_TOKEN = Histogram(
+    'llm_time_to_first_token_seconds',
+    'Time from the start of a streaming LLM provider call to its first token',
+    ['provider', 'model'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 30.0)
+)
+
+LLM_REQUEST_DURATION = Histogram(
+    'llm_request_duration_seconds',
+    'Duration of LLM provider calls, including admission queueing',
+    ['provider', 'model', 'streaming'],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+)
+
+LLM_OUTPUT_TOKENS_PER_SECOND = Histogram(
+    'llm_output_tokens_per_second',
+    'Completion tokens per second of LLM provider calls, after admission',
+    ['provider', 'model'],
+    buckets=(1, 5, 10, 20, 30, 50, 75, 100, 150, 200, 400, 1000)
+)
+
+LLM_TOKENS = Counter(
+    'llm_tokens_total',
+    'Tokens reported by LLM providers',
+    ['provider', 'model', 'type']
+)
+
+LLM_ERRORS = Counter(
+    'llm_errors_total',
+    'Failed LLM provider calls',
+    ['provider', 'model', 'error_type']
+)
+
+LLM_LOCAL_BATCH_SIZE = Histogram(
+    'llm_local_batch_size',
+    'Sequences per batch decoded together by a local model',
+    ['model'],
+    buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+
+LLM_LOCAL_BATCH_WAIT = Histogram(
+    'llm_local_batch_wait_seconds',
+    'Time the oldest request in a local-model batch waited before decoding started',
+    ['model'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+
+LLM_LOCAL_MODEL_LOAD_SECONDS = Gauge(
+    'llm_local_model_load_seconds',
+    'Time taken to load a local LLM',
+    ['model', 'dtype']
+)
+
+LLM_LOCAL_MODEL_MEMORY_BYTES = Gauge(
+    'llm_local_model_memory_bytes',
+    'Resident memory of a loaded local LLM, 0 once unloaded',
+    ['model', 'dtype']
+)
+
+LLM_LOCAL_MODEL_UNLOADS = Counter(
+    'llm_local_model_unloads_total',
+    'Local LLMs unloaded, by reason',
+    ['model', 'dtype', 'reason']
+)
+
+LLM_BATCH_ITEMS = Counter(
+    'llm_batch_items_total',
+    'Prompts processed by batch generation jobs',
+    ['outcome']
+)
+
+LLM_HTTP_POOL_CONNECTIONS = Gauge(
+    'llm_http_pool_connections',
+    'Connections in the shared LLM HTTP pool',
+    ['state']
+)
+
+LLM_HTTP_POOL_IN_FLIGHT = Gauge(
+    'llm_http_pool_requests_in_flight',
+    'LLM provider HTTP requests sent and not yet fully read'
+)
+
+LLM_HTTP_POOL_UTILIZATION = Gauge(
+    'llm_http_pool_utilization',
+    'Active connections as a fraction of the pool limit'
+)
+
+LLM_ROUTER_ATTEMPTS = Counter(
+    'llm_router_attempts_total',
+    'LLM provider call attempts made by the router',
+    ['provider', 'model', 'outcome', 'hedge']
+)
+
+LLM_ROUTER_FALLBACKS = Counter(
+    'llm_router_fallbacks_total',
+    'LLM requests served by a fallback target',
+    ['requested', 'served']
+)
+
 def setup_metrics(app: FastAPI):
     """Setup Prometheus metrics middleware."""
     
@@ -74,4 +301,126 @@ def record_ml_job(job_type: str, status: str):
 
 def update_deployed_models_count(count: int):
     """Update deployed models count."""
-    MODELS_DEPLOYED.set(count)
\ No newline at end of file
+    MODELS_DEPLOYED.set(count)
+
+def record_embedding_model_load(model: str, load_seconds: float, memory_bytes: int):
+    """Record load time and resident memory of an embedding model."""
+    EMBEDDING_MODEL_LOAD_SECONDS.labels(model=model).set(load_seconds)
+    EMBEDDING_MODEL_MEMORY_BYTES.labels(model=model).set(memory_bytes)
+
+def record_vector_query_cache(tier: str, hit: bool, hit_ratio: float, entries: int):
+    """Record a vector query cache lookup."""
+    VECTOR_QUERY_CACHE_REQUESTS.labels(tier=tier, result="hit" if hit else "miss").inc()
+    VECTOR_QUERY_CACHE_HIT_RATIO.labels(tier=tier).set(hit_ratio)
+    VECTOR_QUERY_CACHE_ENTRIES.labels(tier=tier).set(entries)
+
+def record_vector_collection(collection: str, documents: int, memory_bytes: int, resident: bool):
+    """Record size and residency of a vector collection."""
+    VECTOR_COLLECTION_DOCUMENTS.labels(collection=collection).set(documents)
+    VECTOR_COLLECTION_MEMORY_BYTES.labels(collection=collection).set(memory_bytes if resident else 0)
+    VECTOR_COLLECTION_RESIDENT.labels(collection=collection).set(1 if resident else 0)
+
+def record_vector_collection_event(collection: str, event: str):
+    """Record a vector collection load or eviction."""
+    VECTOR_COLLECTION_EVENTS.labels(collection=collection, event=event).inc()
+
+def record_vector_dedup(checked: int, duplicates: int, seconds: float):
+    """Record one near-duplicate detection pass."""
+    VECTOR_DEDUP_DOCUMENTS.labels(result="unique").inc(checked - duplicates)
+    VECTOR_DEDUP_DOCUMENTS.labels(result="duplicate").inc(duplicates)
+    VECTOR_DEDUP_SECONDS.observe(seconds)
+
+def record_llm_cache(provider: str, result: str, saved_seconds: float = 0.0):
+    """Record an LLM response cache lookup (hit_memory, hit_persistent, miss or bypass)."""
+    LLM_CACHE_REQUESTS.labels(provider=provider, result=result).inc()
+    if saved_seconds:
+        LLM_CACHE_SAVED_SECONDS.labels(provider=provider).inc(saved_seconds)
+
+def record_llm_http_pool(active: int, idle: Optional[int], in_flight: int, max_connections: int):
+    """Record shared LLM HTTP pool utilization; idle is None when unknown."""
+    LLM_HTTP_POOL_CONNECTIONS.labels(state="active").set(active)
+    if idle is not None:
+        LLM_HTTP_POOL_CONNECTIONS.labels(state="idle").set(idle)
+    LLM_HTTP_POOL_IN_FLIGHT.set(in_flight)
+    LLM_HTTP_POOL_UTILIZATION.set(active / max_connections if max_connections else 0.0)
+
+def record_llm_ttft(provider: str, model: str, seconds: float):
+    """Record time to first token of a streamed generation."""
+    LLM_TIME_TO_FIRST_TOKEN.labels(provider=provider, model=model).observe(seconds)
+
+def record_llm_call(
+    provider: str,
+    model: str,
+    streaming: bool,
+    seconds: float,
+    queue_seconds: float,
+    prompt_tokens: Optional[int],
+    completion_tokens: Optional[int]
+):
+    """Record a completed LLM provider call; token counts are None when the provider reports no usage.
+    queue_seconds is excluded from the output rate; the wait itself is recorded by record_llm_admission_wait."""
+    LLM_REQUEST_DURATION.labels(provider=provider, model=model, streaming=str(streaming).lower()).observe(seconds)
+    if prompt_tokens is not None:
+        LLM_TOKENS.labels(provider=provider, model=model, type="prompt").inc(prompt_tokens)
+    if completion_tokens is not None:
+        LLM_TOKENS.labels(provider=provider, model=model, type="completion").inc(completion_tokens)
+        if seconds > queue_seconds:
+            LLM_OUTPUT_TOKENS_PER_SECOND.labels(provider=provider, model=model).observe(
+                completion_tokens / (seconds - queue_seconds)
+            )
+
+def record_llm_error(provider: str, model: str, error_type: str):
+    """Record a failed LLM provider call by exception type."""
+    LLM_ERRORS.labels(provider=provider, model=model, error_type=error_type).inc()
+
+def record_llm_coalesced(provider: str):
+    """Record a request that joined an in-flight generation."""
+    LLM_COALESCED_REQUESTS.labels(provider=provider).inc()
+
+def record_llm_admission_wait(provider: str, model: str, seconds: float):
+    """Record how long an LLM call queued before admission."""
+    LLM_ADMISSION_QUEUE_WAIT.labels(provider=provider, model=model).observe(seconds)
+
+def record_llm_admission_rejection(provider: str, model: str, reason: str):
+    """Record an LLM call rejected by admission control."""
+    LLM_ADMISSION_REJECTIONS.labels(provider=provider, model=model, reason=reason).inc()
+
+def record_llm_admission_state(provider: str, model: str, queued: int, in_flight: int):
+    """Record queue depth and in-flight calls of an admission scope."""
+    LLM_ADMISSION_QUEUED.labels(provider=provider, model=model).set(queued)
+    LLM_ADMISSION_IN_FLIGHT.labels(provider=provider, model=model).set(in_flight)
+
+def record_llm_route_attempt(provider: str, model: str, outcome: str, hedge: bool):
+    """Record one routed LLM call attempt and how it ended."""
+    LLM_ROUTER_ATTEMPTS.labels(provider=provider, model=model, outcome=outcome, hedge=str(hedge).lower()).inc()
+
+def record_llm_fallback(requested: str, served: str):
+    """Record an LLM request served by a fallback target."""
+    LLM_ROUTER_FALLBACKS.labels(requested=requested, served=served).inc()
+
+def record_llm_batch(model: str, size: int, wait_seconds: float):
+    """Record a batch started by a local model's batch scheduler."""
+    LLM_LOCAL_BATCH_SIZE.labels(model=model).observe(size)
+    LLM_LOCAL_BATCH_WAIT.labels(model=model).observe(wait_seconds)
+
+def record_llm_model_load(model: str, dtype: str, load_seconds: float, memory_bytes: int):
+    """Record load time and resident memory of a local LLM."""
+    LLM_LOCAL_MODEL_LOAD_SECONDS.labels(model=model, dtype=dtype).set(load_seconds)
+    LLM_LOCAL_MODEL_MEMORY_BYTES.labels(model=model, dtype=dtype).set(memory_bytes)
+
+def record_llm_model_unload(model: str, dtype: str, reason: str):
+    """Record a local LLM being unloaded."""
+    LLM_LOCAL_MODEL_MEMORY_BYTES.labels(model=model, dtype=dtype).set(0)
+    LLM_LOCAL_MODEL_UNLOADS.labels(model=model, dtype=dtype, reason=reason).inc()
+
+def record_llm_batch_item(outcome: str):
+    """Record one prompt of a batch generation job."""
+    LLM_BATCH_ITEMS.labels(outcome=outcome).inc()
+
+def record_llm_semantic_cache(route: str, result: str, similarity: Optional[float] = None, saved_seconds: float = 0.0):
+    """Record an LLM semantic cache lookup (hit, miss or error)."""
+    LLM_SEMANTIC_CACHE_REQUESTS.labels(route=route, result=result).inc()
+    if similarity is not None:
+        LLM_SEMANTIC_CACHE_SIMILARITY.labels(route=route).observe(similarity)
+    if saved_seconds:
+        LLM_SEMANTIC_CACHE_SAVED_SECONDS.labels(route=route).inc(saved_seconds)
\ No newline at end of file
@@ -2,6 +2,7 @@ from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from contextlib import asynccontextmanager
+import asyncio
 import uvicorn
 import os
 from dotenv import load_dotenv
@@ -10,6 +11,11 @@ from core.config import settings
 from core.database import engine, Base
 from api.v1.api import api_router
 from core.monitoring import setup_metrics
+from ai_services.vector_db.embedder_pool import embedder_registry
+from ai_services.vector_db.executor import vector_executor
+from ai_services.vector_db.collection_manager import collection_manager
+from ai_services.llm.http_pool import llm_http_pool
+from ai_services.llm.model_registry import local_model_registry, ModelKey
 
 # Load environment variables
 load_dotenv()
@@ -28,11 +34,31 @@ async def lifespan(app: FastAPI):
     
     # Monitoring is already setup during app creation
     
+    # Optionally load the shared embedding model before serving traffic
+    if settings.EMBEDDING_WARMUP:
+        try:
+            await asyncio.to_thread(embedder_registry.warm_up, [settings.EMBEDDING_MODEL_NAME])
+            print(f"🧠 Embedding model {settings.EMBEDDING_MODEL_NAME} warmed up")
+        except Exception as e:
+            print(f"⚠️ Embedding model warm-up failed: {e}")
+    
+    # Optionally load and warm up local LLMs before serving traffic
+    if settings.LLM_LOCAL_PREWARM:
+        try:
+            await local_model_registry.prewarm([ModelKey.parse(spec) for spec in settings.LLM_LOCAL_PREWARM])
+            print(f"🧠 Local models {', '.join(settings.LLM_LOCAL_PREWARM)} warmed up")
+        except Exception as e:
+            print(f"⚠️ Local model warm-up failed: {e}")
+    
     print("✅ LuminaOps API Server started successfully!")
     yield
     
     # Shutdown
     print("⏹️ Shutting down LuminaOps API Server...")
+    # Persist collections changed since they were loaded
+    await collection_manager.flush()
+    vector_executor.shutdown(wait=False)
+    await llm_http_pool.aclose()
 
 # Create FastAPI application
 app = FastAPI(
@@ -0,0 +1,111 @@
+"""
+LLM admission control tests, including runs against the local mock provider server
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from benchmarks.mock_llm_server import MockLLMServer
+from ai_services.llm.admission import AdmissionController, AdmissionLimits, AdmissionRejected, TokenBucket
+
+PAYLOAD = {"model": "gpt-mock", "max_tokens": 8, "messages": [{"role": "user", "content": "hello"}]}
+
+def controller(limits: AdmissionLimits, max_queue: int = 256, max_wait: float = 30.0) -> AdmissionController:
+    return AdmissionController(
+        limits={"openai": limits},
+        default_limits=AdmissionLimits(),
+        max_queue=max_queue,
+        max_wait_seconds=max_wait
+    )
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(rate_per_minute=600, burst_seconds=1)  # 10 per second, capacity 10
+    bucket.take(10)
+    assert bucket.wait_time(1) == pytest.approx(0.1, abs=0.02)
+    time.sleep(0.25)
+    assert bucket.wait_time(2) == 0
+    assert bucket.wait_time(11) == float("inf")
+
+def test_rejects_when_deadline_passes_while_queued():
+    admission = controller(AdmissionLimits(max_concurrency=1), max_wait=0.1)
+
+    async def run():
+        async with admission.admit("openai", "gpt-mock", 10):
+            with pytest.raises(AdmissionRejected) as rejected:
+                async with admission.admit("openai", "gpt-mock", 10):
+                    pass
+        return rejected.value
+
+    rejection = asyncio.run(run())
+    assert rejection.reason == "deadline"
+    assert admission.stats()["scopes"]["openai"]["rejected"] == 1
+
+def test_rejects_up_front_when_rate_wait_exceeds_deadline():
+    admission = controller(AdmissionLimits(requests_per_minute=60, burst_seconds=1), max_wait=0.5)
+
+    async def run():
+        async with admission.admit("openai", "gpt-mock", 10):
+            pass
+        start = time.perf_counter()
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with admission.admit("openai", "gpt-mock", 10):
+                pass
+        return rejected.value, time.perf_counter() - start
+
+    rejection, seconds = asyncio.run(run())
+    assert rejection.reason == "rate_limited"
+    assert rejection.retry_after == pytest.approx(1.0, abs=0.1)
+    assert seconds < 0.1  # Turned away without waiting
+
+def test_rejects_when_queue_is_full():
+    admission = controller(AdmissionLimits(max_concurrency=1), max_queue=1, max_wait=5)
+
+    async def run():
+        async with admission.admit("openai", "gpt-mock", 10):
+            queued = asyncio.create_task(admission.admit("openai", "gpt-mock", 10).__aenter__())
+            await asyncio.sleep(0.01)
+            with pytest.raises(AdmissionRejected) as rejected:
+                async with admission.admit("openai", "gpt-mock", 10):
+                    pass
+            queued.cancel()
+        return rejected.value
+
+    assert asyncio.run(run()).reason == "queue_full"
+
+def test_no_provider_429s_under_admission():
+    rate = 600  # Requests per minute, with a one second burst on both sides
+
+    async def run(guarded: bool):
+        server = MockLLMServer(latency_ms=10, requests_per_minute=rate, burst_seconds=1)
+        await server.start()
+        # Slightly under the provider's limit, as configured in production, to absorb network jitter
+        admission = controller(AdmissionLimits(max_concurrency=8, requests_per_minute=rate * 0.9, burst_seconds=1))
+        statuses = []
+        try:
+            async with httpx.AsyncClient(timeout=30) as client:
+                async def call():
+                    response = await client.post(server.base_url + "/v1/chat/completions", json=PAYLOAD)
+                    statuses.append(response.status_code)
+
+                async def request():
+                    if guarded:
+                        async with admission.admit("openai", "gpt-mock", 10):
+                            await call()
+                    else:
+                        await call()
+
+                # Twice the burst arrives at once
+                await asyncio.gather(*(request() for _ in range(20)))
+        finally:
+            await server.stop()
+        return statuses, server.stats()
+
+    statuses, server_stats = asyncio.run(run(guarded=False))
+    assert server_stats["rate_limited"] > 0  # The burst does exceed the provider limit
+
+    statuses, server_stats = asyncio.run(run(guarded=True))
+    assert statuses == [200] * 20
+    assert server_stats["rate_limited"] == 0
@@ -0,0 +1,78 @@
+"""
+Shared LLM HTTP pool tests against the local mock provider server
+"""
+
+import asyncio
+
+from benchmarks.mock_llm_server import MockLLMServer
+from ai_services.llm.http_pool import LLMHTTPPool
+
+PAYLOAD = {"model": "gpt-mock", "max_tokens": 8, "messages": [{"role": "user", "content": "hello"}]}
+
+async def send_waves(pool: LLMHTTPPool, server: MockLLMServer, waves: int, concurrency: int):
+    async def send(path: str):
+        response = await pool.client.post(server.base_url + path, json=PAYLOAD)
+        response.raise_for_status()
+
+    for _ in range(waves):
+        # Both provider APIs go through the same client and connections
+        await asyncio.gather(*(
+            send("/v1/chat/completions" if i % 2 else "/v1/messages") for i in range(concurrency)
+        ))
+
+def test_connections_are_reused_across_requests():
+    async def run():
+        server = MockLLMServer(latency_ms=20)
+        await server.start()
+        pool = LLMHTTPPool(max_connections=16, max_keepalive_connections=16)
+        try:
+            await send_waves(pool, server, waves=4, concurrency=8)
+            return server.stats(), pool.stats()
+        finally:
+            await pool.aclose()
+            await server.stop()
+
+    server_stats, pool_stats = asyncio.run(run())
+    assert server_stats["requests_served"] == 32
+    assert server_stats["connections_opened"] == 8
+    assert pool_stats["requests_total"] == 32
+    assert pool_stats["connections_opened"] == 8
+    assert pool_stats["in_flight"] == 0
+    assert pool_stats["connections"] == {"active": 0, "idle": 8}
+
+def test_max_connections_bounds_open_connections():
+    async def run():
+        server = MockLLMServer(latency_ms=20)
+        await server.start()
+        pool = LLMHTTPPool(max_connections=4, max_keepalive_connections=4)
+        try:
+            await send_waves(pool, server, waves=2, concurrency=16)
+            return server.stats(), pool.stats()
+        finally:
+            await pool.aclose()
+            await server.stop()
+
+    server_stats, pool_stats = asyncio.run(run())
+    assert server_stats["requests_served"] == 32
+    assert server_stats["peak_open_connections"] <= 4
+    assert pool_stats["connections_opened"] == server_stats["connections_opened"] <= 4
+
+def test_connection_counts_degrade_without_pool_internals():
+    async def run():
+        server = MockLLMServer(latency_ms=0)
+        await server.start()
+        pool = LLMHTTPPool()
+        try:
+            await send_waves(pool, server, waves=1, concurrency=2)
+            transport = pool._transport
+            inner, transport._transport = transport._transport, None  # An httpcore release without _pool
+            stats = pool.stats()
+            transport._transport = inner
+            return stats
+        finally:
+            await pool.aclose()
+            await server.stop()
+
+    stats = asyncio.run(run())
+    assert stats["connections"] == {"active": 0, "idle": None}
+    assert stats["connections_opened"] == 2